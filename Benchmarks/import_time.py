@@ -0,0 +1,93 @@
+"""
+Cold import cost of the library. ActiveBatch starts a fresh Python for every job step, so whatever Objects and Handlers
+pay on import is paid thousands of times a day
+
+python -m Benchmarks.import_time
+python -m Benchmarks.import_time --Modules Objects.api --Budget 30
+
+Every module is imported `--Runs` times in a fresh interpreter with -X importtime (Python 3.7+) and the fastest run is
+compared against the budget, after one run to make sure the bytecode is cached. The run exits with 1 if any module is
+over budget, or if importing it drags in one of the modules that are meant to stay lazy
+"""
+import logging
+import subprocess
+import sys
+from argparse import ArgumentParser
+
+MODULES = ['Objects.api', 'Handlers.connection_handler']
+
+# only needed once a connection is made (win32com), a COM call fails (pythoncom) or a failed call is logged (inspect)
+LAZY = ['win32com', 'win32com.client', 'pythoncom', 'pywintypes', 'inspect']
+
+
+def parse_arguments(args):
+    parser = ArgumentParser()
+    parser.add_argument('--Modules',
+                        nargs='+',
+                        default=MODULES,
+                        help='Modules to import',
+                        type=str
+                        )
+    parser.add_argument('--Budget',
+                        default=50.0,
+                        help='Milliseconds a cold import of each module may take',
+                        type=float
+                        )
+    parser.add_argument('--Runs',
+                        default=5,
+                        help='Imports per module, the fastest one is the one that counts',
+                        type=int
+                        )
+    parser.add_argument('--Top',
+                        default=10,
+                        help='How many of the most expensive imports to list for each module',
+                        type=int
+                        )
+    return parser.parse_args(args)
+
+
+def import_time(module: str) -> tuple:
+    """
+    imports `module` in a fresh interpreter and returns (cumulative microseconds, {imported module: self microseconds},
+    the LAZY modules that ended up in sys.modules)
+    """
+    _code = f"import sys, {module}; print(','.join(m for m in {LAZY!r} if m in sys.modules))"
+    _process = subprocess.run([sys.executable, '-X', 'importtime', '-c', _code], stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    _total, _self = 0, {}
+    for _line in _process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not _line.startswith('import time:') or 'self [us]' in _line:
+            continue
+        _own, _cumulative, _name = _line[len('import time:'):].split('|')
+        _self[_name.strip()] = int(_own)
+        if _name.strip() == module:
+            _total = int(_cumulative)
+    _loaded = [_m for _m in _process.stdout.strip().split(',') if _m]
+    return _total, _self, _loaded
+
+
+def main(args) -> int:
+    arguments = parse_arguments(args)
+    _failures = []
+    for _module in arguments.Modules:
+        import_time(_module)  # writes the bytecode cache
+        _runs = [import_time(_module) for _ in range(arguments.Runs)]
+        _total, _self, _loaded = min(_runs, key=lambda run: run[0])
+        print(f'{_module}: {_total / 1000:.1f} ms (budget {arguments.Budget:.0f} ms)')
+        for _name, _us in sorted(_self.items(), key=lambda kv: kv[1], reverse=True)[:arguments.Top]:
+            print(f'    {_us / 1000:>7.2f} ms  {_name}')
+        if _total / 1000 > arguments.Budget:
+            _failures.append(f'{_module} took {_total / 1000:.1f} ms to import, over the {arguments.Budget} ms budget')
+        if _loaded:
+            _failures.append(f"{_module} imports {', '.join(_loaded)}, which should only be imported when needed")
+
+    for _failure in _failures:
+        logging.error(_failure)
+    return 1 if _failures else 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(format='[%(asctime)s.%(msecs)03d] [%(filename)s:%(lineno)s - %(funcName)s] %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S', level=logging.WARNING)
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,173 @@
+"""
+Runs the scenarios in Benchmarks.scenarios against a simulated scheduler at several scales and reports wall time, COM
+calls and peak memory for each of them
+
+python -m Benchmarks.run --Scales 1000 10000
+python -m Benchmarks.run --Scales 1000 10000 --UpdateBaselines
+
+The gate is the number of COM calls per object, which the simulator makes deterministic: baselines.json is committed
+with the calls per object of every scenario at every default scale, and the run exits with 1 when a scenario makes
+more than --Tolerance times as many. Timings and memory are reported but not gated, they depend on the machine and
+runs of a few milliseconds are too noisy to fail on. A scenario or scale without a baseline is reported and left out
+of the gate; regenerate baselines.json with --UpdateBaselines after a deliberate change in the calls made
+"""
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser
+
+from Benchmarks.scenarios import SCENARIOS
+from Handlers.connection_handler import ABConnectionManager
+from Handlers.simulator import SimulatedScheduler
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+
+def parse_arguments(args):
+    parser = ArgumentParser()
+    parser.add_argument('--Scales',
+                        nargs='+',
+                        default=[1000, 10000],
+                        help='Approximate number of objects each scenario works on, one run per scale',
+                        type=int
+                        )
+    parser.add_argument('--Scenarios',
+                        nargs='+',
+                        default=list(SCENARIOS),
+                        choices=list(SCENARIOS),
+                        help='Scenarios to run, all of them by default',
+                        type=str
+                        )
+    parser.add_argument('--Latency',
+                        default=0.0,
+                        help='Seconds added to every simulated COM call',
+                        type=float
+                        )
+    parser.add_argument('--Tolerance',
+                        default=1.0,
+                        help='How many times its baseline COM calls per object a scenario may make before failing',
+                        type=float
+                        )
+    parser.add_argument('--Baselines',
+                        default=BASELINES,
+                        help='JSON file the baselines are read from and written to',
+                        type=str
+                        )
+    parser.add_argument('--UpdateBaselines',
+                        action='store_true',
+                        help='Overwrite the stored baselines with the results of this run'
+                        )
+    parser.add_argument('--Output',
+                        default=None,
+                        help='Also write the results of this run to this JSON file',
+                        type=str
+                        )
+    return parser.parse_args(args)
+
+
+def run_scenario(scenario, scale: int, latency: float = 0.0, memory: bool = False) -> dict:
+    """one timed run of `scenario` on a fresh simulated scheduler, or one traced for memory if `memory` is True"""
+    _sim = SimulatedScheduler(latency=latency, **scenario.tree(scale))
+    # the simulator lives in this process too, so it's generated before tracing starts to leave it out of the peak
+    with ABConnectionManager('simulated', scenario.version, dispatch=_sim.dispatch) as ab:
+        _state = scenario.prepare(ab, scale)
+        _sim.reset_calls()
+        if memory:
+            tracemalloc.start()
+        _start = time.perf_counter()
+        try:
+            _objects = scenario.run(ab, _state, scale)
+            _elapsed = time.perf_counter() - _start
+        finally:
+            _peak = tracemalloc.get_traced_memory()[1] if memory else None
+            if memory:
+                tracemalloc.stop()
+        _calls = sum(_sim.calls.values())
+    _objects = max(_objects, 1)
+    return {'scenario': scenario.name,
+            'scale': scale,
+            'objects': _objects,
+            'seconds': _elapsed,
+            'com_calls': _calls,
+            'peak_bytes': _peak,
+            'seconds_per_object': _elapsed / _objects,
+            'calls_per_object': _calls / _objects
+            }
+
+
+def measure(scenario, scale: int, latency: float = 0.0) -> dict:
+    # tracemalloc slows everything down, so time and memory come from two separate runs
+    _result = run_scenario(scenario, scale, latency)
+    _result['peak_bytes'] = run_scenario(scenario, scale, latency, memory=True)['peak_bytes']
+    return _result
+
+
+def compare(result: dict, baseline: dict, tolerance: float = 1.0) -> list:
+    """the reasons `result` counts as a regression against `baseline`, empty if it doesn't"""
+    _before, _after = baseline.get('calls_per_object'), result['calls_per_object']
+    if _before is None or _after <= _before * tolerance + 1e-9:
+        return []
+    _ratio = f' ({_after / _before:.1f}x)' if _before else ''
+    return [f'calls_per_object went from {_before:.4g} to {_after:.4g}{_ratio}']
+
+
+def load_baselines(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as infile:
+        return json.load(infile)
+
+
+def save_baselines(path: str, baselines: dict):
+    with open(path, 'w') as outfile:
+        json.dump(baselines, outfile, indent=2, sort_keys=True)
+    logging.info(f'Baselines written to {path}')
+
+
+def report(results: list) -> str:
+    _lines = [f"{'scenario':<31}{'scale':>8}{'objects':>9}{'seconds':>10}{'us/object':>11}{'COM calls':>11}"
+              f"{'calls/obj':>10}{'peak MB':>9}"]
+    for _r in results:
+        _lines.append(f"{_r['scenario']:<31}{_r['scale']:>8}{_r['objects']:>9}{_r['seconds']:>10.3f}"
+                      f"{_r['seconds_per_object'] * 1e6:>11.1f}{_r['com_calls']:>11}{_r['calls_per_object']:>10.2f}"
+                      f"{_r['peak_bytes'] / 2 ** 20:>9.1f}")
+    return '\n'.join(_lines)
+
+
+def main(args) -> int:
+    arguments = parse_arguments(args)
+    baselines = load_baselines(arguments.Baselines)
+    results, regressions = [], []
+    for _name in arguments.Scenarios:
+        for _scale in arguments.Scales:
+            logging.info(f'Running {_name} at scale {_scale}')
+            _result = measure(SCENARIOS[_name], _scale, arguments.Latency)
+            results.append(_result)
+            _key = f'{_name}@{_scale}'
+            if arguments.UpdateBaselines:
+                baselines[_key] = {'calls_per_object': _result['calls_per_object']}
+            elif _key in baselines:
+                for _reason in compare(_result, baselines[_key], arguments.Tolerance):
+                    regressions.append(f'{_key}: {_reason}')
+            else:
+                logging.warning(f'{_key} has no baseline, run with --UpdateBaselines to add one')
+
+    print(report(results))
+    if arguments.UpdateBaselines:
+        save_baselines(arguments.Baselines, baselines)
+    if arguments.Output:
+        with open(arguments.Output, 'w') as outfile:
+            json.dump(results, outfile, indent=2)
+
+    for _regression in regressions:
+        logging.error(f'REGRESSION {_regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(format='[%(asctime)s.%(msecs)03d] [%(filename)s:%(lineno)s - %(funcName)s] %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S', level=logging.WARNING)
+    sys.exit(main(sys.argv[1:]))
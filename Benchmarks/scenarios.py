@@ -0,0 +1,196 @@
+"""
+The workloads timed by Benchmarks.run. Every scenario builds its own Handlers.simulator.SimulatedScheduler sized after
+`scale`, gets whatever it needs out of it in prepare() and then does the timed work in run(), which returns how many
+objects it went through so that the runner can report a per-object cost
+"""
+from datetime import datetime, timedelta
+
+import Objects.enumerations as enum
+from Objects.api import AllAttributes
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+# Search ObjectFilter values
+OLF_JOB = 1
+OLF_PLAN = 2
+OLF_SCHEDULE = 16
+
+
+def get_dicts(result_set):
+    """the README example"""
+    _d = []
+    for result in result_set:
+        _dict = {'ID': result.ID,
+                 'Name': result.Name,
+                 'FullPath': result.FullPath,
+                 'ObjectType': result.ObjectType,
+                 'Enabled': result.Enabled,
+                 'Owner': result.Owner,
+                 'LastRun': result.LastInstanceExecutionDateTime,
+                 'NextRun': result.NextScheduledExecutionDateTime,
+                 'CreationDateTime': result.CreationDateTime
+                 }
+        _d.append(_dict)
+    return _d
+
+
+class Scenario(object):
+    name = None
+    version = 12  # the ActiveBatch version the connection claims, 9 turns on the GetObjectType errata handling
+
+    def tree(self, scale: int) -> dict:
+        """keyword arguments for SimulatedScheduler, by default a tree of about `scale` objects"""
+        # every folder holds 3 schedules and 10 plans of 20 jobs
+        return {'folders': max(1, scale // 214), 'depth': 0, 'plans_per_folder': 10, 'jobs_per_plan': 20,
+                'schedules_per_folder': 3}
+
+    def prepare(self, ab, scale: int):
+        return None
+
+    def run(self, ab, state, scale: int) -> int:
+        raise NotImplementedError
+
+
+class SearchFullObjects(Scenario):
+    name = 'search_full_objects'
+
+    def run(self, ab, state, scale):
+        return len(ab.Search('/', GetFullObjects=True))
+
+
+class SearchFullObjectsV9(SearchFullObjects):
+    """same search on a V9 scheduler, where every Folder and Plan goes through the GetObjectType errata probe"""
+    name = 'search_full_objects_v9'
+    version = 9
+
+    def tree(self, scale):
+        return dict(super().tree(scale), v9_errata=True)
+
+
+class SearchFullObjectsV9Primed(SearchFullObjectsV9):
+    """same as search_full_objects_v9, with the types of the Folders and Plans resolved in bulk beforehand"""
+    name = 'search_full_objects_v9_primed'
+
+    def run(self, ab, state, scale):
+        ab.prime_type_cache('/')
+        return super().run(ab, state, scale)
+
+
+class DataFrame(Scenario):
+    """
+    Search followed by the README's get_dicts; the DataFrame is only built when pandas is installed. Only jobs have
+    every attribute get_dicts reads, so the search is limited to them
+    """
+    name = 'dataframe'
+
+    def run(self, ab, state, scale):
+        _details = get_dicts(ab.Search('/', ObjectFilter=OLF_JOB, GetFullObjects=True))
+        if pd is not None:
+            pd.DataFrame(_details)
+        return len(_details)
+
+
+class MoveObjectTo(Scenario):
+    name = 'move_object_to'
+
+    def tree(self, scale):
+        return {'folders': max(1, scale // 100), 'depth': 0, 'plans_per_folder': 100, 'jobs_per_plan': 0,
+                'schedules_per_folder': 0}
+
+    def prepare(self, ab, scale):
+        _plans = [_plan.ID for _plan in ab.search_lite('/', ObjectFilter=OLF_PLAN)]
+        ab._create_intermediate_folders('/Benchmark/Target')
+        return _plans
+
+    def run(self, ab, state, scale):
+        for _id in state:
+            ab.MoveObjectTo(_id, '/Benchmark/Target')
+        return len(state)
+
+
+class ScheduleNames(Scenario):
+    name = 'schedule_names'
+
+    def tree(self, scale):
+        return {'folders': max(1, scale // 50), 'depth': 0, 'plans_per_folder': 0, 'jobs_per_plan': 0,
+                'schedules_per_folder': 50}
+
+    def prepare(self, ab, scale):
+        return ab.Search('/', ObjectFilter=OLF_SCHEDULE, GetFullObjects=True)
+
+    def run(self, ab, state, scale):
+        for _schedule in state:
+            _ = _schedule.production_name
+        return len(state)
+
+
+class RunnableOverhead(Scenario):
+    """`scale` property reads through @Decorators.runnable on the same object"""
+    name = 'runnable_overhead'
+
+    def tree(self, scale):
+        return {'folders': 1, 'depth': 0, 'plans_per_folder': 1, 'jobs_per_plan': 1, 'schedules_per_folder': 0}
+
+    def prepare(self, ab, scale):
+        return ab.get_object('/Folder0/Plan0/Job0', lite=True)
+
+    def run(self, ab, state, scale):
+        for _ in range(scale):
+            _ = state.Name
+        return scale
+
+
+class NormalizeDate(Scenario):
+    name = 'normalize_date'
+
+    def tree(self, scale):
+        return {'folders': 0}
+
+    def prepare(self, ab, scale):
+        # COM dates print with a timezone portion, e.g. 2020-01-01 00:00:00+00:00
+        _start = datetime(2020, 1, 1)
+        return [f'{_start + timedelta(minutes=idx)}+00:00' for idx in range(scale)]
+
+    def run(self, ab, state, scale):
+        for _date in state:
+            AllAttributes.normalize_date(_date)
+        return len(state)
+
+
+class Enumerations(Scenario):
+    """the lookups done for every object that goes through JobScheduler._get_object and the schedule naming"""
+    name = 'enumerations'
+
+    def tree(self, scale):
+        return {'folders': 0}
+
+    def run(self, ab, state, scale):
+        for idx in range(scale):
+            _ = enum.ObjectType(2 + idx % 15).name
+            _ = enum.ScheduleDays(1 + idx % 127).str_days
+        return scale
+
+
+class IntermediateFolders(Scenario):
+    """creates `scale` / 10 folders, ten to a parent folder"""
+    name = 'intermediate_folders'
+
+    def tree(self, scale):
+        return {'folders': 0}
+
+    def prepare(self, ab, scale):
+        return [f'/Benchmark/Group{idx // 10}/Folder{idx}' for idx in range(max(1, scale // 10))]
+
+    def run(self, ab, state, scale):
+        for _path in state:
+            ab._create_intermediate_folders(_path)
+        return len(state)
+
+
+SCENARIOS = {_scenario.name: _scenario for _scenario in (SearchFullObjects(), SearchFullObjectsV9(),
+                                                         SearchFullObjectsV9Primed(), DataFrame(), MoveObjectTo(),
+                                                         ScheduleNames(), RunnableOverhead(), NormalizeDate(),
+                                                         Enumerations(), IntermediateFolders())}
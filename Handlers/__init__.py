@@ -0,0 +1,10 @@
+import importlib
+
+__all__ = ['async_connection_handler', 'com_trace', 'connection_handler', 'federation', 'session_pool', 'simulator']
+
+
+def __getattr__(name):
+    # same as Objects, submodules are only imported the first time they're used as Handlers.<name>
+    if name in __all__:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
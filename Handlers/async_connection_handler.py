@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from typing import Union
+
+from Handlers.session_pool import SessionPool
+from Objects.api import SNAPSHOT_FIELDS, AllAttributes
+
+# instances are collections of raw COM objects rather than api classes, missing attributes come back as None
+INSTANCE_FIELDS = ('ID', 'Name', 'FullPath', 'State', 'ExecutionDateTime', 'EndExecutionDateTime', 'ExitCode')
+
+
+def _raw_snapshot(item, fields) -> dict:
+    _snapshot = {}
+    for _field in fields:
+        try:
+            _value = getattr(item, _field)
+        except Exception:
+            _value = None
+        if hasattr(_value, 'year'):  # COM dates come back as pywintypes datetimes
+            _value = AllAttributes.normalize_date(_value)
+        _snapshot[_field] = _value
+    return _snapshot
+
+
+class AsyncJobScheduler(object):
+    """
+    asyncio facade over the COM API. Every call runs on one of `workers` dedicated threads, each of which initializes
+    its own COM apartment and owns its own connection (see Handlers.session_pool.SessionPool), so the event loop is
+    never blocked by the scheduler
+
+    COM objects can't leave the thread that created them, so everything handed back to the event loop is plain data:
+    snapshot dictionaries, IDs and instance IDs. Anything more involved can be sent to a worker with run()
+
+    async with AsyncJobScheduler('activebatch', 12, workers=4) as ab:
+        plans = await ab.Search('/Finance', ObjectFilter=2)
+        instances = await asyncio.gather(*(ab.GetInstances(plan['ID'], Count=10) for plan in plans))
+
+    At most `max_in_flight` calls are queued on the workers at any time, so a gather over thousands of keys doesn't
+    flood the pool
+    """
+
+    def __init__(self, server: str = 'activebatch', version: int = None, workers: int = 4,
+                 max_in_flight: int = None, calls_per_second: float = None, dispatch=None):
+        self.server = server
+        self.version = version
+        self.pool = SessionPool(server, version, size=workers, calls_per_second=calls_per_second, dispatch=dispatch)
+        self.max_in_flight = max_in_flight or workers * 2
+        self._semaphore = None
+
+    def __repr__(self):
+        return f'AsyncJobScheduler(server={self.server}, version={self.version}, workers={self.pool.size})'
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self):
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        await asyncio.get_event_loop().run_in_executor(None, self.pool.start)
+        logging.debug(f'{self.__repr__()} started')
+
+    async def close(self):
+        await asyncio.get_event_loop().run_in_executor(None, self.pool.close)
+
+    async def run(self, fn, *args, **kwargs):
+        """awaits fn(session, *args, **kwargs) on a worker; fn must return plain values and not COM objects"""
+        async with self._semaphore:
+            return await asyncio.wrap_future(self.pool.submit(fn, *args, **kwargs))
+
+    async def Search(self, SearchRootKey: Union[str, int], SearchString: str = '*', ObjectFilter: int = 65535,
+                     FieldNames: str = 'AllFields', Recursive: bool = True, GetFullObjects: bool = False,
+                     fields=SNAPSHOT_FIELDS) -> list:
+        def _search(session):
+            _results = session.Search(SearchRootKey, SearchString=SearchString, ObjectFilter=ObjectFilter,
+                                      FieldNames=FieldNames, Recursive=Recursive, GetFullObjects=GetFullObjects)
+            return [_item.snapshot(fields) for _item in _results]
+
+        return await self.run(_search)
+
+    async def get_object(self, key, lite: bool = True, fields=SNAPSHOT_FIELDS) -> dict:
+        return await self.run(lambda session: session.get_object(key, lite=lite).snapshot(fields))
+
+    async def snapshot(self, keys, lite: bool = True, fields=SNAPSHOT_FIELDS) -> list:
+        """reads the same fields from many objects, fanned out across the workers"""
+        return await asyncio.gather(*(self.get_object(_key, lite=lite, fields=fields) for _key in keys))
+
+    async def GetInstances(self, key=None, Count: int = 100, InstanceStateFilter: int = 65535,
+                           ShowOldestFirst: bool = True, StartDateTime: str = None, EndDateTime: str = None,
+                           fields=INSTANCE_FIELDS) -> list:
+        """instances of the object `key`, or of the whole scheduler if no key is given"""
+        def _instances(session):
+            _obj = session if key is None else session.get_object(key, lite=True)
+            _results = _obj.GetInstances(Count=Count, InstanceStateFilter=InstanceStateFilter,
+                                         ShowOldestFirst=ShowOldestFirst, StartDateTime=StartDateTime,
+                                         EndDateTime=EndDateTime)
+            return [_raw_snapshot(_item, fields) for _item in _results]
+
+        return await self.run(_instances)
+
+    async def Trigger3(self, key, QueueName: str = '', JobParameters: str = '', Flags: int = 0, Username: str = '',
+                       Password: str = '', Variables: dict = None):
+        """returns the ID of the triggered instance"""
+        def _trigger(session):
+            return session.get_object(key, lite=False).Trigger3(QueueName=QueueName, JobParameters=JobParameters,
+                                                                Flags=Flags, Username=Username, Password=Password,
+                                                                Variables=Variables or '')
+
+        return await self.run(_trigger)
@@ -0,0 +1,335 @@
+"""
+Record/replay of the COM traffic of a session
+
+RecordingDispatch sits between ABConnectionManager and the real COM object and writes every attribute read, attribute
+write, method call and collection walk to a JSON lines trace, along with the shape of its result and its latency.
+ReplayDispatch serves the same responses back from that trace, which means whole workloads can be profiled and
+benchmarked on a machine that has neither pywin32 nor an ActiveBatch server
+
+with RecordingDispatch('search.jsonl.gz') as recording:
+    with ABConnectionManager('activebatch', 12, dispatch=recording) as ab:
+        ab.Search('/Finance', GetFullObjects=True)
+
+with ABConnectionManager('activebatch', 12, dispatch=ReplayDispatch('search.jsonl.gz', latency='recorded')) as ab:
+    ab.Search('/Finance', GetFullObjects=True)
+
+Replay matches calls by (object, operation, name, arguments) rather than by order, so a replayed workload may make the
+same calls in a different order, or fewer of them. Repeated calls get the recorded responses in the order they were
+recorded, and the last one keeps being served once they run out
+
+What Handlers.simulator hands out is recorded like any COM object, so a session against a SimulatedScheduler can be
+recorded and replayed as well
+"""
+import gzip
+import itertools
+import json
+import logging
+import threading
+import time
+import types
+from collections import deque
+from datetime import datetime
+
+from Objects.api import com_error
+
+_REDACTED = ('Password',)  # keyword arguments that never make it into a trace
+# class attribute of the stand-ins for COM objects that aren't pywin32 ones (see Handlers.simulator), so that they're
+# recorded as objects rather than as their repr
+COM_MARKER = '_com_object_'
+
+
+def _open(path: str, mode: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't')
+    return open(path, mode)
+
+
+def _is_com_object(value) -> bool:
+    return isinstance(value, (RecordingProxy, ReplayProxy)) or hasattr(value, '_oleobj_') or \
+           getattr(type(value), COM_MARKER, False)
+
+
+def _is_method(value) -> bool:
+    return isinstance(value, (types.MethodType, types.BuiltinMethodType)) or \
+           (callable(value) and not _is_com_object(value))
+
+
+def _key(handle: int, op: str, name: str, args=(), kwargs=None) -> str:
+    return json.dumps([handle, op, name, args, kwargs or {}], sort_keys=True)
+
+
+class TraceMiss(LookupError):
+    """raised during replay when the workload makes a call that was never recorded"""
+
+
+class _Recorder(object):
+    def __init__(self, path: str):
+        self.path = path
+        self.calls = 0
+        self._file = _open(path, 'w')
+        self._handles = itertools.count(1)  # 0 is the JobScheduler object itself
+        self._lock = threading.Lock()
+
+    def new_handle(self) -> int:
+        with self._lock:
+            return next(self._handles)
+
+    def write(self, event: dict):
+        _line = json.dumps(event, separators=(',', ':'))
+        with self._lock:
+            self.calls += 1
+            self._file.write(_line + '\n')
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def encode(self, value):
+        """turns a COM result into JSON, wrapping any COM object into a RecordingProxy with its own handle"""
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value, value
+        if isinstance(value, RecordingProxy):
+            return {'$obj': value._handle}, value
+        if hasattr(value, 'year') and hasattr(value, 'hour'):  # pywintypes and python datetimes
+            return {'$dt': str(value)}, value
+        if isinstance(value, (list, tuple)):
+            _pairs = [self.encode(_v) for _v in value]
+            return {'$list': [_e for _e, _ in _pairs]}, type(value)(_v for _, _v in _pairs)
+        if _is_com_object(value):
+            _proxy = RecordingProxy(value, self, self.new_handle())
+            return {'$obj': _proxy._handle}, _proxy
+        return {'$repr': repr(value)}, value
+
+
+def _encode_arg(value):
+    if isinstance(value, (RecordingProxy, ReplayProxy)):
+        return {'$obj': value._handle}
+    if isinstance(value, (list, tuple)):
+        return [_encode_arg(_v) for _v in value]
+    if hasattr(value, 'year') and hasattr(value, 'hour'):
+        return {'$dt': str(value)}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return {'$repr': repr(value)}
+
+
+def _encode_kwargs(kwargs: dict) -> dict:
+    return {_k: ('***' if _k in _REDACTED else _encode_arg(_v)) for _k, _v in kwargs.items()}
+
+
+def _unwrap(value):
+    """hands the real COM objects back to the COM when proxies are passed as arguments"""
+    if isinstance(value, RecordingProxy):
+        return value._target
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(_v) for _v in value)
+    return value
+
+
+class RecordingProxy(object):
+    """stands in for a COM object and writes everything that goes through it to the trace"""
+
+    _trace_proxy_ = True  # walked with iter() by Objects.abat_collections, which the trace records as one call
+
+    def __init__(self, target, recorder: _Recorder, handle: int):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_recorder', recorder)
+        object.__setattr__(self, '_handle', handle)
+
+    def __repr__(self):
+        return f'RecordingProxy({self._handle})'
+
+    def _record(self, op: str, name: str, args, kwargs, fn):
+        _event = {'h': self._handle, 'op': op, 'n': name}
+        if args:
+            _event['a'] = [_encode_arg(_a) for _a in args]
+        if kwargs:
+            _event['k'] = _encode_kwargs(kwargs)
+        _start = time.perf_counter()
+        try:
+            _result = fn()
+        except Exception as e:
+            _event['t'] = round(time.perf_counter() - _start, 6)
+            _event['e'] = {'type': type(e).__name__, 'args': _encode_arg(list(e.args))}
+            self._recorder.write(_event)
+            raise
+        _event['t'] = round(time.perf_counter() - _start, 6)
+        _event['r'], _result = self._recorder.encode(_result)
+        self._recorder.write(_event)
+        return _result
+
+    def __getattr__(self, name):
+        # reading a property goes to the server, resolving a method doesn't; the call is recorded when it's made
+        _start = time.perf_counter()
+        _value = getattr(self._target, name)
+        _elapsed = time.perf_counter() - _start
+        if _is_method(_value):
+            def _method(*args, **kwargs):
+                return self._record('call', name, args, kwargs,
+                                    lambda: _value(*[_unwrap(_a) for _a in args],
+                                                   **{_k: _unwrap(_v) for _k, _v in kwargs.items()}))
+            return _method
+        _event = {'h': self._handle, 'op': 'get', 'n': name, 't': round(_elapsed, 6)}
+        _event['r'], _value = self._recorder.encode(_value)
+        self._recorder.write(_event)
+        return _value
+
+    def __setattr__(self, name, value):
+        self._record('set', name, [value], None, lambda: setattr(self._target, name, _unwrap(value)))
+
+    def __iter__(self):
+        return iter(self._record('iter', '', None, None, lambda: list(self._target)))
+
+    def __len__(self):
+        return self._record('len', '', None, None, lambda: len(self._target))
+
+
+class RecordingDispatch(object):
+    """
+    Drop-in replacement for win32com.client.Dispatch that records the session to `path` (gzipped if it ends with .gz)
+
+    Passwords given as keyword arguments (e.g. to Connect) are redacted. The trace is only complete once close() has
+    run, which leaving the `with` block does; one RecordingDispatch can be shared by every connection of a SessionPool,
+    so it's closed once they're all done rather than when a connection ends
+    """
+
+    def __init__(self, path: str, dispatch=None):
+        self.path = path
+        self.dispatch = dispatch
+        self._recorder = None
+
+    def __repr__(self):
+        return f'RecordingDispatch({self.path})'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __call__(self, progid: str):
+        _dispatch = self.dispatch
+        if _dispatch is None:
+            import win32com.client
+            _dispatch = win32com.client.Dispatch
+        if self._recorder is None:
+            self._recorder = _Recorder(self.path)
+        logging.info(f'Recording COM calls to {self.path}')
+        return RecordingProxy(_dispatch(progid), self._recorder, 0)
+
+    def close(self):
+        if self._recorder is not None:
+            self._recorder.close()
+            logging.info(f'{self._recorder.calls} COM calls recorded to {self.path}')
+
+
+class _Trace(object):
+    def __init__(self, path: str, latency=None):
+        self.path = path
+        self.latency = latency
+        self.calls = 0
+        self.misses = 0
+        self._responses = {}
+        self._members = {}  # {(handle, name): op} so a proxy knows whether a name is a method or an attribute
+        self._lock = threading.Lock()
+        with _open(path, 'r') as infile:
+            for line in infile:
+                _event = json.loads(line)
+                _op, _handle, _name = _event['op'], _event['h'], _event['n']
+                _args = _event.get('a', []) if _op != 'get' else []
+                _k = _key(_handle, _op, _name, _args, _event.get('k'))
+                self._responses.setdefault(_k, deque()).append(_event)
+                if _op in ('get', 'call'):
+                    self._members[(_handle, _name)] = _op
+
+    def respond(self, handle: int, op: str, name: str, args=(), kwargs=None):
+        _k = _key(handle, op, name, list(args), kwargs)
+        with self._lock:
+            self.calls += 1
+            _queue = self._responses.get(_k)
+            if not _queue:
+                self.misses += 1
+                raise TraceMiss(f'{op} {name} on object {handle} with {args} {kwargs or {}} is not in {self.path}')
+            _event = _queue.popleft() if len(_queue) > 1 else _queue[0]
+        if self.latency == 'recorded':
+            time.sleep(_event.get('t', 0.0))
+        elif self.latency:
+            time.sleep(self.latency)
+        if 'e' in _event:
+            _error = com_error if _event['e']['type'] == 'com_error' else RuntimeError
+            raise _error(*self.decode(_event['e']['args']))
+        return self.decode(_event.get('r'))
+
+    def decode(self, value):
+        if isinstance(value, list):
+            return [self.decode(_v) for _v in value]
+        if not isinstance(value, dict):
+            return value
+        if '$obj' in value:
+            return ReplayProxy(self, value['$obj'])
+        if '$dt' in value:
+            return datetime.strptime(value['$dt'][:19], '%Y-%m-%d %H:%M:%S')
+        if '$list' in value:
+            return tuple(self.decode(_v) for _v in value['$list'])
+        return value.get('$repr')
+
+
+class ReplayProxy(object):
+    """stands in for a COM object by serving the responses recorded for it"""
+
+    _trace_proxy_ = True  # see RecordingProxy
+
+    def __init__(self, trace: _Trace, handle: int):
+        object.__setattr__(self, '_trace', trace)
+        object.__setattr__(self, '_handle', handle)
+        object.__setattr__(self, '_assigned', {})
+
+    def __repr__(self):
+        return f'ReplayProxy({self._handle})'
+
+    def __getattr__(self, name):
+        if name in self._assigned:
+            return self._assigned[name]
+        _op = self._trace._members.get((self._handle, name))
+        if _op == 'call':
+            def _method(*args, **kwargs):
+                return self._trace.respond(self._handle, 'call', name, [_encode_arg(_a) for _a in args],
+                                           _encode_kwargs(kwargs))
+            return _method
+        if _op is None:
+            raise AttributeError(f'{name} was never read from object {self._handle} in {self._trace.path}')
+        return self._trace.respond(self._handle, 'get', name)
+
+    def __setattr__(self, name, value):
+        # assignments are kept locally so that reading the attribute back returns what the workload wrote
+        self._assigned[name] = value
+
+    def __iter__(self):
+        return iter(self._trace.respond(self._handle, 'iter', ''))
+
+    def __len__(self):
+        return self._trace.respond(self._handle, 'len', '')
+
+
+class ReplayDispatch(object):
+    """
+    Drop-in replacement for win32com.client.Dispatch that serves a recorded trace
+
+    `latency` is None to answer as fast as possible, 'recorded' to sleep for as long as each call took when it was
+    recorded, or a number of seconds to sleep on every call
+    """
+
+    def __init__(self, path: str, latency=None):
+        self.path = path
+        self.trace = _Trace(path, latency)
+
+    def __repr__(self):
+        return f'ReplayDispatch({self.path})'
+
+    def __call__(self, progid: str):
+        logging.info(f'Replaying COM calls from {self.path}')
+        return ReplayProxy(self.trace, 0)
+
+    @property
+    def calls(self) -> int:
+        return self.trace.calls
@@ -2,8 +2,6 @@ import logging
 from Objects import api
 from datetime import datetime
 
-import win32com.client
-
 
 class ABConnectionManager:
     """
@@ -11,11 +9,15 @@ class ABConnectionManager:
 
     with ABConnectionManager('activebatch', 9) as con:
         con.Search('/')
+
+    `dispatch` is what creates the COM object out of its ProgID and defaults to win32com.client.Dispatch. Passing a
+    Handlers.com_trace.RecordingDispatch or ReplayDispatch records or replays the session instead
     """
 
-    def __init__(self, server: str = 'activebatch', version: int = None):
+    def __init__(self, server: str = 'activebatch', version: int = None, dispatch=None):
         self.server = server
         self.version = version
+        self.dispatch = dispatch
         self.__con = None
 
         self.start = None  # datetime.now()
@@ -33,7 +35,11 @@ class ABConnectionManager:
         try:
             # the returned connection manager is an instance JobScheduler
             _js = api.JobScheduler
-            _com_obj = win32com.client.Dispatch(_com)
+            _dispatch = self.dispatch
+            if _dispatch is None:
+                import win32com.client  # only needed when talking to a real server
+                _dispatch = win32com.client.Dispatch
+            _com_obj = _dispatch(_com)
             self.__con = _js(obj=_com_obj, server=self.server, version=self.version)
         except Exception as e:
             logging.exception(e)
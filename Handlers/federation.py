@@ -0,0 +1,201 @@
+import logging
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Union
+
+from Handlers.async_connection_handler import INSTANCE_FIELDS, _raw_snapshot
+from Handlers.session_pool import SessionPool
+from Objects.api import SNAPSHOT_FIELDS
+
+
+class Federation(object):
+    """
+    One SessionPool per (server, version), so the same Search, snapshot or GetInstances runs on every scheduler at once
+    instead of one ABConnectionManager after the other. Rows come back merged, each with the 'Server' and 'Version' it
+    was read from
+
+    with Federation([('ab-emea', 12), ('ab-apac', 12), ('ab-legacy', 9)], size=2, timeout=120) as federation:
+        plans = federation.search('/Finance', ObjectFilter=2)
+        failed = federation.instances(Count=500, InstanceStateFilter=4)
+        federation.errors   # {(server, version): what went wrong} of the last call, empty if all of them answered
+
+    A server that can't be connected to, raises or doesn't answer within `timeout` seconds is left out of the rows and
+    reported in `errors` (and `report`), the others are unaffected. A call that timed out keeps its worker busy until
+    the COM gives it back, so the next calls to that server queue behind it, and close() waits for it
+
+    Versions can be mixed. V9 and older report Folders as Plans, which GetObjectType works around with a probe per
+    object (see JobScheduler.GetObjectType); search() primes the type cache of those sessions once per root instead,
+    see JobScheduler.prime_type_cache
+
+    Everything is keyed by (server, version), the same host can be in the federation under two versions
+
+    `dispatch` is handed to every pool, or picked by (server, version), or else by server name, if it's a dictionary
+    """
+
+    def __init__(self, servers, size: int = 2, calls_per_second: float = None, timeout: float = 300.0,
+                 dispatch=None):
+        self.servers = [(_server, _version) for _server, _version in servers]
+        self.size = size
+        self.calls_per_second = calls_per_second
+        self.timeout = timeout
+        self.dispatch = dispatch
+        self.pools = {}  # {(server, version): SessionPool} of the servers that could be connected to
+        self.errors = {}  # {(server, version): error} of the last call
+        self.report = {}  # {(server, version): {'rows', 'elapsed_seconds', 'error'}} of the last call
+        self.unavailable = {}  # {(server, version): error} of the ones start() couldn't connect to
+        self._primed = set()  # (id(session), root) whose type cache has been primed
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"Federation(servers={len(self.servers)}, connected={len(self.pools)}, size={self.size})"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _dispatch(self, key: tuple):
+        if isinstance(self.dispatch, dict):
+            return self.dispatch.get(key, self.dispatch.get(key[0]))
+        return self.dispatch
+
+    def start(self):
+        """connects to every server at once, the ones that fail are kept in `unavailable` and skipped"""
+        _pools = {_key: SessionPool(_key[0], _key[1], size=self.size, calls_per_second=self.calls_per_second,
+                                    dispatch=self._dispatch(_key)) for _key in self.servers}
+        _errors = {}
+
+        def _start(key, pool):
+            try:
+                pool.start()
+            except Exception as e:
+                _errors[key] = e
+
+        _threads = [threading.Thread(target=_start, args=(_key, _pool), name=f'{_key[0]}-start', daemon=True)
+                    for _key, _pool in _pools.items()]
+        for _thread in _threads:
+            _thread.start()
+        for _thread in _threads:
+            _thread.join()
+        self.pools = {_key: _pool for _key, _pool in _pools.items() if _key not in _errors}
+        # ABConnectionManager logs the reason and raises a bare Exception
+        self.unavailable = {_key: str(_error) or 'could not connect' for _key, _error in _errors.items()}
+        for (_server, _version), _error in self.unavailable.items():
+            logging.error(f"{_server} (V{_version}) is left out of the federation: {_error}")
+        logging.info(f"{self.__repr__()} started")
+
+    def close(self):
+        for _pool in self.pools.values():
+            _pool.close()
+        self.pools = {}
+
+    def _is_v9(self, version) -> bool:
+        return version is not None and version <= 9
+
+    def _prime(self, session, version, root):
+        """primes the type cache of a V9 session for `root`, once"""
+        if not self._is_v9(version):
+            return
+        _key = (id(session), root)
+        with self._lock:
+            if _key in self._primed:
+                return
+        session.prime_type_cache(root)
+        with self._lock:
+            self._primed.add(_key)
+
+    def run(self, fn, *args, **kwargs) -> dict:
+        """
+        fn(session, version, *args, **kwargs) on one session of every server at once, {(server, version): result} of
+        the ones that answered in time. fn runs inside a pool worker and must return plain values
+        """
+        return self._gather({_key: [_pool.submit(fn, _key[1], *args, **kwargs)] for _key, _pool in self.pools.items()},
+                            merge=lambda results: results[0])
+
+    def _gather(self, futures: dict, merge) -> dict:
+        """
+        waits for {(server, version): [futures]} until the timeout, {(server, version): merge(results)} of the ones
+        that completed
+        """
+        _start = time.monotonic()
+        _deadline = _start + self.timeout if self.timeout is not None else None
+        _results, _errors, _report = {}, dict(self.unavailable), {}
+        for _key, _futures in futures.items():
+            try:
+                _parts = [_future.result(timeout=max(0.0, _deadline - time.monotonic())
+                                         if _deadline is not None else None) for _future in _futures]
+                _results[_key] = merge(_parts)
+            except FutureTimeoutError:
+                for _future in _futures:
+                    _future.cancel()  # only the ones no worker has picked up yet
+                _errors[_key] = f"no answer within {self.timeout}s"
+            except Exception as e:
+                for _future in _futures:
+                    _future.cancel()
+                _errors[_key] = str(e)
+            _report[_key] = {'rows': len(_results[_key]) if isinstance(_results.get(_key), list) else None,
+                             'elapsed_seconds': round(time.monotonic() - _start, 3), 'error': _errors.get(_key)}
+        for (_server, _version), _error in _errors.items():
+            _report.setdefault((_server, _version), {'rows': None, 'elapsed_seconds': None, 'error': _error})
+            logging.error(f"{_server} (V{_version}) left out: {_error}")
+        self.errors, self.report = _errors, _report
+        return _results
+
+    def _merge_rows(self, results: dict) -> list:
+        _rows = []
+        for (_server, _version), _server_rows in results.items():
+            for _row in _server_rows:
+                _merged = {'Server': _server, 'Version': _version}
+                _merged.update(_row)
+                _rows.append(_merged)
+        return _rows
+
+    def search(self, SearchRootKey: Union[str, int], SearchString: str = '*', ObjectFilter: int = 65535,
+               FieldNames: str = 'AllFields', Recursive: bool = True, GetFullObjects: bool = False,
+               fields=SNAPSHOT_FIELDS) -> list:
+        """the same Search on every server, as snapshot rows with their Server and Version"""
+        def _search(session, version):
+            self._prime(session, version, SearchRootKey)
+            _results = session.Search(SearchRootKey, SearchString=SearchString, ObjectFilter=ObjectFilter,
+                                      FieldNames=FieldNames, Recursive=Recursive, GetFullObjects=GetFullObjects)
+            return [_item.snapshot(fields) for _item in _results]
+
+        return self._merge_rows(self.run(_search))
+
+    def snapshot(self, keys, lite: bool = True, fields=SNAPSHOT_FIELDS) -> list:
+        """
+        the same fields of the objects `keys` (paths, since IDs differ from one server to the next) read on every
+        server, spread over the sessions of each pool. A key missing from a server only loses that row
+        """
+        keys = list(keys)
+
+        def _snapshot(session, version, chunk):
+            _rows = []
+            for _key in chunk:
+                try:
+                    _rows.append(session.get_object(_key, lite=lite).snapshot(fields))
+                except Exception as e:
+                    logging.debug(f"{_key} could not be read: {e}")
+            return _rows
+
+        _futures = {}
+        for _key, _pool in self.pools.items():
+            _chunks = [keys[idx::_pool.size] for idx in range(_pool.size)]
+            _futures[_key] = [_pool.submit(_snapshot, _key[1], _chunk) for _chunk in _chunks if _chunk]
+        return self._merge_rows(self._gather(_futures, merge=lambda results: [_row for _part in results
+                                                                               for _row in _part]))
+
+    def instances(self, key=None, Count: int = 100, InstanceStateFilter: int = 65535, ShowOldestFirst: bool = True,
+                  StartDateTime: str = None, EndDateTime: str = None, fields=INSTANCE_FIELDS) -> list:
+        """the instances of `key` (a path), or of the whole scheduler, on every server"""
+        def _instances(session, version):
+            _obj = session if key is None else session.get_object(key, lite=True)
+            _results = _obj.GetInstances(Count=Count, InstanceStateFilter=InstanceStateFilter,
+                                         ShowOldestFirst=ShowOldestFirst, StartDateTime=StartDateTime,
+                                         EndDateTime=EndDateTime)
+            return [_raw_snapshot(_item, fields) for _item in _results]
+
+        return self._merge_rows(self.run(_instances))
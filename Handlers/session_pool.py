@@ -0,0 +1,207 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, as_completed
+
+from Handlers.connection_handler import ABConnectionManager
+
+
+def _co_initialize():
+    """COM objects live in the apartment of the thread that created them, so every worker thread has to initialize its
+    own apartment before it creates its connection. pywin32 is only available on Windows"""
+    try:
+        import pythoncom
+    except ImportError:
+        return None
+    pythoncom.CoInitialize()
+    return pythoncom
+
+
+class RateLimiter(object):
+    """
+    Token bucket shared by every thread that calls acquire(). Keeps the pool from hammering the scheduler with more than
+    `calls_per_second` calls, with bursts of at most `burst` calls
+
+    A `calls_per_second` of None or 0 disables the limit
+    """
+
+    def __init__(self, calls_per_second: float = None, burst: int = 1):
+        self.calls_per_second = calls_per_second
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'RateLimiter(calls_per_second={self.calls_per_second}, burst={self.burst})'
+
+    def acquire(self):
+        if not self.calls_per_second:
+            return
+        while True:
+            with self._lock:
+                _now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (_now - self._last) * self.calls_per_second)
+                self._last = _now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                _wait = (1 - self._tokens) / self.calls_per_second
+            time.sleep(_wait)
+
+
+class Progress(object):
+    """Thread-safe completion counter that logs progress and throughput every `log_every` seconds"""
+
+    def __init__(self, total: int = None, label: str = 'objects', log_every: float = 10.0):
+        self.total = total
+        self.label = label
+        self.log_every = log_every
+        self.succeeded = 0
+        self.failed = 0
+        self.start = time.monotonic()
+        self._last_log = self.start
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'Progress({self.done}/{self.total} {self.label}, {self.rate:.2f}/s)'
+
+    @property
+    def done(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    @property
+    def rate(self) -> float:
+        """completed items per second"""
+        _elapsed = self.elapsed
+        return self.done / _elapsed if _elapsed > 0 else 0.0
+
+    def update(self, ok: bool = True):
+        with self._lock:
+            if ok:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            _now = time.monotonic()
+            if _now - self._last_log >= self.log_every:
+                self._last_log = _now
+                logging.info(self.__repr__())
+
+    def summary(self) -> dict:
+        return {'total': self.total, 'succeeded': self.succeeded, 'failed': self.failed,
+                'elapsed_seconds': round(self.elapsed, 3), 'per_second': round(self.rate, 3)}
+
+
+class SessionPool(object):
+    """
+    A fixed number of worker threads that each own a connection to the same ActiveBatch server. Work is handed to the
+    pool as a callable that receives the worker's JobScheduler as its first argument, which keeps every COM object
+    inside the apartment of the thread that created it
+
+    with SessionPool('activebatch', 12, size=4, calls_per_second=20) as pool:
+        future = pool.submit(lambda ab, key: ab.get_object(key).Name, '/Finance')
+        for key, name, error in pool.map(lambda ab, key: ab.get_object(key).Name, keys):
+            ...
+
+    Never hand objects returned by one worker to a different thread; read what you need inside the callable and return
+    plain Python values instead
+    """
+
+    def __init__(self, server: str = 'activebatch', version: int = None, size: int = 4,
+                 calls_per_second: float = None, dispatch=None):
+        self.server = server
+        self.version = version
+        self.size = size
+        self.dispatch = dispatch
+        self.rate_limiter = RateLimiter(calls_per_second, burst=size)
+        self._tasks = queue.Queue()
+        self._threads = []
+
+    def __repr__(self):
+        return f'SessionPool(server={self.server}, version={self.version}, size={self.size})'
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connection(self):
+        return ABConnectionManager(self.server, self.version, dispatch=self.dispatch)
+
+    def _worker(self, ready: Future):
+        _pythoncom = _co_initialize()
+        try:
+            with self._connection() as session:
+                ready.set_result(True)
+                while True:
+                    _task = self._tasks.get()
+                    if _task is None:
+                        break
+                    _future, _fn, _args, _kwargs = _task
+                    if not _future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        self.rate_limiter.acquire()
+                        _future.set_result(_fn(session, *_args, **_kwargs))
+                    except Exception as e:
+                        _future.set_exception(e)
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logging.exception(e, exc_info=True)
+        finally:
+            if _pythoncom is not None:
+                _pythoncom.CoUninitialize()
+
+    def start(self):
+        """starts the workers and waits until every one of them is connected"""
+        _ready = []
+        for idx in range(self.size):
+            _future = Future()
+            _thread = threading.Thread(target=self._worker, args=(_future,), name=f'{self.server}-session-{idx}',
+                                       daemon=True)
+            _thread.start()
+            self._threads.append(_thread)
+            _ready.append(_future)
+        try:
+            for _future in _ready:
+                _future.result()
+        except Exception:
+            self.close()
+            raise
+        logging.debug(f'{self.__repr__()} started')
+
+    def close(self):
+        for _ in self._threads:
+            self._tasks.put(None)
+        for _thread in self._threads:
+            _thread.join()
+        self._threads = []
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """runs fn(session, *args, **kwargs) on the next available worker"""
+        _future = Future()
+        self._tasks.put((_future, fn, args, kwargs))
+        return _future
+
+    def map(self, fn, items, progress: Progress = None):
+        """
+        Runs fn(session, item) for every item and yields (item, result, exception) in completion order. Failures don't
+        stop the other items, they're handed back so the caller can decide what to do with them
+        """
+        _futures = {self.submit(fn, item): item for item in items}
+        for _future in as_completed(_futures):
+            _item = _futures[_future]
+            _error = _future.exception()
+            _result = None if _error is not None else _future.result()
+            if progress is not None:
+                progress.update(_error is None)
+            yield _item, _result, _error
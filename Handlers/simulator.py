@@ -0,0 +1,741 @@
+"""
+Pure-Python stand-in for the ActiveBatch.AbatJobScheduler COM object, used for scale testing and benchmarks
+
+scheduler = SimulatedScheduler(folders=20, depth=3, plans_per_folder=10, jobs_per_plan=20, latency=0.0005)
+with ABConnectionManager('simulated', 12, dispatch=scheduler.dispatch) as ab:
+    ab.Search('/', GetFullObjects=True)
+
+The tree is generated from a seed so that every run sees the same objects. Only the members that Objects.api actually
+uses are implemented. Every method call made on the scheduler or on one of its objects is counted in `calls` and
+delayed by `latency` seconds; plain attribute reads are free
+"""
+import fnmatch
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from xml.etree import ElementTree
+
+from Objects.api import (EXPORT_ASSOCIATION_TAG, EXPORT_NAME_ATTRIBUTE, EXPORT_OBJECT_TAG, EXPORT_REFERENCE_ATTRIBUTE,
+                         EXPORT_TYPE_ATTRIBUTE, com_error)
+from Objects.enumerations import ObjectType
+
+OT_JOB = ObjectType('abatOT_Job').code
+OT_PLAN = ObjectType('abatOT_Plan').code
+OT_SCHEDULE = ObjectType('abatOT_Schedule').code
+OT_CALENDAR = ObjectType('abatOT_Calendar').code
+OT_USERACCOUNT = ObjectType('abatOT_UserAccount').code
+OT_ALERTOBJECT = ObjectType('abatOT_AlertObject').code
+OT_FOLDER = ObjectType('abatOT_Folder').code
+
+# ObjectType code -> Search ObjectFilter bit (see the docstring of AllMethods.Search)
+OBJECT_FILTERS = {ObjectType(_name).code: _bit for _name, _bit in (
+    ('abatOT_Job', 1), ('abatOT_Plan', 2), ('abatOT_Queue', 4), ('abatOT_GenericQueue', 8), ('abatOT_Schedule', 16),
+    ('abatOT_Calendar', 32), ('abatOT_UserAccount', 64), ('abatOT_AlertObject', 128), ('abatOT_ResourceObject', 256),
+    ('abatOT_Reference', 512), ('abatOT_ServiceLibrary', 1024), ('abatOT_Folder', 2048), ('abatOT_ObjectList', 4096))}
+
+# the names the simulator exports types under, ObjectType names without their prefix
+_TYPE_NAMES = {_code: ObjectType(_code).name[len('abatOT_'):]
+               for _code in (OT_JOB, OT_PLAN, OT_SCHEDULE, OT_CALENDAR, OT_USERACCOUNT, OT_ALERTOBJECT, OT_FOLDER)}
+_TYPE_CODES = {_name: _code for _code, _name in _TYPE_NAMES.items()}
+# attributes only some types have, which is what Objects.api probes to tell Folders from Plans on V9
+_TYPE_ATTRIBUTES = {OT_JOB: {'DisableTemplateOnError': False},
+                    OT_PLAN: {'DisableTemplateOnError': False, 'ReplacePermissionsOnChildObjects': False},
+                    OT_FOLDER: {'ReplacePermissionsOnChildObjects': False}}
+_CONTAINERS = (OT_FOLDER, OT_PLAN)
+COUNTERS = ('InstancesCompleted', 'InstancesFailed', 'InstancesExecuting', 'InstancesWaiting')
+_EPOCH = datetime(2020, 1, 1)
+_MISSING = object()
+
+
+class _ComObject(object):
+    """base of everything the simulator hands out, marked so that Handlers.com_trace records it as a COM object"""
+
+    __slots__ = ()
+    _com_object_ = True
+
+
+def _not_found(key):
+    return com_error(-2147352567, 'Exception occurred.', (0, 'AbatJobScheduler', f"Object '{key}' not found", None,
+                                                           0, -2147467259), None)
+
+
+class SimulatedObject(_ComObject):
+    """
+    One ActiveBatch object. The attributes every object has are slots to keep a million of them affordable, the ones
+    that only some types have (schedule specs, job command lines, ...) live in `properties`
+    """
+
+    __slots__ = ('_sim', 'ID', 'Name', 'Label', 'ObjectType', 'Parent', 'RevisionID', 'Enabled', 'Owner', 'Tags',
+                 'CreationDateTime', 'children', 'properties', 'schedules', 'calendars', '_dirty')
+
+    def __init__(self, sim, object_id: int, object_type: int, name: str, parent=None):
+        # straight to the slots, __setattr__ would flag the new object as dirty
+        _set = object.__setattr__
+        _set(self, '_sim', sim)
+        _set(self, 'ID', object_id)
+        _set(self, 'Name', name)
+        _set(self, 'Label', name)
+        _set(self, 'ObjectType', object_type)
+        _set(self, 'Parent', parent)
+        _set(self, 'RevisionID', 1)
+        _set(self, 'Enabled', True)
+        _set(self, 'Owner', 'ASCI\\svc_batch')
+        _set(self, 'Tags', '')
+        _set(self, 'CreationDateTime', _EPOCH)
+        _set(self, 'children', {} if object_type in _CONTAINERS else None)
+        _set(self, 'properties', {})
+        _set(self, 'schedules', [])
+        _set(self, 'calendars', [])
+        _set(self, '_dirty', False)
+
+    def __repr__(self):
+        return f"SimulatedObject({self.ID}, {self.FullPath})"
+
+    def __getattr__(self, name):
+        # only reached for names that aren't slots
+        _properties = object.__getattribute__(self, 'properties')
+        if name in _properties:
+            return _properties[name]
+        _defaults = _TYPE_ATTRIBUTES.get(object.__getattribute__(self, 'ObjectType'), {})
+        if name in _defaults:
+            return _defaults[name]
+        if name == 'Description':
+            return ''
+        raise AttributeError(f"{_TYPE_NAMES.get(self.ObjectType, self.ObjectType)} has no attribute '{name}'")
+
+    def __setattr__(self, name, value):
+        if name in _EDITABLE or name not in _SLOTS:
+            # what UndoPendingChanges goes back to
+            _pending = self._sim.pending_changes.setdefault(self.ID, {})
+            if name not in _pending:
+                _pending[name] = getattr(self, name) if name in _SLOTS else self.properties.get(name, _MISSING)
+        if name in _SLOTS:
+            if name == 'Name' and self.Parent is not None and self.Parent.children.get(self.Name) is self:
+                # keep the parent's {name: child} lookup in step with the rename
+                del self.Parent.children[self.Name]
+                self.Parent.children[value] = self
+            object.__setattr__(self, name, value)
+            if name in _EDITABLE:
+                object.__setattr__(self, '_dirty', True)
+        else:
+            self.properties[name] = value
+            self._dirty = True
+
+    @property
+    def ParentID(self) -> int:
+        return self.Parent.ID if self.Parent is not None else 0
+
+    @property
+    def FullPath(self) -> str:
+        _names = []
+        _obj = self
+        while _obj.Parent is not None:  # the root itself has no name
+            _names.append(_obj.Name)
+            _obj = _obj.Parent
+        return '/' + '/'.join(reversed(_names))
+
+    @property
+    def Path(self) -> str:
+        return self.Parent.FullPath if self.Parent is not None else '/'
+
+    @property
+    def LastInstanceExecutionDateTime(self) -> datetime:
+        if self.ObjectType not in (OT_JOB, OT_PLAN):
+            raise AttributeError('LastInstanceExecutionDateTime')
+        if self.ID in self._sim.run_times:
+            return self._sim.run_times[self.ID][0]
+        return self._sim.now - timedelta(minutes=self.ID % 1440)
+
+    @property
+    def NextScheduledExecutionDateTime(self) -> datetime:
+        if self.ObjectType not in (OT_JOB, OT_PLAN):
+            raise AttributeError('NextScheduledExecutionDateTime')
+        if self.ID in self._sim.run_times:
+            return self._sim.run_times[self.ID][1]
+        return self._sim.now + timedelta(minutes=(self.ID * 7) % 1440)
+
+    def walk(self):
+        """this object and everything under it, depth first"""
+        _stack = [self]
+        while _stack:
+            _obj = _stack.pop()
+            yield _obj
+            if _obj.children:
+                _stack.extend(reversed(list(_obj.children.values())))
+
+    # COM methods
+
+    def Enable(self):
+        self._sim.call('Enable')
+        self.Enabled = True
+        self._commit()
+
+    def Disable(self):
+        self._sim.call('Disable')
+        self.Enabled = False
+        self._commit()
+
+    def IsDirty(self) -> bool:
+        self._sim.call('IsDirty')
+        return self._dirty
+
+    def Update(self):
+        self._sim.call('Update')
+        if not self.Name:
+            raise com_error(-2147352567, 'Exception occurred.',
+                            (0, 'AbatJobScheduler', f"Object {self.ID} can't have an empty name", None, 0, 0), None)
+        self._commit()
+
+    def RefreshData(self):
+        self._sim.call('RefreshData')
+
+    def _commit(self):
+        object.__setattr__(self, 'RevisionID', self.RevisionID + 1)
+        self._clean()
+
+    def _clean(self):
+        object.__setattr__(self, '_dirty', False)
+        self._sim.pending_changes.pop(self.ID, None)
+
+    def _undo(self):
+        for _name, _value in self._sim.pending_changes.pop(self.ID, {}).items():
+            if _name not in _SLOTS:
+                if _value is _MISSING:
+                    self.properties.pop(_name, None)
+                else:
+                    self.properties[_name] = _value
+            elif _name == 'Name':
+                self.Name = _value  # through __setattr__, which keeps the parent's lookup in step
+            else:
+                object.__setattr__(self, _name, _value)
+        self._clean()
+
+    def GetObjectsLite(self, Filter: int = 65535):
+        self._sim.call('GetObjectsLite')
+        return [_child for _child in (self.children or {}).values()
+                if OBJECT_FILTERS.get(_child.ObjectType, 0) & Filter]
+
+    def GetAssociatedSchedulesObjectId(self):
+        self._sim.call('GetAssociatedSchedulesObjectId')
+        return list(self.schedules)
+
+    def GetAssociatedSchedules(self):
+        self._sim.call('GetAssociatedSchedules')
+        return [self._sim.objects[_id] for _id in self.schedules]
+
+    def GetAssociatedCalendarsObjectId(self):
+        self._sim.call('GetAssociatedCalendarsObjectId')
+        return list(self.calendars)
+
+    def GetAssociatedAlertObjects(self):
+        self._sim.call('GetAssociatedAlertObjects')
+        return []
+
+    def GetAssociatedJobs(self):
+        self._sim.call('GetAssociatedJobs')
+        return self._sim.associated_jobs(self)
+
+    def TimeSpec_GetExactTimes(self):
+        self._sim.call('TimeSpec_GetExactTimes')
+        return [_EPOCH.replace(hour=_h, minute=_m) for _h, _m in self.properties.get('ExactTimes', [])]
+
+    def GetInstances(self, Count=100, InstanceStateFilter=65535, ShowOldestFirst=True, StartDateTime='',
+                     EndDateTime=''):
+        self._sim.call('GetInstances')
+        return self._sim.instances([self], Count)
+
+    def Trigger3(self, QueueName='', JobParameters='', Flags=0, Username='', Password='', Variables='', Reserved=''):
+        self._sim.call('Trigger3')
+        _instance_id = self._sim.next_instance_id()
+        with self._sim.lock:
+            self._sim.triggers.append((self.ID, _instance_id, {_v.Name: _v.Value for _v in Variables or ()}))
+        return _instance_id
+
+    def GetVariables(self):
+        self._sim.call('GetVariables')
+        return _variables(self.properties.get('Variables', {}))
+
+    def FlushInstances(self):
+        self._sim.call('FlushInstances')
+        self.properties['InstancesFlushed'] = self._sim.now
+
+    def ResetCounters(self):
+        self._sim.call('ResetCounters')
+        self.properties['CountersReset'] = self._sim.now
+        self._sim.counter_values.pop(self.ID, None)
+
+    def GetCounters(self):
+        self._sim.call('GetCounters')
+        return self._sim.counters(self)
+
+    def Delete(self, ForceDelete=False):
+        self._sim.call('Delete')
+        self._sim.recycle(self)
+
+    def DeleteEx(self, ForceDelete=False, PermenentlyDelete=False):
+        self._sim.call('DeleteEx')
+        self._sim.recycle(self, purge=PermenentlyDelete)
+
+    def HasPermission(self, PermissionMask: int) -> bool:
+        self._sim.call('HasPermission')
+        _obj = self
+        while 'GrantedMask' not in _obj.properties and _obj.Parent is not None:
+            _obj = _obj.Parent  # permissions are inherited unless an object has its own
+        _granted = _obj.properties.get('GrantedMask', self._sim.granted_mask)
+        return _granted & PermissionMask == PermissionMask
+
+
+_SLOTS = frozenset(SimulatedObject.__slots__)
+_EDITABLE = frozenset(('Name', 'Label', 'Enabled', 'Owner', 'Tags'))
+
+
+class SimulatedVariable(_ComObject):
+    __slots__ = ('Name', 'Value', 'AccessType', 'Description')
+
+    def __init__(self, name, value, access_type=1, description=''):
+        self.Name = name
+        self.Value = value
+        self.AccessType = access_type
+        self.Description = description
+
+
+class SimulatedVariables(_ComObject):
+    """the 'Variables' collection created by CreateObject, filled with Add() to be passed to Trigger3"""
+
+    def __init__(self):
+        self.items = []
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def Add(self, Variable):
+        self.items.append(Variable)
+
+
+def _variables(definitions: dict) -> list:
+    """{name: (value, access type)} as the collection GetVariables returns, 1 is public and 2 is private"""
+    return [SimulatedVariable(_name, _value, _access) for _name, (_value, _access) in definitions.items()]
+
+
+class SimulatedCounter(_ComObject):
+    __slots__ = ('Name', 'Value')
+
+    def __init__(self, name, value):
+        self.Name = name
+        self.Value = value
+
+
+class SimulatedInstance(_ComObject):
+    __slots__ = ('ID', 'Name', 'FullPath', 'State', 'ExecutionDateTime', 'ObjectID')
+
+    def __init__(self, instance_id, obj, state, executed):
+        self.ID = instance_id
+        self.Name = obj.Name
+        self.FullPath = obj.FullPath
+        self.ObjectID = obj.ID
+        self.State = state
+        self.ExecutionDateTime = executed
+
+
+class SimulatedRecycleBin(_ComObject):
+    """the deleted objects, kept with their subtree until they're purged"""
+
+    def __init__(self, sim):
+        self._sim = sim
+        self.objects = {}  # {id: SimulatedObject}, the deleted objects themselves and not what was under them
+
+    def GetObjectsLite(self, Filter: int = 65535):
+        self._sim.call('GetObjectsLite')
+        return [_obj for _obj in self.objects.values() if OBJECT_FILTERS.get(_obj.ObjectType, 0) & Filter]
+
+    def PurgeObject(self, option):
+        self._sim.call('PurgeObject')
+        with self._sim.lock:
+            if self.objects.pop(int(option), None) is None:
+                raise _not_found(option)
+
+
+class SimulatedExport(_ComObject):
+    """the 'Export' object created by CreateObject, turns a subtree into XML"""
+
+    def __init__(self, sim):
+        self._sim = sim
+
+    def Export(self, ObjectKey):
+        self._sim.call('Export')
+        return ElementTree.tostring(self._sim.to_xml(self._sim.resolve(ObjectKey)), encoding='unicode')
+
+
+class SimulatedImport(_ComObject):
+    """the 'Import' object created by CreateObject, rebuilds an exported subtree under a container"""
+
+    def __init__(self, sim):
+        self._sim = sim
+
+    def Import(self, DestinationKey, Xml):
+        self._sim.call('Import')
+        with self._sim.lock:
+            self._sim.from_xml(ElementTree.fromstring(Xml), self._sim.resolve(DestinationKey))
+
+
+class SimulatedScheduler(_ComObject):
+    """
+    A generated tree of `folders` top level folders, each nesting `depth` levels of subfolders with `subfolders`
+    children each. Every folder holds `plans_per_folder` plans of `jobs_per_plan` jobs and `schedules_per_folder`
+    schedules; `calendars` calendars and `user_accounts` user accounts live in /Shared
+
+    The total number of objects is available as len(scheduler) once it's built, e.g. folders=50, subfolders=4,
+    plans_per_folder=10, jobs_per_plan=20 gives 53,509 objects with depth=2 and 224,709 with depth=3
+
+    `v9_errata` makes GetObjectType report Folders as Plans, which is what ActiveBatch V9 and older do
+    """
+
+    def __init__(self, folders: int = 10, depth: int = 1, subfolders: int = 3, plans_per_folder: int = 5,
+                 jobs_per_plan: int = 10, schedules_per_folder: int = 3, calendars: int = 5, user_accounts: int = 3,
+                 latency: float = 0.0, seed: int = 0, v9_errata: bool = False):
+        self.Name = 'SimulatedScheduler'
+        self.latency = latency
+        self.v9_errata = v9_errata
+        self.now = datetime.now().replace(microsecond=0)
+        self.calls = Counter()
+        self.objects = {}
+        self.lock = threading.RLock()
+        self._ids = 0
+        self._instance_ids = 0
+        self._rng = random.Random(seed)
+        self.root = SimulatedObject(self, 0, OT_FOLDER, '')
+        self.variables = {'Environment': ('PROD', 1), 'SmtpServer': ('smtp.corp.local', 1)}
+        self.granted_mask = 6 | 8 | 64 | 65536  # what the connected user may do where nothing else is granted
+        self.recycle_bin = SimulatedRecycleBin(self)
+        self.pending_changes = {}  # {id: {attribute: value before the first change since the last Update}}
+        self.run_times = {}  # {id: (last run, next run)} to use instead of the generated ones
+        self.counter_values = {}  # {id: {counter: value}}, kept apart from the definitions since they aren't exported
+        self.triggers = []  # (id, instance id, {variable: value}) of every Trigger3
+        self._generate(folders, depth, subfolders, plans_per_folder, jobs_per_plan, schedules_per_folder, calendars,
+                       user_accounts)
+        logging.info(f"Simulated scheduler generated with {len(self.objects)} objects")
+
+    def __repr__(self):
+        return f"SimulatedScheduler(objects={len(self.objects)}, latency={self.latency})"
+
+    def __len__(self):
+        return len(self.objects)
+
+    def dispatch(self, progid: str = None):
+        """pass this as the `dispatch` of ABConnectionManager, every connection shares the same simulated server"""
+        return self
+
+    def call(self, name: str):
+        with self.lock:
+            self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def reset_calls(self):
+        with self.lock:
+            self.calls = Counter()
+
+    # tree generation and lookups
+
+    def new_object(self, object_type: int, name: str, parent=None) -> SimulatedObject:
+        with self.lock:
+            self._ids += 1
+            _obj = SimulatedObject(self, self._ids, object_type, name, parent)
+            _obj.CreationDateTime = _EPOCH + timedelta(minutes=self._ids)
+            self.objects[_obj.ID] = _obj
+            if parent is not None:
+                parent.children[name] = _obj
+        return _obj
+
+    def _schedule(self, parent, idx):
+        _obj = self.new_object(OT_SCHEDULE, f'Schedule{idx}', parent)
+        _rng = self._rng
+        _day_type = _rng.choice((1, 2, 3))
+        _time_type = _rng.choice((1, 2, 3))
+        _props = {'DaySpec_Type': _day_type, 'TimeSpec_Type': _time_type, 'CalendarType': 1,
+                  'DaySpec_DailyInterval': _rng.choice((1, 1, 2)),
+                  'DaySpec_WeeklyDaysOfWeek': _rng.choice((62, 2, 34, 127)),
+                  'DaySpec_WeeklyInterval': 1,
+                  'DaySpec_MonthlyType': _rng.choice((1, 2, 3)),
+                  'DaySpec_MonthlyInterval': 1,
+                  'DaySpec_MonthlyDayOfMonth': _rng.randint(1, 28),
+                  'DaySpec_MonthlyInstance': _rng.randint(1, 5),
+                  'DaySpec_MonthlyDayOfWeek': _rng.randint(1, 9),
+                  'DaySpec_MonthlyDaySeries': '1,15',
+                  'TimeSpec_Hours': _rng.randint(0, 23),
+                  'TimeSpec_Minutes': _rng.choice((0, 15, 30, 45)),
+                  'TimeSpec_Interval': _rng.choice((5, 10, 15, 30)),
+                  'ExactTimes': [(_rng.randint(0, 23), _rng.choice((0, 30))) for _ in range(_rng.randint(1, 3))]}
+        _obj.properties.update(_props)
+        return _obj
+
+    def _folder(self, parent, name, level, depth, subfolders, plans_per_folder, jobs_per_plan, schedules_per_folder):
+        _folder = self.new_object(OT_FOLDER, name, parent)
+        _folder.properties['Variables'] = {'BatchRoot': (f'\\\\SRV01\\batch\\{name}', 1)}
+        _schedules = [self._schedule(_folder, idx) for idx in range(schedules_per_folder)]
+        for _p in range(plans_per_folder):
+            _plan = self.new_object(OT_PLAN, f'Plan{_p}', _folder)
+            if _p % 3 == 0:
+                # every third plan overrides the scheduler's Environment and keeps a private variable of its own
+                _plan.properties['Variables'] = {'Environment': ('UAT', 1), 'PlanToken': (f'{name}.{_p}', 2)}
+            for _j in range(jobs_per_plan):
+                _job = self.new_object(OT_JOB, f'Job{_j}', _plan)
+                _server = f'SRV{self._rng.randint(1, 40):02d}'
+                _job.properties.update({
+                    'CommandLine': f'\\\\{_server}\\batch\\{name}\\{_plan.Name}_{_job.Name}.cmd',
+                    'WorkingDirectory': f'\\\\{_server}\\batch\\{name}',
+                    'QueueName': f'Queue{self._rng.randint(1, 8)}',
+                    'UserAccountID': self._rng.choice(self._accounts).ID if self._accounts else 0,
+                    'QueueObjectID': 0})
+                if _schedules:
+                    _job.schedules = [self._rng.choice(_schedules).ID]
+            if _schedules:
+                _plan.schedules = [self._rng.choice(_schedules).ID]
+            if self._calendars:
+                _plan.calendars = [self._rng.choice(self._calendars).ID]
+        if level < depth:
+            for idx in range(subfolders):
+                self._folder(_folder, f'{name}_{idx}', level + 1, depth, subfolders, plans_per_folder, jobs_per_plan,
+                             schedules_per_folder)
+        return _folder
+
+    def _generate(self, folders, depth, subfolders, plans_per_folder, jobs_per_plan, schedules_per_folder, calendars,
+                  user_accounts):
+        _shared = self.new_object(OT_FOLDER, 'Shared', self.root)
+        self._calendars = [self.new_object(OT_CALENDAR, f'Calendar{idx}', _shared) for idx in range(calendars)]
+        self._accounts = [self.new_object(OT_USERACCOUNT, f'svc_account{idx}', _shared)
+                          for idx in range(user_accounts)]
+        for idx in range(folders):
+            _folder = self._folder(self.root, f'Folder{idx}', 1, depth, subfolders, plans_per_folder, jobs_per_plan,
+                                   schedules_per_folder)
+            # every other folder pushes its permissions down to everything under it, and every fourth one is read only
+            _folder.properties['ReplacePermissionsOnChildObjects'] = idx % 2 == 0
+            if idx % 4 == 3:
+                _folder.properties['GrantedMask'] = 6
+
+    def resolve(self, key) -> SimulatedObject:
+        """an object by ID (int or numeric string) or by FullPath"""
+        if isinstance(key, SimulatedObject):
+            return key
+        _key = str(key)
+        if _key.lstrip('-').isdigit():
+            _obj = self.objects.get(int(_key))
+        elif _key in ('', '/'):
+            _obj = self.root
+        else:
+            _obj = self.root
+            for _name in _key.strip('/').split('/'):
+                _obj = (_obj.children or {}).get(_name)
+                if _obj is None:
+                    break
+        if _obj is None:
+            raise _not_found(key)
+        return _obj
+
+    def recycle(self, obj, purge: bool = False):
+        """deletes `obj` and everything under it, leaving `obj` in the recycle bin unless it's purged"""
+        with self.lock:
+            del obj.Parent.children[obj.Name]
+            for _obj in list(obj.walk()):
+                self.objects.pop(_obj.ID, None)
+            if not purge:
+                # like a server that updates it on delete, see Housekeeping's modified_as_deleted
+                obj.properties['ModifiedDateTime'] = datetime.now().replace(microsecond=0)
+                self.recycle_bin.objects[obj.ID] = obj
+
+    def counters(self, obj) -> list:
+        """the counters of `obj`, which move on by a few instances every time they're read"""
+        with self.lock:
+            _counters = self.counter_values.setdefault(obj.ID, dict.fromkeys(COUNTERS, 0))
+            _completed = self._rng.randint(0, 5)
+            _failed = 1 if self._rng.random() < 0.1 else 0
+            _counters['InstancesCompleted'] += _completed
+            _counters['InstancesFailed'] += _failed
+            _counters['InstancesExecuting'] = self._rng.randint(0, 3)
+            _counters['InstancesWaiting'] = self._rng.randint(0, 10)
+            return [SimulatedCounter(_name, _value) for _name, _value in _counters.items()]
+
+    def associated_jobs(self, obj) -> list:
+        _ids = []
+        for _candidate in self.objects.values():
+            if _candidate.ObjectType not in (OT_JOB, OT_PLAN):
+                continue
+            if obj.ID in _candidate.schedules or obj.ID in _candidate.calendars or \
+                    _candidate.properties.get('UserAccountID') == obj.ID:
+                _ids.append(_candidate.ID)
+        return _ids
+
+    def next_instance_id(self) -> int:
+        with self.lock:
+            self._instance_ids += 1
+            return 10 ** 9 + self._instance_ids
+
+    def instances(self, objects, count) -> list:
+        _instances = []
+        _schedulable = [_obj for _obj in objects if _obj.ObjectType in (OT_JOB, OT_PLAN)]
+        for idx in range(min(count, len(_schedulable) * 10)):
+            _obj = _schedulable[idx % len(_schedulable)]
+            _state = 128 if (_obj.ID + idx) % 17 == 0 else 256
+            _instances.append(SimulatedInstance(10 ** 8 + _obj.ID * 10 + idx % 10, _obj, _state,
+                                                self.now - timedelta(minutes=idx)))
+        return _instances
+
+    def to_xml(self, obj) -> ElementTree.Element:
+        _element = ElementTree.Element(EXPORT_OBJECT_TAG, {
+            EXPORT_TYPE_ATTRIBUTE: _TYPE_NAMES.get(obj.ObjectType, str(obj.ObjectType)), 'ID': str(obj.ID),
+            EXPORT_NAME_ATTRIBUTE: obj.Name, 'Label': obj.Label, 'RevisionID': str(obj.RevisionID),
+            'Enabled': str(obj.Enabled), 'Owner': obj.Owner, 'CreationDateTime': obj.CreationDateTime.isoformat()})
+        for _name, _value in sorted(obj.properties.items()):
+            if _name == 'Variables':
+                for _variable, (_value, _access) in sorted(_value.items()):
+                    ElementTree.SubElement(_element, 'Variable', {'Name': _variable, 'AccessType': str(_access)}
+                                           ).text = str(_value)
+                continue
+            ElementTree.SubElement(_element, 'Property', {'Name': _name}).text = str(_value)
+        for _tag, _ids in (('Schedule', obj.schedules), ('Calendar', obj.calendars)):
+            for _id in _ids:
+                ElementTree.SubElement(_element, EXPORT_ASSOCIATION_TAG,
+                                       {'Type': _tag, EXPORT_REFERENCE_ATTRIBUTE: str(_id)})
+        for _child in (obj.children or {}).values():
+            _element.append(self.to_xml(_child))
+        return _element
+
+    def from_xml(self, element, parent) -> SimulatedObject:
+        _obj = self.new_object(_TYPE_CODES[element.get(EXPORT_TYPE_ATTRIBUTE)], element.get(EXPORT_NAME_ATTRIBUTE),
+                               parent)
+        _obj.Label = element.get('Label')
+        _obj.Enabled = element.get('Enabled') == 'True'
+        for _child in element:
+            if _child.tag == 'Property':
+                _obj.properties[_child.get('Name')] = _child.text
+            elif _child.tag == 'Variable':
+                _obj.properties.setdefault('Variables', {})[_child.get('Name')] = (_child.text or '',
+                                                                                  int(_child.get('AccessType')))
+            elif _child.tag == EXPORT_ASSOCIATION_TAG:
+                (_obj.schedules if _child.get('Type') == 'Schedule' else _obj.calendars).append(
+                    int(_child.get(EXPORT_REFERENCE_ATTRIBUTE)))
+            elif _child.tag == EXPORT_OBJECT_TAG:
+                self.from_xml(_child, _obj)
+        _obj._clean()
+        return _obj
+
+    # AbatJobScheduler COM methods
+
+    def Connect(self, JobScheduler='', Username='', Password='', SavePassword=False):
+        self.call('Connect')
+
+    def Disconnect(self):
+        self.call('Disconnect')
+
+    def Search(self, SearchRootKey, SearchString='*', ObjectFilter=65535, FieldNames='AllFields', Recursive=True):
+        self.call('Search')
+        _root = self.resolve(SearchRootKey)
+        _fields = ('Name', 'Label') if FieldNames == 'AllFields' else tuple(FieldNames.split(','))
+        _pattern = SearchString.lower() if SearchString not in ('', '*') else None
+        if Recursive:
+            _candidates = _root.walk()
+        else:
+            _candidates = iter((_root.children or {}).values())
+        _results = []
+        for _obj in _candidates:
+            if _obj is _root or not OBJECT_FILTERS.get(_obj.ObjectType, 0) & ObjectFilter:
+                continue
+            if _pattern is not None and not any(fnmatch.fnmatchcase(str(getattr(_obj, _f, '')).lower(), _pattern)
+                                                for _f in _fields):
+                continue
+            _results.append(_obj)
+        return _results
+
+    def GetObjectType(self, ObjectKey):
+        self.call('GetObjectType')
+        _type = self.resolve(ObjectKey).ObjectType
+        if self.v9_errata and _type == OT_FOLDER:
+            return OT_PLAN
+        return _type
+
+    def GetAbatObject(self, ObjectKey):
+        self.call('GetAbatObject')
+        return self.resolve(ObjectKey)
+
+    def GetAbatObjectLite(self, ObjectKey):
+        self.call('GetAbatObjectLite')
+        return self.resolve(ObjectKey)
+
+    def GetObjectsLite(self, Filter: int = 65535):
+        self.call('GetObjectsLite')
+        return [_obj for _obj in self.root.children.values() if OBJECT_FILTERS.get(_obj.ObjectType, 0) & Filter]
+
+    def ObjectExists(self, ObjectKey) -> bool:
+        self.call('ObjectExists')
+        try:
+            self.resolve(ObjectKey)
+            return True
+        except com_error:
+            return False
+
+    def MoveObject(self, SourceKey, DestinationKey):
+        self.call('MoveObject')
+        with self.lock:
+            _obj, _destination = self.resolve(SourceKey), self.resolve(DestinationKey)
+            if _destination.children is None:
+                raise com_error(-2147352567, 'Exception occurred.',
+                                (0, 'AbatJobScheduler', f"'{DestinationKey}' is not a container", None, 0, 0), None)
+            del _obj.Parent.children[_obj.Name]
+            _obj.Parent = _destination
+            _destination.children[_obj.Name] = _obj
+            _obj._commit()
+
+    def AddObject(self, ParentKey, Object):
+        self.call('AddObject')
+        with self.lock:
+            _parent = self.resolve(ParentKey)
+            self._ids += 1
+            Object.ID = self._ids
+            Object.Parent = _parent
+            Object.CreationDateTime = self.now
+            _parent.children[Object.Name] = Object
+            self.objects[Object.ID] = Object
+            Object._clean()
+        return Object
+
+    def CreateObject(self, ObjectName):
+        self.call('CreateObject')
+        if ObjectName == 'Export':
+            return SimulatedExport(self)
+        if ObjectName == 'Import':
+            return SimulatedImport(self)
+        if ObjectName == 'Variables':
+            return SimulatedVariables()
+        if ObjectName == 'Variable':
+            return SimulatedVariable('', '')
+        if ObjectName not in _TYPE_CODES:
+            raise com_error(-2147352567, 'Exception occurred.',
+                            (0, 'AbatJobScheduler', f"'{ObjectName}' can't be created", None, 0, 0), None)
+        return SimulatedObject(self, 0, _TYPE_CODES[ObjectName], ObjectName)
+
+    def GetVariables(self):
+        self.call('GetVariables')
+        return _variables(self.variables)
+
+    def GetInstances(self, Count=100, InstanceStateFilter=65535, ShowOldestFirst=True, StartDateTime='',
+                     EndDateTime=''):
+        self.call('GetInstances')
+        return self.instances(list(self.root.walk()), Count)
+
+    def GetRecycleBin(self):
+        self.call('GetRecycleBin')
+        return self.recycle_bin
+
+    def GetCounters(self):
+        self.call('GetCounters')
+        return self.counters(self.root)
+
+    def UndoPendingChanges(self, ObjectID):
+        self.call('UndoPendingChanges')
+        self.resolve(ObjectID)._undo()
@@ -1 +1,13 @@
-__all__ = ['enumerations.py', 'api.py', '']
+import importlib
+
+__all__ = ['abat_collections', 'api', 'association_index', 'counters', 'drift', 'enumerations', 'exporter',
+           'housekeeping', 'instrumentation', 'late_runs', 'maintenance_window', 'permission_audit', 'query',
+           'schedule_fingerprint', 'schedule_names', 'trigger_dispatcher', 'unit_of_work', 'variables', 'xml_index']
+
+
+def __getattr__(name):
+    # `import Objects` stays free; a submodule is only imported the first time it's used as Objects.<name> (PEP 562,
+    # Python 3.7+; older versions need the usual `import Objects.<name>`)
+    if name in __all__:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
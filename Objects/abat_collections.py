@@ -0,0 +1,226 @@
+import logging
+from datetime import datetime
+from itertools import islice
+
+from Objects.variables import Variable
+
+
+def _dispatch(item):
+    from win32com.client import Dispatch
+    return Dispatch(item)
+
+
+def _chunks(collection, chunk_size: int):
+    """
+    Walks a COM collection `chunk_size` items at a time. Real COM collections are fetched through their IEnumVARIANT
+    so that every round trip to the server brings back a whole chunk, anything else (lists, simulated collections) is
+    simply iterated. So are the proxies of Handlers.com_trace, which record and replay the walk as a single iteration
+    since the enumerator isn't a COM object they could trace
+    """
+    _enum = None
+    # checked first, asking a RecordingProxy for _oleobj_ would go to the COM object and into the trace
+    if not getattr(type(collection), '_trace_proxy_', False) and hasattr(collection, '_oleobj_'):
+        try:
+            # win32com already wraps the enumerator (win32com.client.util.EnumVARIANT), whose Next wraps the items too
+            _enum = collection._NewEnum()
+            if not hasattr(_enum, 'Next'):
+                import pythoncom
+                _enum = _enum.QueryInterface(pythoncom.IID_IEnumVARIANT)
+        except Exception as e:
+            logging.warning(f"Could not get the enumerator of {collection!r}, it's read one item at a time: {e}")
+            _enum = None
+    if _enum is not None:
+        while True:
+            _chunk = _enum.Next(chunk_size)
+            if not _chunk:
+                return
+            # a bare IEnumVARIANT hands back bare IDispatch pointers, which need wrapping just like win32com would
+            yield [_dispatch(_item) if type(_item).__name__ == 'PyIDispatch' else _item for _item in _chunk]
+    else:
+        _iterator = iter(collection)
+        while True:
+            _chunk = list(islice(_iterator, chunk_size))
+            if not _chunk:
+                return
+            yield _chunk
+
+
+class AbatCollection(object):
+    """
+    Base class for the wrappers around the collection objects returned by the COM. The wrapper is a lazy view: nothing
+    is read from the COM until an item is asked for, and then only as far as that item, `chunk_size` items at a time.
+    That way taking the first 50 results of a big Search, or just their IDs, doesn't pay for the whole collection
+
+    The COM collections can only be walked through once and in order, so whatever has been read is kept and indexing,
+    slicing and iterating again don't go back to the COM
+
+    Subclasses override _item() to convert every element when it is handed out, and _id() to read its ID for ids()
+    """
+    chunk_size = 100
+
+    def __init__(self, collection, chunk_size: int = None):
+        self.collection = collection
+        self.chunk_size = chunk_size or self.chunk_size
+        self._raw = []  # the items read from the COM so far, unconverted
+        self._reader = None
+        self._exhausted = False
+        self._count = None
+
+    def __repr__(self):
+        _count = self._count if self._count is not None else f"{len(self._raw)}+"  # without going to the COM
+        return f"{type(self).__name__}({_count} items)"
+
+    def _fetch(self) -> bool:
+        """reads the next chunk from the COM, False once there's nothing left"""
+        if self._exhausted:
+            return False
+        if self._reader is None:
+            self._reader = _chunks(self.collection, self.chunk_size)
+        _chunk = next(self._reader, None)
+        if _chunk is None:
+            self._exhausted = True
+            self._count = len(self._raw)
+            return False
+        self._raw.extend(_chunk)
+        return True
+
+    def _fill(self, n: int):
+        while len(self._raw) < n and self._fetch():
+            pass
+
+    def __iter__(self):
+        idx = 0
+        while idx < len(self._raw) or self._fetch():
+            yield self._item(self._raw[idx])
+            idx += 1
+
+    def __len__(self):
+        if self._count is None:
+            # COM collections know their Count without being walked; anything else is read to the end
+            _count = getattr(self.collection, 'Count', None)
+            if isinstance(_count, int):
+                self._count = _count
+            else:
+                self._fill(float('inf'))
+        return self._count
+
+    def __bool__(self):
+        self._fill(1)
+        return bool(self._raw)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if (index.start or 0) >= 0 and index.stop is not None and index.stop >= 0 and (index.step or 1) > 0:
+                self._fill(index.stop)  # only as far as the slice goes
+            else:
+                self._fill(float('inf'))
+            return [self._item(_raw) for _raw in self._raw[index]]
+        if index < 0:
+            index += len(self)
+        self._fill(index + 1)
+        if not 0 <= index < len(self._raw):
+            raise IndexError(f"{type(self).__name__} index out of range")
+        return self._item(self._raw[index])
+
+    @property
+    def items(self) -> list:
+        return self.to_list()
+
+    @staticmethod
+    def _item(item):
+        return item
+
+    @staticmethod
+    def _id(item) -> int:
+        return int(item.ID)
+
+    def ids(self, limit: int = None) -> list:
+        """the IDs of the first `limit` items (all of them by default), read straight off the COM objects"""
+        if limit is None:
+            self._fill(float('inf'))
+        else:
+            self._fill(limit)
+        return [self._id(_raw) for _raw in self._raw[:limit]]
+
+    def to_list(self) -> list:
+        return list(self)
+
+    def stream(self):
+        """
+        Walks the collection once without keeping what was read, for a single pass over a collection too big to hold.
+        A view that has already been read from is iterated the usual way
+        """
+        if self._reader is not None:
+            yield from self
+            return
+        for _chunk in _chunks(self.collection, self.chunk_size):
+            for _raw in _chunk:
+                yield self._item(_raw)
+
+
+class ObjectsLite(AbatCollection):
+    """the collection of lite objects returned by Search, GetObjectsLite and GetInstances"""
+
+
+class ScheduleCollection(AbatCollection):
+    """GetAssociatedSchedules is documented to return an AbatSchedules collection, which is itself undocumented"""
+
+
+class JobAlerts(AbatCollection):
+    pass
+
+
+class AlertObjects(AbatCollection):
+    pass
+
+
+class AbatObjectIDs(AbatCollection):
+    @staticmethod
+    def _item(item):
+        return int(item)
+
+    @staticmethod
+    def _id(item) -> int:
+        return int(item)
+
+
+class AbatVariantItem(object):
+    """a single element of a variant collection, e.g. the dates returned by GetExactDates and TimeSpec_GetExactTimes"""
+
+    def __init__(self, item):
+        self.item = item
+        self.Value = getattr(item, 'Value', item)
+
+    def __repr__(self):
+        return f"AbatVariantItem({self.Value})"
+
+    @property
+    def DateTime(self) -> datetime:
+        # same conversion as AllAttributes.normalize_date, dates come back from the COM with a timezone portion
+        return datetime.strptime(str(self.Value)[:19], '%Y-%m-%d %H:%M:%S')
+
+
+class AbatVariantItems(AbatCollection):
+    @staticmethod
+    def _item(item):
+        return AbatVariantItem(item)
+
+
+class AbatVariables(AbatCollection):
+    """the Variables collection returned by GetVariables, handed out as variables.Variable"""
+
+    @staticmethod
+    def _item(item):
+        return Variable.from_com(item)
+
+    def to_dict(self) -> dict:
+        """{name: value}, the same shape build_collection takes"""
+        return {_variable.Name: _variable.Value for _variable in self}
+
+
+class AbatCounters(AbatCollection):
+    """the Counters collection returned by GetCounters, one item per counter with its Name and Value"""
+
+    def to_dict(self) -> dict:
+        """{name: value}"""
+        return {str(_counter.Name): _counter.Value for _counter in self}
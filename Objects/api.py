@@ -1,13 +1,45 @@
-import inspect
 import logging
 import re
+import sys
 from datetime import datetime, timedelta
+from time import perf_counter
 from typing import Union
 
-from pythoncom import com_error  # NOTE: ignore IDE errors as this exception class is dynamically created by Win32 COM
-
 import Objects.abat_collections as ab_col
 import Objects.enumerations as enum
+import Objects.variables as variables
+from Objects.instrumentation import instrumentation
+
+_COM_ERROR = []
+
+
+def _com_error():
+    """
+    pythoncom.com_error, imported the first time it's needed. Every job step starts a fresh Python, and pythoncom
+    (along with the pywintypes DLL it loads) is only needed once a COM call actually fails, so there's no reason to pay
+    for it on import. The except clauses below call this, which only happens while an exception is being handled
+    """
+    if not _COM_ERROR:
+        try:
+            from pythoncom import com_error  # NOTE: ignore IDE errors as this class is dynamically created by Win32 COM
+        except ImportError:
+            # pywin32 only exists on Windows; replayed traces and fake schedulers raise this stand-in instead, it
+            # takes the same (hresult, strerror, excepinfo, argerror) arguments
+            class com_error(Exception):
+                pass
+        _COM_ERROR.append(com_error)
+    return _COM_ERROR[0]
+
+
+def __getattr__(name):
+    # `from Objects.api import com_error` keeps working without importing pythoncom up front (PEP 562, Python 3.7+)
+    if name == 'com_error':
+        return _com_error()
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+if sys.version_info < (3, 7):
+    com_error = _com_error()  # module level __getattr__ is ignored before 3.7
 
 
 class Decorators:
@@ -40,7 +72,8 @@ class Decorators:
         in a way that's reusable and (relatively) easy to manage
 
         As a bonus, this whole wrapper can also serve as the logging facility for all the method calls and can be used
-        to wrap around and handle exceptions raised by the COM
+        to wrap around and handle exceptions raised by the COM, and it times every call for Objects.instrumentation
+        whenever that is enabled
         """
 
         def decorator(wrapped):
@@ -48,20 +81,21 @@ class Decorators:
                 __instance = self.cls
                 __funcname = wrapped.__name__
                 __clsname = type(__instance).__name__
-                if 'All' in ab_classes or __clsname in ab_classes:
-                    _sig = inspect.signature(wrapped)
-                    _binding = _sig.bind(self, *args, **kwargs)
-                    _arguments = _binding.arguments
-                    _argdict = dict(_arguments)
+                if Decorators.is_runnable(ab_classes, __clsname):
+                    _start = perf_counter() if instrumentation.enabled else None
+                    _failed = True
                     try:
                         _result = wrapped(self, *args, **kwargs)
+                        _failed = False
                         return _result
                     except AttributeError as e:
+                        _argdict = Decorators.arguments(wrapped, self, *args, **kwargs)
                         logging.warning(f"AttributeError was raised when calling {__funcname} using the args "
                                         f"{_argdict}")
                         logging.exception(e, exc_info=True)
                         raise
-                    except com_error as e:
+                    except _com_error() as e:
+                        _argdict = Decorators.arguments(wrapped, self, *args, **kwargs)
                         _msg = f"A COM error was encountered when attempting to run the <{__funcname}> method of the " \
                                f"<{__clsname}> class with the arguments {_argdict}. The error message is " \
                                f"'{e.args[2][2]}'"
@@ -71,6 +105,9 @@ class Decorators:
                     except Exception as e:
                         logging.exception(e, exc_info=True)
                         raise
+                    finally:
+                        if _start is not None:
+                            instrumentation.record(__clsname, __funcname, perf_counter() - _start, _failed)
                 else:
                     msg = f"Unsupported method <{__funcname}> for class <{__clsname}>. <{__funcname}> can " \
                           f"only be invoked by the following classes: {', '.join(ab_classes)}"
@@ -80,18 +117,94 @@ class Decorators:
                         logging.warning(msg)
                         raise
 
+            wrapper.ab_classes = ab_classes  # lets callers check support without calling the COM, see supports()
             return wrapper
 
         return decorator
 
+    @staticmethod
+    def arguments(wrapped, *args, **kwargs) -> dict:
+        """binds the arguments of a call to the parameter names of `wrapped`, only needed when a call fails"""
+        import inspect  # costs as much as the rest of this module to import, and only failed calls get here
+        return dict(inspect.signature(wrapped).bind(*args, **kwargs).arguments)
+
+    @staticmethod
+    def is_runnable(ab_classes, clsname: str) -> bool:
+        """the check performed by @Decorators.runnable before letting a class run a method"""
+        return 'All' in ab_classes or clsname in ab_classes
+
+
+# (server, version) pairs that were already warned about the V9 GetObjectType errata
+_ERRATA_WARNED = set()
+
+
+def _type_cache_key(key):
+    """IDs can be given as int or str, they share the same entry in JobScheduler.type_cache"""
+    try:
+        return int(key)
+    except (TypeError, ValueError):
+        return key
+
+
+# the attributes gathered by the README's get_dicts() example, used as the default for snapshot()
+SNAPSHOT_FIELDS = ('ID', 'Name', 'FullPath', 'ObjectType', 'Enabled', 'Owner', 'LastInstanceExecutionDateTime',
+                   'NextScheduledExecutionDateTime', 'CreationDateTime')
+
+# The layout of the XML export_xml returns that Objects.xml_index and Objects.drift split into one entry per object.
+# It's the one Handlers.simulator produces; nothing documents the real Export format, so an export that doesn't follow
+# it is taken as a single object and what's under it is exported object by object instead
+EXPORT_OBJECT_TAG = 'Object'  # an object, nested in the element of the Folder or Plan it's in
+EXPORT_NAME_ATTRIBUTE = 'Name'  # of an object element, the last part of its FullPath
+EXPORT_TYPE_ATTRIBUTE = 'Type'  # of an object element, e.g. 'Job'
+EXPORT_ASSOCIATION_TAG = 'Association'  # a Schedule or Calendar the object is associated with
+EXPORT_REFERENCE_ATTRIBUTE = 'ID'  # of an Association, the ID of what it points to
+
 
 class AllAttributes(object):
     def __init__(self, cls, obj):
         self.cls = cls
         self.obj = obj
 
+    def supports(self, name: str) -> bool:
+        """True if this object's class is allowed to run the attribute or method `name`, without calling it"""
+        return type(self.cls).class_supports(name)
+
+    @classmethod
+    def class_supports(cls, name: str) -> bool:
+        """same as supports(), for a class that hasn't been instantiated yet (see HybridObject)"""
+        _member = getattr(cls, name, None)
+        if isinstance(_member, property):
+            _member = _member.fget
+        _ab_classes = getattr(_member, 'ab_classes', None)
+        if _ab_classes is None:
+            return _member is not None
+        return Decorators.is_runnable(_ab_classes, cls.__name__)
+
+    def snapshot(self, fields=SNAPSHOT_FIELDS) -> dict:
+        """
+        Reads several attributes in one go and returns them as a plain dictionary. Attributes that are unsupported by
+        this class, or that the COM refuses to return, come back as None instead of raising
+
+        Plain values are also the only safe thing to hand over to a different thread, see Handlers.session_pool
+        """
+        # Plan's __getattr__ reaches into its lite object for the attributes the full object lacks
+        _fallback = hasattr(type(self), '__getattr__')
+        _snapshot = {}
+        for _field in fields:
+            _value = None
+            if self.supports(_field) or _fallback:
+                try:
+                    _value = getattr(self, _field)
+                except Exception as e:
+                    logging.debug(f"{_field} could not be read from {self.__repr__()}: {e}")
+            _snapshot[_field] = _value
+        return _snapshot
+
     @staticmethod
     def normalize_date(date):
+        if isinstance(date, datetime):
+            # pywintypes.datetime (pywin32 300+) is a datetime subclass, same result without going through a string
+            return datetime(date.year, date.month, date.day, date.hour, date.minute, date.second)
         date = date.__str__()  # convert into a parsable string representation
         date = date[:19]  # trim the timezone portion of the datetime string
         date = datetime.strptime(date, '%Y-%m-%d %H:%M:%S')  # convert to python native datetime object
@@ -362,15 +475,28 @@ class AllMethods:
 
     @Decorators.runnable(['JobScheduler'])
     def GetObjectType(self, ObjectKey):
+        """
+        The type of an object never changes, so whatever this resolves is cached on the session by ID (see
+        JobScheduler.type_cache). Paths are never cached, since a path can be reused by a different object once the
+        first one is deleted or renamed; clear_type_cache() forgets everything
+        """
         __version = self.cls.version
         __server = self.cls.server
+        __cache = self.cls.type_cache
+        __key = _type_cache_key(ObjectKey)
+        if isinstance(__key, int) and __key in __cache:
+            return __cache[__key]
         __otype = self.obj.GetObjectType(ObjectKey)
 
         # this entire block is a quick fix for the errant behavior in the GetObjectType method of the JobScheduler class
-        if __version <= 9:
-            if __otype == 3:  # only Folders and Plans return this type (in versions > 10)
-                __obj = self.cls.GetAbatObject(ObjectKey)
-                __dict = {'FullPath': __obj.FullPath, 'ID': __obj.ID}
+        if __version is not None and __version <= 9 and __otype == 3:
+            # only Folders and Plans return this type (in versions > 10)
+            __obj = self.cls.GetAbatObject(ObjectKey)
+            __dict = {'FullPath': __obj.FullPath, 'ID': __obj.ID}
+            if int(__dict['ID']) in __cache:
+                return __cache[int(__dict['ID'])]  # looked up by path, primed by ID
+            if (__server, __version) not in _ERRATA_WARNED:
+                _ERRATA_WARNED.add((__server, __version))
                 logging.warning(f"\n\n\tERRATA WARNING: The ActiveBatch documentation classifies Plans as an "
                                 f"ObjectType '3' and Folders as an ObjectType '14', but the actual observed behavior "
                                 f"is that these two objects return the same type '3'."
@@ -383,28 +509,33 @@ class AllMethods:
                                 f"\n\tThis patch works quite well and will only be performed if the version of "
                                 f"Activebatch you're connecting to is 9 or lower."
                                 f"\n\n\tThis warning was raised by the GetObjectType method when calling it on the "
-                                f"object {__dict}\n"
+                                f"object {__dict}. It is only shown once, JobScheduler.prime_type_cache() resolves "
+                                f"Folders and Plans in bulk instead of probing them one at a time\n"
                                 )
-                # trying my best to infer the proper type by looking at which attribute calls throw an exception
-                try:
-                    _ = __obj.DisableTemplateOnError  # only Plans and Jobs have this attribute
-                    return 3
-                except AttributeError:
-                    try:
-                        # only Plans and Folders have this attribute, but if the check preceding this fails and this
-                        # current check passes, then it has to be a Folder, else it's an unknown object so re-raise
-                        _ = __obj.ReplacePermissionsOnChildObjects
-                        return 14
-                    except AttributeError as e:
-                        logging.error('FATAL ERROR occured inside the version checking section of the runnable '
-                                      'decorator')
-                        logging.exception(e, exc_info=True)
-                        raise
             else:
-                return self.obj.GetObjectType(ObjectKey)
-
-        # if version >= 10, then perform normal operation
-        return self.obj.GetObjectType(ObjectKey)
+                logging.debug(f"Resolving the type of {__dict} around the V{__version} errata")
+            # trying my best to infer the proper type by looking at which attribute calls throw an exception
+            try:
+                _ = __obj.DisableTemplateOnError  # only Plans and Jobs have this attribute
+                __otype = 3
+            except AttributeError:
+                try:
+                    # only Plans and Folders have this attribute, but if the check preceding this fails and this
+                    # current check passes, then it has to be a Folder, else it's an unknown object so re-raise
+                    _ = __obj.ReplacePermissionsOnChildObjects
+                    __otype = 14
+                except AttributeError as e:
+                    logging.error('FATAL ERROR occured inside the version checking section of the runnable '
+                                  'decorator')
+                    logging.exception(e, exc_info=True)
+                    raise
+            __cache[int(__dict['ID'])] = __otype
+            return __otype
+
+        # if version >= 10, or the object is neither a Folder nor a Plan, then perform normal operation
+        if isinstance(__key, int):
+            __cache[__key] = __otype
+        return __otype
 
     @Decorators.runnable(
         ['AlertObjectLite', 'Calendar', 'Folder', 'JobScheduler', 'Plan', 'PlanLite', 'QueueLite', 'ReferenceLite',
@@ -461,8 +592,8 @@ class AllMethods:
          'RecycleBin']
     )
     def GetCounters(self):
-        # TODO returns a Counters collection object
-        return self.obj.GetCounters()
+        """point in time values of the counters of this object, see Objects.counters to sample them over time"""
+        return ab_col.AbatCounters(self.obj.GetCounters())
 
     @Decorators.runnable(['Job', 'Plan', 'Reference', 'JobScheduler'])
     def GetDependencies(self):
@@ -486,6 +617,11 @@ class AllMethods:
         _obj_collection = ab_col.ObjectsLite(self.obj.GetObjectsLite(Filter))
         return _obj_collection
 
+    @Decorators.runnable('JobScheduler')
+    def GetRecycleBin(self):
+        """The RecycleBin holding the deleted objects, list them with its GetObjectsLite"""
+        return RecycleBin(self.cls, self.obj.GetRecycleBin())
+
     @Decorators.runnable(
         ['Plan', 'Folder', 'JobScheduler', 'AlertObject', 'Calendar', 'IAbatObject', 'Job', 'ObjectList', 'Queue',
          'Reference', 'ResourceObject', 'Schedule', 'ServiceLibrary', 'tag', 'UserAccount']
@@ -497,9 +633,8 @@ class AllMethods:
 
     @Decorators.runnable(['Plan', 'Folder', 'JobScheduler', 'Job', 'JobHistory', 'Queue', 'Reference', 'UserAccount'])
     def GetVariables(self):
-        # TODO returns a collection of Variables, create a Variables class and have this method return a
-        # TODO list of those objects instead
-        return self.obj.GetVariables()
+        """the variables defined on this object (not the ones it inherits, see variables.VariableIndex)"""
+        return ab_col.AbatVariables(self.obj.GetVariables())
 
     @Decorators.runnable(
         ['Plan', 'Folder', 'AlertObject', 'Calendar', 'IAbatObject', 'Job', 'ObjectList', 'Queue', 'Reference',
@@ -595,6 +730,9 @@ class AllMethods:
         Syntax is very finnicky. Flags have to be int, Variables have to be object, else string. Cannot default to just
         NoneType objects
 
+        Variables can be given as a {name: value} dict, in which case it is turned into a Variables collection on
+        this object's connection first
+
         :param QueueName:
         :param JobParameters:
         :param Flags:
@@ -602,21 +740,19 @@ class AllMethods:
         :param Password:
         :param Variables:
         :param Reserved:
-        :return:
+        :return: the ID of the triggered instance
         """
         # TODO add all parameters from doc
-        # TODO variables have to be passed as a variable collection, need to implement an easy variable collection that
-        # TODO adheres to ActiveBatch's requirements
-        # TODO as of right now, this has no way of actually accepting proper variables
-        # TODO grab variable collection creator in previous iteration of the AB API code for guidance
-        self.obj.Trigger3(QueueName=QueueName,
-                          JobParameters=JobParameters,
-                          Flags=Flags,
-                          Username=Username,
-                          Password=Password,
-                          Variables=Variables,
-                          Reserved=Reserved
-                          )
+        if isinstance(Variables, dict):
+            Variables = variables.build_collection(self.cls.scheduler, Variables) if Variables else ''
+        return self.obj.Trigger3(QueueName=QueueName,
+                                 JobParameters=JobParameters,
+                                 Flags=Flags,
+                                 Username=Username,
+                                 Password=Password,
+                                 Variables=Variables,
+                                 Reserved=Reserved
+                                 )
 
     @Decorators.runnable(['Folder', 'FolderLite'])
     def GetChildInstances(self, Count: int = '', InstanceStateFilter: int = '', ShowOldestFirst: bool = False,
@@ -671,13 +807,10 @@ class AllMethods:
             for idx in range(len(path_components)):
                 if idx == 0:
                     continue
-                if idx == 1:
-                    _currpath = '/'
-                else:
-                    _currpath = '/'.join(path_components[:idx + 1])
+                _currpath = '/'.join(path_components[:idx + 1])
 
                 _label = path_components[idx]
-                _parent = '/'.join(path_components[:idx])
+                _parent = '/'.join(path_components[:idx]) or '/'  # top level folders go straight under the root
                 _exists = self.ObjectExists(_currpath)
                 _dict = {'key': _currpath, 'parent': _parent, 'exists': _exists,
                          'label': _label}
@@ -750,14 +883,13 @@ class AllMethods:
         # TODO errata - (fixed in V10) plans and folders return the same type as per official ActiveBatch KB
         _isfolder = destination_type in ['abatOT_Folder', 'abatOT_Plan']
         if _isfolder is True:
-            # we will need the two objects below to facilitate the importing and exporting of objects in memory
-            # the two objects will contain methods that we need to do this properly
-            __export = self.obj.CreateObject("Export")  # creating an object of class Export
+            # we will need an Export and an Import object to facilitate the importing and exporting of objects in
+            # memory; the Export object is kept by the session, see JobScheduler.export_xml
             __import = self.obj.CreateObject("Import")  # creating an object of class Import
             # now we get the original object
             __obj = self.obj.GetAbatObject(SourceKey)
             # we use the Export method of the Export class to get the XML of the original object
-            __export_obj = __export.Export(__obj.ID)
+            __export_obj = self.cls.export_xml(__obj.ID)
             # we re-import the XML to a different location
             __import.Import(DestinationKey, __export_obj)
         else:
@@ -825,6 +957,9 @@ class JobScheduler(AllMethods, AllAttributes):
         self.obj = obj
         self.server = server
         self.version = version
+        self.type_cache = {}  # {ID: ObjectType code} filled by GetObjectType and prime_type_cache, never by path
+        self.catalog = None  # an Objects.query.Catalog that query() answers from while it's fresh
+        self._exporter = None
 
     def __repr__(self):
         return f"{self.obj.Name}`{self.ObjectType}"
@@ -832,7 +967,7 @@ class JobScheduler(AllMethods, AllAttributes):
     def __str__(self):
         return f"{self.obj.Name}"
 
-    def _get_object(self, key, lite=True):
+    def _get_object(self, key, lite=True, obj=None):
         """
         This is used to easily map an object to its corresponding class in the api module
         Once mapped, the object's methods are exposed for ease of use
@@ -841,6 +976,7 @@ class JobScheduler(AllMethods, AllAttributes):
 
         :param key:
         :param lite:
+        :param obj: the COM object for `key` if the caller already has it, e.g. a lite Search result, saves fetching it
         :return:
         """
 
@@ -888,21 +1024,29 @@ class JobScheduler(AllMethods, AllAttributes):
 
         objtype = int(self.GetObjectType(key))  # returns an integer
         objname = enum.ObjectType(objtype).name  # maps the integer to a string
-        if lite is True:
-            obj = self.GetAbatObjectLite(key)
-        else:
-            obj = self.GetAbatObject(key)
+        if obj is None:
+            if lite is True:
+                obj = self.GetAbatObjectLite(key)
+            else:
+                obj = self.GetAbatObject(key)
 
         return method_map[objname](self, obj)
 
     def Search(self, SearchRootKey: Union[str, int], SearchString: str = '*', ObjectFilter: int = 65535,
-               FieldNames: str = 'AllFields', Recursive: bool = True, GetFullObjects: bool = False):
+               FieldNames: str = 'AllFields', Recursive: bool = True, GetFullObjects: bool = False,
+               GetHybridObjects: bool = False):
+        """
+        GetHybridObjects returns HybridObjects built straight from the lite search results, which only fetch their full
+        object if something only the full object has is asked for. It takes precedence over GetFullObjects
+        """
         _search_results = super().Search(SearchRootKey=SearchRootKey, SearchString=SearchString,
                                          ObjectFilter=ObjectFilter, FieldNames=FieldNames, Recursive=Recursive
                                          )
         _items = []
         for item in _search_results:
-            if GetFullObjects:
+            if GetHybridObjects:
+                _item = HybridObject(self._get_object(item.ID, lite=True, obj=item))
+            elif GetFullObjects:
                 _item = self.get_object(item.ID, lite=False)
             else:
                 _item = self.get_object(item.ID, lite=True)
@@ -910,6 +1054,76 @@ class JobScheduler(AllMethods, AllAttributes):
 
         return _items
 
+    def search_lite(self, SearchRootKey: Union[str, int], SearchString: str = '*', ObjectFilter: int = 65535,
+                    FieldNames: str = 'AllFields', Recursive: bool = True):
+        """
+        Same as Search, but the lite results are returned as they come back from the COM instead of being mapped to
+        their api classes. Mapping costs a GetObjectType and a GetAbatObject(Lite) call per result, which adds up
+        quickly when all we need is the ID or RevisionID of everything under a root key
+        """
+        return super().Search(SearchRootKey=SearchRootKey, SearchString=SearchString, ObjectFilter=ObjectFilter,
+                              FieldNames=FieldNames, Recursive=Recursive)
+
+    def export_xml(self, ObjectKey: Union[int, str]) -> str:
+        """
+        The XML definition of an object, as exported by the Export object used by CopyObjectTo. Exporting a Folder or
+        a Plan includes everything under it. The Export object is created once per session and reused
+        """
+        if self._exporter is None:
+            self._exporter = self.obj.CreateObject("Export")  # creating an object of class Export
+        return self._exporter.Export(ObjectKey)
+
+    def iter_search(self, SearchRootKey: Union[str, int], SearchString: str = '*', ObjectFilter: int = 65535,
+                    FieldNames: str = 'AllFields', Recursive: bool = True):
+        """
+        Generator over the lite results of a Search, read from the COM a chunk at a time and not kept afterwards, so
+        walking a big tree only ever holds one chunk of it
+        """
+        yield from self.search_lite(SearchRootKey, SearchString=SearchString, ObjectFilter=ObjectFilter,
+                                    FieldNames=FieldNames, Recursive=Recursive).stream()
+
+    def query(self, catalog=None):
+        """
+        Starts a query, see Objects.query.Query
+
+        ab.query().type('Job').under('/Finance').where(Enabled=False, Owner='svc_*').ids()
+        """
+        from Objects.query import Query
+        return Query(self, catalog=catalog if catalog is not None else self.catalog)
+
+    def unit_of_work(self, pool=None, batch_size: int = 50, rollback: bool = True):
+        """
+        Records property changes and sends them with one Update per changed object when the block exits, in parallel
+        over `pool` if given, see Objects.unit_of_work.UnitOfWork
+
+        with ab.unit_of_work(pool) as work:
+            work.set(job, Enabled=False)
+        """
+        from Objects.unit_of_work import UnitOfWork
+        return UnitOfWork(self, pool=pool, batch_size=batch_size, rollback=rollback)
+
+    def prime_type_cache(self, SearchRootKey: Union[str, int] = '/', Recursive: bool = True) -> int:
+        """
+        Resolves every Folder and Plan under SearchRootKey with two lite searches, one filtered on Folders and one on
+        Plans, and caches their types by ID (never by path, see GetObjectType). On V9 and older this spares
+        GetObjectType the errata probe (a GetAbatObject and up to two failing attribute reads) for each of them, which
+        is most of the cost of a Search(GetFullObjects=True) over a big tree. Returns the number of objects resolved
+        """
+        _resolved = 0
+        for _filter, _otype in ((2048, 14), (2, 3)):  # abatOLF_Folder, abatOLF_Plan
+            for item in self.search_lite(SearchRootKey, ObjectFilter=_filter, Recursive=Recursive):
+                self.type_cache[int(item.ID)] = _otype
+                _resolved += 1
+        logging.debug(f"{_resolved} Folders and Plans under '{SearchRootKey}' added to the type cache")
+        return _resolved
+
+    def clear_type_cache(self):
+        self.type_cache = {}
+
+    def get_hybrid_object(self, key):
+        """the lite object of `key` wrapped in a HybridObject, see HybridObject"""
+        return HybridObject(self.get_object(key, lite=True))
+
     def get_object(self, key, lite=True):
         _keys = list()
         logging.debug(f'get_object({key})')
@@ -1251,7 +1465,12 @@ class Schedule(AllMethods, AllAttributes):
         return self._typemapper()
 
     def productionalize_schedulename(self):
-        """This will change the name of the object to its corresponding production name"""
+        """
+        This will change the name of the object to its corresponding production name
+
+        Doesn't check for collisions or the 128 byte limit; Objects.schedule_names.ScheduleNamePlanner does, and renames
+        a whole tree of schedules in parallel batches
+        """
         logging.debug(self.production_name)
         self.obj.Name = self.production_name
         self.obj.Label = self.production_name
@@ -1301,8 +1520,7 @@ class Plan(AllMethods, AllAttributes):
         # object before querying this attribute
         if item == 'NextScheduledExecutionDateTime':
             return self.LiteObject.NextScheduledExecutionDateTime
-        else:
-            return self.item
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{item}'")
 
     def __repr__(self):
         return f"{self.obj.Name}`{self.ObjectType}"
@@ -1403,3 +1621,106 @@ class FolderLite(AllMethods, AllAttributes):
 
     def __str__(self):
         return f"{self.obj.Name}"
+
+
+class RecycleBin(AllMethods, AllAttributes):
+    """The deleted objects of a scheduler, see JobScheduler.GetRecycleBin. PurgeObject deletes one of them for good"""
+
+    def __init__(self, scheduler, obj):
+        super().__init__(cls=self, obj=obj)
+        self.scheduler = scheduler
+        self.obj = obj
+
+    def __repr__(self):
+        return f"RecycleBin`{self.scheduler}"
+
+    def __str__(self):
+        return "RecycleBin"
+
+
+class HybridObject(object):
+    """
+    Starts out as a lite object and only fetches the full object the first time something that only the full object
+    supports is asked for, so a loop over many objects pays for GetAbatObject only on the objects that need it
+
+        hybrid = ab.get_hybrid_object('/Finance/Plan0')
+        hybrid.Name                             # read from the lite object
+        hybrid.NextScheduledExecutionDateTime   # PlanLite has it and Plan doesn't, still the lite object
+        hybrid.GetAssociatedSchedules()         # the full Plan is fetched here, once
+
+    Each attribute is routed by the @Decorators.runnable class lists of the two classes. Attributes are read from the
+    lite object whenever its class supports them, methods run on the full object whenever its class supports them,
+    since a lite object is a read-only snapshot. Anything neither class supports raises AttributeError, instead of
+    the warning and -1 a single class would return
+    """
+    _FULL_CLASSES = {'JobLite': Job, 'PlanLite': Plan, 'FolderLite': Folder, 'ScheduleLite': Schedule,
+                     'CalendarLite': Calendar, 'AlertsLite': Alerts}
+    _routes = {}  # {(lite class, name): 'lite', 'full' or None}, shared by every HybridObject
+
+    def __init__(self, lite):
+        self.lite = lite
+        self.scheduler = lite.scheduler
+        self.full_class = self._FULL_CLASSES.get(type(lite).__name__)
+        self._full = None
+
+    def __repr__(self):
+        return f"Hybrid({self.lite.__repr__()}{', full' if self._full is not None else ''})"
+
+    def __str__(self):
+        return self.lite.__str__()
+
+    @property
+    def full(self):
+        if self._full is None:
+            if self.full_class is None:
+                # e.g. UserAccount and the Placeholders, which _get_object maps to the same class either way
+                self._full = self.lite
+            else:
+                logging.debug(f'fetching the full object of {self.lite.__repr__()}')
+                self._full = self.scheduler.get_object(self.lite.ID, lite=False)
+        return self._full
+
+    @property
+    def is_full(self) -> bool:
+        """True once the full object has been fetched"""
+        return self._full is not None
+
+    def route(self, name: str):
+        """'lite' or 'full', whichever object `name` is read from, or None if neither supports it"""
+        _key = (type(self.lite), name)
+        if _key not in HybridObject._routes:
+            _lite = type(self.lite).class_supports(name)
+            _full = self.full_class is not None and self.full_class.class_supports(name)
+            _member = getattr(type(self.lite), name, None) or getattr(self.full_class, name, None)
+            if _full and (callable(_member) or not _lite):
+                _route = 'full'
+            elif _lite:
+                _route = 'lite'
+            else:
+                _route = None
+            HybridObject._routes[_key] = _route
+        return HybridObject._routes[_key]
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name in ('lite', 'full_class', 'scheduler'):
+            raise AttributeError(name)  # not set yet, e.g. while copying or unpickling
+        _route = self.route(name)
+        if _route == 'lite':
+            return getattr(self.lite, name)
+        if _route == 'full':
+            return getattr(self.full, name)
+        raise AttributeError(f"Neither {type(self.lite).__name__} nor "
+                             f"{getattr(self.full_class, '__name__', type(self.lite).__name__)} support '{name}'")
+
+    def snapshot(self, fields=SNAPSHOT_FIELDS) -> dict:
+        """same as AllAttributes.snapshot, the full object is only fetched if one of `fields` needs it"""
+        _snapshot = {}
+        for _field in fields:
+            _value = None
+            if self.route(_field) is not None:
+                try:
+                    _value = getattr(self, _field)
+                except Exception as e:
+                    logging.debug(f"{_field} could not be read from {self.__repr__()}: {e}")
+            _snapshot[_field] = _value
+        return _snapshot
@@ -0,0 +1,229 @@
+import json
+import logging
+
+# Search ObjectFilter values, refer to the docstring of AllMethods.Search
+_OLF_JOB = 1
+_OLF_PLAN = 2
+_OLF_SCHEDULE = 16
+_OLF_USERACCOUNT = 64
+_OLF_REFERENCE = 512
+
+KINDS = ('Schedule', 'Calendar', 'UserAccount', 'AlertObject')
+
+
+def _object_id(item):
+    """The association collections are not consistent about what they hold; some give back objects with an ID, some
+    give back variants, and some give back the bare ID"""
+    for _attr in ('ID', 'Value'):
+        _value = getattr(item, _attr, None)
+        if _value is not None:
+            return int(_value)
+    return int(item)
+
+
+def _object_ids(collection) -> set:
+    return {_object_id(item) for item in collection}
+
+
+class AssociationIndex(object):
+    """
+    Bidirectional index between the schedulable objects (Jobs, Plans and References) and the Schedules, Calendars,
+    User Accounts and Alert Objects they use
+
+    The COM can only answer one direction per call: GetAssociatedJobs on a Schedule/Calendar/UserAccount, or
+    GetAssociatedSchedulesObjectId/GetAssociatedCalendarsObjectId/GetAssociatedAlertObjects on a Job. A single crawl
+    reads the job side once and the user account side once, after which "what uses this credential" and "what does
+    this job depend on" are dictionary lookups
+
+    The index remembers the RevisionID of every object it has read, so refresh() only goes back to the COM for the
+    objects that were added or modified since the last crawl and drops the ones that no longer exist
+
+    with ABConnectionManager('activebatch', 12) as ab:
+        index = AssociationIndex(ab, '/Finance')
+        index.build()
+        index.save('finance_associations.json')
+        impacted = index.dependents(calendar_id)
+    """
+
+    def __init__(self, scheduler, root: str = '/'):
+        self.scheduler = scheduler
+        self.root = root
+        self.revisions = {}  # {id: RevisionID} of every object whose associations have been read
+        self.paths = {}  # {id: FullPath} so that lookups can be reported without going back to the COM
+        self.kinds = {}  # {associated id: kind}
+        self._forward = {}  # {job id: {kind: {associated ids}}}
+        self._reverse = {}  # {associated id: {job ids}}
+        self._schedule_calendars = {}  # {schedule id: {calendar ids}}, calendars reach jobs through schedules too
+        self.errors = {}  # {id: error} of the objects that couldn't be read, they're retried on the next refresh
+
+    def __repr__(self):
+        return f"AssociationIndex(root={self.root}, objects={len(self._forward)}, associated={len(self._reverse)})"
+
+    def _listing(self, object_filter):
+        _listing = {}
+        for item in self.scheduler.search_lite(self.root, ObjectFilter=object_filter):
+            _listing[int(item.ID)] = (int(item.RevisionID), item.FullPath)
+        return _listing
+
+    def _changed(self, listing) -> list:
+        return [_id for _id, (_rev, _) in listing.items() if self.revisions.get(_id) != _rev]
+
+    def _link(self, source_id, kind, target_id):
+        self._forward.setdefault(source_id, {}).setdefault(kind, set()).add(target_id)
+        self._reverse.setdefault(target_id, set()).add(source_id)
+        self.kinds[target_id] = kind
+
+    def _unlink(self, source_id, kind, target_id):
+        self._forward.get(source_id, {}).get(kind, set()).discard(target_id)
+        _sources = self._reverse.get(target_id)
+        if _sources is not None:
+            _sources.discard(source_id)
+            if not _sources:
+                del self._reverse[target_id]
+                self.kinds.pop(target_id, None)
+
+    def _set_links(self, source_id, kind, target_ids):
+        _current = set(self._forward.get(source_id, {}).get(kind, set()))
+        for _target in _current - target_ids:
+            self._unlink(source_id, kind, _target)
+        for _target in target_ids - _current:
+            self._link(source_id, kind, _target)
+
+    def _forget(self, object_id):
+        """drops an object from the index regardless of which side of the association it is on"""
+        for _kind, _targets in list(self._forward.get(object_id, {}).items()):
+            for _target in list(_targets):
+                self._unlink(object_id, _kind, _target)
+        self._forward.pop(object_id, None)
+        for _source in list(self._reverse.get(object_id, set())):
+            self._unlink(_source, self.kinds.get(object_id), object_id)
+        self._schedule_calendars.pop(object_id, None)
+        self.kinds.pop(object_id, None)
+        self.revisions.pop(object_id, None)
+        self.paths.pop(object_id, None)
+
+    def _read_job_side(self, object_id):
+        # straight off the COM object, References don't have an api class that can run these (they map to Placeholder)
+        _obj = self.scheduler.GetAbatObject(object_id)
+        self._set_links(object_id, 'Schedule', _object_ids(_obj.GetAssociatedSchedulesObjectId()))
+        self._set_links(object_id, 'Calendar', _object_ids(_obj.GetAssociatedCalendarsObjectId()))
+        self._set_links(object_id, 'AlertObject', _object_ids(_obj.GetAssociatedAlertObjects()))
+
+    def _read_schedule(self, schedule_id):
+        _obj = self.scheduler.get_object(schedule_id, lite=False)
+        self._schedule_calendars[schedule_id] = _object_ids(_obj.GetAssociatedCalendarsObjectId())
+        self.kinds.setdefault(schedule_id, 'Schedule')
+
+    def _read_user_account(self, account_id):
+        _obj = self.scheduler.get_object(account_id, lite=False)
+        _jobs = _object_ids(_obj.GetAssociatedJobs())
+        for _job in set(self._reverse.get(account_id, set())) - _jobs:
+            self._unlink(_job, 'UserAccount', account_id)
+        for _job in _jobs:
+            self._link(_job, 'UserAccount', account_id)
+
+    def build(self):
+        """crawls the root key from scratch"""
+        self.__init__(self.scheduler, self.root)
+        return self.refresh()
+
+    def refresh(self) -> dict:
+        """
+        Brings the index up to date with the server, only reading the associations of objects whose RevisionID
+        changed since the last crawl. Returns the number of objects that were (re)read or dropped per category
+        """
+        _jobs = self._listing(_OLF_JOB | _OLF_PLAN | _OLF_REFERENCE)
+        _schedules = self._listing(_OLF_SCHEDULE)
+        _accounts = self._listing(_OLF_USERACCOUNT)
+        _current = set(_jobs) | set(_schedules) | set(_accounts)
+        _removed = [_id for _id in self.revisions if _id not in _current]
+        for _id in _removed:
+            self._forget(_id)
+        self.errors = {_id: _error for _id, _error in self.errors.items() if _id in _current}
+
+        _changed_jobs = self._changed(_jobs)
+        _changed_schedules = self._changed(_schedules)
+        # a job pointing to a different credential bumps the job's RevisionID and not the account's, so every account
+        # is re-read whenever a job changed; there are only ever a handful of accounts compared to jobs
+        if _changed_jobs or _removed:
+            _changed_accounts = list(_accounts)
+        else:
+            _changed_accounts = self._changed(_accounts)
+
+        logging.info(f"Refreshing associations under '{self.root}': {len(_changed_jobs)} jobs/plans, "
+                     f"{len(_changed_schedules)} schedules, {len(_changed_accounts)} user accounts, "
+                     f"{len(_removed)} removed")
+        for _listing, _changed, _reader in ((_jobs, _changed_jobs, self._read_job_side),
+                                            (_schedules, _changed_schedules, self._read_schedule),
+                                            (_accounts, _changed_accounts, self._read_user_account)):
+            for _id in _changed:
+                try:
+                    _reader(_id)
+                except Exception as e:
+                    # its RevisionID isn't recorded, so the next refresh reads it again
+                    self.errors[_id] = str(e)
+                    logging.error(f"Could not read the associations of [{_listing[_id][1]} : {_id}]: {e}")
+                    continue
+                self.errors.pop(_id, None)
+                self.revisions[_id], self.paths[_id] = _listing[_id]
+        for _id in _accounts:
+            self.kinds.setdefault(_id, 'UserAccount')
+
+        return {'jobs': len(_changed_jobs), 'schedules': len(_changed_schedules),
+                'user_accounts': len(_changed_accounts), 'removed': len(_removed), 'errors': len(self.errors)}
+
+    def dependencies(self, object_id, kind: str = None) -> set:
+        """returns the IDs of the schedules, calendars, user accounts and alert objects used by a job or plan"""
+        _kinds = self._forward.get(int(object_id), {})
+        if kind is not None:
+            return set(_kinds.get(kind, set()))
+        _ids = set()
+        for _targets in _kinds.values():
+            _ids |= _targets
+        return _ids
+
+    def dependents(self, object_id, transitive: bool = True) -> set:
+        """
+        returns the IDs of the jobs, plans and references that use a schedule, calendar, user account or alert object
+
+        If `transitive` is True, then the jobs that use a calendar through one of their schedules are included as well
+        """
+        object_id = int(object_id)
+        _ids = set(self._reverse.get(object_id, set()))
+        if transitive:
+            for _schedule, _calendars in self._schedule_calendars.items():
+                if object_id in _calendars:
+                    _ids |= self._reverse.get(_schedule, set())
+        return _ids
+
+    def impact_report(self, object_id, transitive: bool = True) -> list:
+        """returns the FullPath of every object that uses `object_id`, sorted, for quick reporting"""
+        return sorted(self.paths.get(_id, str(_id)) for _id in self.dependents(object_id, transitive))
+
+    def save(self, path: str):
+        _data = {'root': self.root,
+                 'revisions': self.revisions,
+                 'paths': self.paths,
+                 'kinds': self.kinds,
+                 'forward': {_id: {_k: sorted(_v) for _k, _v in _kinds.items()}
+                             for _id, _kinds in self._forward.items()},
+                 'schedule_calendars': {_id: sorted(_v) for _id, _v in self._schedule_calendars.items()}
+                 }
+        with open(path, 'w') as outfile:
+            json.dump(_data, outfile)
+
+    @classmethod
+    def load(cls, scheduler, path: str):
+        """loads a previously saved index, call refresh() on it to catch up with the server"""
+        with open(path, 'r') as infile:
+            _data = json.load(infile)
+        _index = cls(scheduler, _data['root'])
+        _index.revisions = {int(_id): _rev for _id, _rev in _data['revisions'].items()}
+        _index.paths = {int(_id): _path for _id, _path in _data['paths'].items()}
+        for _id, _kinds in _data['forward'].items():
+            for _kind, _targets in _kinds.items():
+                for _target in _targets:
+                    _index._link(int(_id), _kind, int(_target))
+        _index.kinds.update({int(_id): _kind for _id, _kind in _data['kinds'].items()})
+        _index._schedule_calendars = {int(_id): set(_v) for _id, _v in _data['schedule_calendars'].items()}
+        return _index
@@ -0,0 +1,272 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from Objects import abat_collections as ab_col
+
+# rate: the cumulative counter it's the per minute increase of
+RATES = {'instances_per_minute': 'InstancesCompleted', 'failures_per_minute': 'InstancesFailed'}
+_SCHEDULER_KEYS = (0, '0', '/', '')
+
+
+class RingBuffer(object):
+    """
+    The last `capacity` samples of a fixed set of columns, in NumPy arrays allocated once. Once full, every new sample
+    overwrites the oldest one
+    """
+
+    def __init__(self, columns, capacity: int):
+        self.columns = list(columns)
+        self.capacity = capacity
+        self.times = np.full(capacity, np.nan)  # epoch seconds
+        self.values = np.full((capacity, len(self.columns)), np.nan)
+        self.head = 0  # where the next sample goes
+        self.size = 0
+
+    def __repr__(self):
+        return f"RingBuffer(columns={len(self.columns)}, samples={self.size}/{self.capacity})"
+
+    def __len__(self):
+        return self.size
+
+    def append(self, timestamp: float, row):
+        self.times[self.head] = timestamp
+        self.values[self.head] = row
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def _order(self):
+        """positions of the samples kept, oldest first"""
+        return (np.arange(self.size) + (self.head - self.size)) % self.capacity
+
+    def window(self, seconds: float = None):
+        """(times, values) of the samples of the last `seconds` (all of them if None), oldest first, as copies"""
+        _positions = self._order()
+        if seconds is not None and self.size:
+            _times = self.times[_positions]
+            _positions = _positions[np.searchsorted(_times, _times[-1] - seconds, side='left'):]
+        return self.times[_positions], self.values[_positions]
+
+    def latest(self):
+        """(time, values) of the last sample, None if there isn't any"""
+        if not self.size:
+            return None
+        _last = (self.head - 1) % self.capacity
+        return self.times[_last], self.values[_last]
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _read_counters(session, keys, objects: dict) -> dict:
+    """
+    runs inside a pool worker, {key: (epoch seconds, {counter: value}) or the exception raised}. `objects` keeps the
+    COM objects of this session between samples, so an object is only fetched the first time
+    """
+    _samples = {}
+    for _key in keys:
+        try:
+            if _key in _SCHEDULER_KEYS:
+                _counters = session.GetCounters()
+            else:
+                _obj = objects.get(_key)
+                if _obj is None:
+                    # straight off the COM object, Queues and References don't have an api class that can run it
+                    _obj = objects[_key] = session.GetAbatObject(_key)
+                _counters = ab_col.AbatCounters(_obj.GetCounters())
+            _samples[_key] = (time.time(), _counters.to_dict())
+        except Exception as e:
+            objects.pop(_key, None)
+            _samples[_key] = e
+    return _samples
+
+
+class CounterSampler(object):
+    """
+    Polls GetCounters of a set of objects every `interval` seconds on one session of a SessionPool, and keeps the
+    last `capacity` samples of every object in a RingBuffer along with the rates of RATES, in increase per minute
+
+    with SessionPool('activebatch', 12, size=1) as pool:
+        sampler = CounterSampler(pool, ['/Queues/Finance', '/Finance/EOD'], interval=30, dump_path='counters.json')
+        with sampler:
+            ...
+            sampler.latest()                                 # {key: {counter or rate: value}}
+            sampler.window('/Queues/Finance', seconds=3600)  # the last hour, as arrays
+            sampler.rate('/Queues/Finance', 'InstancesCompleted', seconds=900)
+
+    `keys` are paths or IDs, 0 or '/' being the scheduler itself. `counters` limits what's kept to those names,
+    otherwise every counter of the first sample of an object is. Rates are worked out as every sample comes in, from
+    the previous one; a counter going down (ResetCounters) counts from zero again
+
+    With a `dump_path`, the last `dump_window` seconds of every object are written there as JSON every `dump_every`
+    seconds, replacing the previous dump in one go so a dashboard never reads half a file
+    """
+
+    def __init__(self, pool, keys, interval: float = 60.0, capacity: int = 1440, counters=None, rates=RATES,
+                 dump_path: str = None, dump_every: float = 300.0, dump_window: float = 3600.0):
+        self.pool = pool
+        self.keys = list(keys)
+        self.interval = interval
+        self.capacity = capacity
+        self.counters = list(counters) if counters is not None else None
+        self.rates = dict(rates)
+        self.dump_path = dump_path
+        self.dump_every = dump_every
+        self.dump_window = dump_window
+        self.buffers = {}  # {key: RingBuffer}
+        self.errors = {}
+        self.samples = 0
+        self._previous = {}  # {key: (time, counter values)} for the rates
+        self._objects = {}  # {id(session): {key: COM object}}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __repr__(self):
+        return f"CounterSampler(objects={len(self.keys)}, interval={self.interval}, samples={self.samples})"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _buffer(self, key, counters: dict) -> RingBuffer:
+        _buffer = self.buffers.get(key)
+        if _buffer is None:
+            _names = self.counters if self.counters is not None else list(counters)
+            _buffer = self.buffers[key] = RingBuffer(_names + list(self.rates), self.capacity)
+        return _buffer
+
+    def _record(self, key, timestamp: float, counters: dict):
+        _buffer = self._buffer(key, counters)
+        _names = _buffer.columns[:len(_buffer.columns) - len(self.rates)]
+        _values = np.array([_number(counters.get(_name)) for _name in _names])
+        _rates = []
+        _previous = self._previous.get(key)
+        for _counter in self.rates.values():
+            _rate = math.nan
+            if _previous is not None and _counter in _names and timestamp > _previous[0]:
+                _idx = _names.index(_counter)
+                _increase = _values[_idx] - _previous[1][_idx]
+                if _increase < 0:
+                    _increase = _values[_idx]  # reset since the previous sample
+                _rate = _increase / ((timestamp - _previous[0]) / 60)
+            _rates.append(_rate)
+        _buffer.append(timestamp, np.concatenate((_values, _rates)))
+        self._previous[key] = (timestamp, _values)
+
+    def sample(self) -> dict:
+        """takes one sample of every object, returns how many were read and how long it took"""
+        _start = time.perf_counter()
+
+        def _read(session):
+            return _read_counters(session, self.keys, self._objects.setdefault(id(session), {}))
+
+        _samples = self.pool.submit(_read).result()
+        _errors = {}
+        with self._lock:
+            for _key, _sample in _samples.items():
+                if isinstance(_sample, Exception):
+                    _errors[_key] = str(_sample)
+                    continue
+                self._record(_key, *_sample)
+            self.samples += 1
+            self.errors = _errors
+        for _key, _error in _errors.items():
+            logging.error(f"Could not read the counters of {_key}: {_error}")
+        return {'read': len(_samples) - len(_errors), 'errors': len(_errors),
+                'elapsed_seconds': round(time.perf_counter() - _start, 3)}
+
+    def _run(self):
+        _next = time.monotonic()
+        _next_dump = _next + self.dump_every
+        while not self._stop.is_set():
+            try:
+                self.sample()
+                if self.dump_path is not None and time.monotonic() >= _next_dump:
+                    self.dump()
+                    _next_dump += self.dump_every
+            except Exception as e:
+                logging.exception(e, exc_info=True)
+            # a sample that overran its interval pushes the next one back instead of running two back to back
+            _next = max(_next + self.interval, time.monotonic())
+            self._stop.wait(_next - time.monotonic())
+
+    def start(self):
+        """samples in a background thread until stop()"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='counter-sampler', daemon=True)
+        self._thread.start()
+        logging.info(f"{self.__repr__()} started")
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self.dump_path is not None:
+            self.dump()
+
+    def window(self, key, seconds: float = None) -> dict:
+        """{'time': epoch seconds, column: values} of the samples of `key` in the last `seconds`, as NumPy arrays"""
+        with self._lock:
+            _buffer = self.buffers.get(key)
+            if _buffer is None:
+                return {'time': np.array([])}
+            _times, _values = _buffer.window(seconds)
+            _columns = list(_buffer.columns)
+        _window = {'time': _times}
+        _window.update({_column: _values[:, idx] for idx, _column in enumerate(_columns)})
+        return _window
+
+    def latest(self) -> dict:
+        """{key: {'time': epoch seconds, column: value}} of the last sample of every object"""
+        _latest = {}
+        with self._lock:
+            for _key, _buffer in self.buffers.items():
+                _last = _buffer.latest()
+                if _last is not None:
+                    _latest[_key] = dict({'time': float(_last[0])},
+                                         **{_column: float(_value) for _column, _value in zip(_buffer.columns,
+                                                                                             _last[1])})
+        return _latest
+
+    def rate(self, key, counter: str, seconds: float = None) -> float:
+        """the average increase per minute of a cumulative `counter` of `key` over the last `seconds`"""
+        _window = self.window(key, seconds)
+        _times, _values = _window['time'], _window.get(counter)
+        if _values is None or len(_times) < 2 or _times[-1] <= _times[0]:
+            return math.nan
+        _increases = np.diff(_values)
+        _resets = _increases < 0
+        _increases[_resets] = _values[1:][_resets]
+        return float(np.nansum(_increases) / ((_times[-1] - _times[0]) / 60))
+
+    def dump(self, path: str = None):
+        """writes the last `dump_window` seconds of every object to `path` (dump_path by default) as JSON"""
+        path = path or self.dump_path
+        _objects = {}
+        for _key in list(self.buffers):
+            _window = self.window(_key, self.dump_window)
+            _objects[str(_key)] = {_column: [None if math.isnan(_v) else round(float(_v), 3) for _v in _values]
+                                   for _column, _values in _window.items()}
+        _temporary = f'{path}.tmp'
+        with open(_temporary, 'w') as outfile:
+            json.dump({'taken': datetime.now().isoformat(), 'interval': self.interval, 'objects': _objects}, outfile)
+        os.replace(_temporary, path)
+        logging.debug(f"Counters of {len(_objects)} objects dumped to {path}")
@@ -0,0 +1,256 @@
+import difflib
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import as_completed
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
+
+from Handlers.session_pool import Progress
+from Objects.api import (EXPORT_ASSOCIATION_TAG, EXPORT_NAME_ATTRIBUTE, EXPORT_OBJECT_TAG, EXPORT_REFERENCE_ATTRIBUTE,
+                         EXPORT_TYPE_ATTRIBUTE)
+
+_OLF_ALL = 65535  # refer to the docstring of AllMethods.Search for the other ObjectFilter values
+
+# attributes and properties that differ between two servers holding the same definition
+VOLATILE = ('ID', 'RevisionID')
+_VOLATILE_SUFFIX = 'DateTime'  # CreationDateTime, ModifiedDateTime... every timestamp of the export
+# properties whose value is the ID of another object, compared by the path of that object instead
+_REFERENCE_SUFFIX = 'ID'
+
+ADDED = 'added'  # only on the target
+REMOVED = 'removed'  # only on the source
+MODIFIED = 'modified'
+UNKNOWN = 'unknown'  # listed on a side whose export of it failed or didn't hold it
+
+
+def _relative(path: str, root: str) -> str:
+    """`path` relative to `root`, '' for the root itself"""
+    _prefix = root.rstrip('/')
+    if path == _prefix or path == root:
+        return ''
+    return path[len(_prefix) + 1:] if path.startswith(_prefix + '/') else path
+
+
+def _listing(session, root: str) -> dict:
+    """runs inside a pool worker, {id: FullPath} of everything under `root`"""
+    return {int(item.ID): item.FullPath for item in session.iter_search(root, ObjectFilter=_OLF_ALL)}
+
+
+class _Canonicalizer(object):
+    """turns the export of a subtree into {relative path: (type, canonical text)}, one entry per object"""
+
+    def __init__(self, session, root: str, paths: dict, ignore=()):
+        self.session = session
+        self.root = root
+        self.paths = paths  # {id: FullPath} of the server, objects referenced from outside the root are added to it
+        self.ignore = set(VOLATILE) | set(ignore)
+
+    def _volatile(self, name: str) -> bool:
+        return name in self.ignore or name.endswith(_VOLATILE_SUFFIX)
+
+    def reference(self, value) -> str:
+        """the path of the object an ID points to, relative to the root if it's under it"""
+        try:
+            _id = int(value)
+        except (TypeError, ValueError):
+            return value
+        if _id == 0:
+            return value  # nothing associated
+        _path = self.paths.get(_id)
+        if _path is None:
+            try:
+                _path = self.paths[_id] = self.session.GetAbatObjectLite(_id).FullPath
+            except Exception as e:
+                logging.debug(f"Could not resolve the reference {_id}: {e}")
+                return f'?{_id}'
+        _relative_path = _relative(_path, self.root)
+        return f'./{_relative_path}' if _relative_path != _path else _path
+
+    def _attributes(self, element, references: bool) -> str:
+        _attributes = []
+        for _name, _value in sorted(element.attrib.items()):
+            if _name == EXPORT_REFERENCE_ATTRIBUTE and references:
+                _attributes.append(f' Ref={quoteattr(self.reference(_value))}')
+            elif not self._volatile(_name):
+                _attributes.append(f' {_name}={quoteattr(_value)}')
+        return ''.join(_attributes)
+
+    def element(self, element) -> str:
+        """a piece of an object's definition, attributes sorted and IDs replaced by the paths they point to"""
+        _name = element.get(EXPORT_NAME_ATTRIBUTE) or ''
+        if _name and self._volatile(_name):
+            return ''
+        _text = (element.text or '').strip()
+        if _name.endswith(_REFERENCE_SUFFIX):
+            _text = self.reference(_text)
+        # an Association only carries the ID of the Schedule or Calendar it points to
+        _attributes = self._attributes(element, references=element.tag == EXPORT_ASSOCIATION_TAG)
+        _children = ''.join(self.element(_child) for _child in element)
+        return f'<{element.tag}{_attributes}>{escape(_text)}{_children}</{element.tag}>'
+
+    def objects(self, element, path: str) -> dict:
+        """the object `element` at `path` and every object nested in it (the export of a Folder or a Plan)"""
+        _objects = {}
+        _lines = [f'<{element.tag}{self._attributes(element, references=False)}>']
+        _own = []
+        for _child in element:
+            if _child.tag == EXPORT_OBJECT_TAG:
+                _objects.update(self.objects(_child, f"{path}/{_child.get(EXPORT_NAME_ATTRIBUTE)}"))
+                continue
+            _canonical = self.element(_child)
+            if _canonical:
+                _own.append(_canonical)
+        # properties and associations come in no particular order
+        _lines.extend(f'  {_line}' for _line in sorted(_own))
+        _objects[path] = (element.get(EXPORT_TYPE_ATTRIBUTE), '\n'.join(_lines) + '\n')
+        return _objects
+
+
+def _export_subtree(session, object_id, path: str, root: str, paths: dict, ignore) -> dict:
+    """runs inside a pool worker, {relative path: (type, sha256, canonical text)} of a subtree exported in one go"""
+    _element = ElementTree.fromstring(session.export_xml(object_id))
+    _objects = _Canonicalizer(session, root, paths, ignore).objects(_element, path)
+    return {_path: (_type, hashlib.sha256(_text.encode('utf-8')).hexdigest(), _text)
+            for _path, (_type, _text) in _objects.items()}
+
+
+class DriftDetector(object):
+    """
+    Compares the definitions of everything under `root` on two servers, e.g. test and prod, and lists what differs
+
+    with SessionPool('ab-test', 12, size=4) as test, SessionPool('ab-prod', 12, size=4) as prod:
+        drift = DriftDetector(test, prod, '/Finance')
+        changes = drift.compare()   # [{'path', 'change', 'type', 'diff'}]
+        drift.save('finance-drift.json')
+
+    Each server is listed with one Search, then every child of the root is exported with JobScheduler.export_xml
+    (the Export behind CopyObjectTo, which brings everything under a Folder or Plan along) over its pool, both servers
+    at once. The exports are split into one entry per object and canonicalized: attributes sorted, IDs, RevisionIDs and
+    every ...DateTime left out (plus the names in `ignore`), and the IDs an object references (Associations, and
+    properties such as UserAccountID) replaced by the path of what they point to, relative to the root when it's under
+    it. Objects are matched by their path relative to the root (`target_root` if it's somewhere else on the target),
+    and only the ones whose sha256 differ are diffed line by line
+
+    Splitting an export relies on the layout described by Objects.api.EXPORT_OBJECT_TAG and the constants next to it:
+    objects nest as EXPORT_OBJECT_TAG elements named by EXPORT_NAME_ATTRIBUTE. Whatever the listing has that the
+    exports of the root's children didn't hold is exported object by object instead
+
+    `change` is ADDED for an object only on the target, REMOVED for one only on the source and MODIFIED with a unified
+    `diff` from the source to the target otherwise. An object listed on a side that couldn't be exported there (the
+    export failed, see `errors`) is UNKNOWN rather than added or removed. A root with few, big children can't spread
+    over more sessions than it has children
+    """
+
+    def __init__(self, source, target, root: str = '/', target_root: str = None, ignore=(), context: int = 2):
+        self.source = source
+        self.target = target
+        self.root = root
+        self.target_root = target_root or root
+        self.ignore = tuple(ignore)
+        self.context = context
+        self.changes = []
+        self.errors = {}  # {'server path': error}
+        self.hashes = ({}, {})  # {relative path: (type, sha256)} of the source and the target
+
+    def __repr__(self):
+        return f"DriftDetector(root={self.root}, target_root={self.target_root}, changes={len(self.changes)})"
+
+    def _export(self, sides, paths, tasks, objects, label: str):
+        """exports the (side, id, relative path) `tasks` over the pools, adding what they hold to `objects`"""
+        _futures = {}
+        for idx, _id, _path in tasks:
+            _pool, _root = sides[idx]
+            _futures[_pool.submit(_export_subtree, _id, _path, _root, paths[idx], self.ignore)] = (idx, _pool, _path)
+        _progress = Progress(total=len(_futures), label=label)
+        _failed = (set(), set())
+        for _future in as_completed(_futures):
+            idx, _pool, _path = _futures[_future]
+            _error = _future.exception()
+            _progress.update(_error is None)
+            if _error is not None:
+                _failed[idx].add(_path)
+                self.errors[f'{_pool.server} {_path}'] = str(_error)
+                logging.error(f"Could not export '{_path}' from {_pool.server}: {_error}")
+                continue
+            for _object_path, _entry in _future.result().items():
+                objects[idx].setdefault(_object_path, _entry)
+        return _failed
+
+    def _exports(self) -> tuple:
+        """
+        ({relative path: (type, sha256, canonical text)} of the source, same for the target), and the relative paths
+        listed on each side
+        """
+        _sides = ((self.source, self.root), (self.target, self.target_root))
+        _listings = [_pool.submit(_listing, _root) for _pool, _root in _sides]
+        _paths = [_listing_future.result() for _listing_future in _listings]
+        _relative_paths = [{_id: _relative(_path, _root) for _id, _path in _side_paths.items()}
+                           for (_, _root), _side_paths in zip(_sides, _paths)]
+        _listed = tuple(set(_side.values()) - {''} for _side in _relative_paths)
+        # the children of the root, which bring everything under them along
+        _tasks = [(idx, _id, _path) for idx, _side in enumerate(_relative_paths) for _id, _path in _side.items()
+                  if _path and '/' not in _path]
+        _objects = ({}, {})
+        _failed = self._export(_sides, _paths, _tasks, _objects, label='subtrees exported')
+
+        def _under_failed(idx, path):
+            return any(path == _f or path.startswith(_f + '/') for _f in _failed[idx])
+
+        # objects the exports of their Folder or Plan didn't hold, because they don't follow EXPORT_OBJECT_TAG
+        _missing = [(idx, _id, _path) for idx, _side in enumerate(_relative_paths) for _id, _path in _side.items()
+                    if _path and _path not in _objects[idx] and not _under_failed(idx, _path)]
+        if _missing:
+            logging.warning(f"{len(_missing)} objects weren't nested in the export of their Folder or Plan as "
+                            f"<{EXPORT_OBJECT_TAG}>, exporting them one by one")
+            self._export(_sides, _paths, _missing, _objects, label='objects exported')
+        return _objects, _listed
+
+    def _counts(self) -> dict:
+        return {_change: sum(1 for _c in self.changes if _c['change'] == _change)
+                for _change in (ADDED, REMOVED, MODIFIED, UNKNOWN)}
+
+    def compare(self) -> list:
+        """exports both sides and returns the change list, sorted by path"""
+        _start = time.perf_counter()
+        self.errors = {}
+        (_source, _target), _listed = self._exports()
+        self.hashes = tuple({_path: (_type, _hash) for _path, (_type, _hash, _) in _side.items()}
+                            for _side in (_source, _target))
+        # what a side lists but couldn't export can't be told apart from what it doesn't have
+        _unread = (_listed[0] - set(_source)) | (_listed[1] - set(_target))
+        _changes = []
+        for _path in sorted(set(_source) | set(_target) | _unread):
+            if _path in _unread:
+                _changes.append({'path': _path, 'change': UNKNOWN,
+                                 'type': (_source.get(_path) or _target.get(_path) or (None,))[0]})
+            elif _path not in _source:
+                _changes.append({'path': _path, 'change': ADDED, 'type': _target[_path][0]})
+            elif _path not in _target:
+                _changes.append({'path': _path, 'change': REMOVED, 'type': _source[_path][0]})
+            elif _source[_path][1] != _target[_path][1]:
+                _diff = difflib.unified_diff(_source[_path][2].splitlines(), _target[_path][2].splitlines(),
+                                             f'{self.source.server}:{_path}', f'{self.target.server}:{_path}',
+                                             n=self.context, lineterm='')
+                _changes.append({'path': _path, 'change': MODIFIED, 'type': _target[_path][0],
+                                 'diff': list(_diff)})
+        self.changes = _changes
+        logging.info(f"Compared {len(_source)} objects on {self.source.server} with {len(_target)} on "
+                     f"{self.target.server} in {time.perf_counter() - _start:.1f}s: {self._counts()}")
+        return _changes
+
+    def summary(self) -> dict:
+        _summary = self._counts()
+        _summary.update({'source': len(self.hashes[0]), 'target': len(self.hashes[1]),
+                         'identical': sum(1 for _path, _entry in self.hashes[0].items()
+                                          if self.hashes[1].get(_path) == _entry),
+                         'errors': len(self.errors)})
+        return _summary
+
+    def save(self, path: str):
+        with open(path, 'w') as outfile:
+            json.dump({'source': self.source.server, 'target': self.target.server, 'root': self.root,
+                       'target_root': self.target_root, 'summary': self.summary(), 'changes': self.changes,
+                       'errors': self.errors}, outfile, indent=1)
+        logging.info(f"{len(self.changes)} changes written to {path}")
@@ -292,31 +292,13 @@ class ScheduleDays(BaseEnumeration):
                        'abatSD_Saturday': 64,
 
                        }
-        super().__init__(value, int_mapping)
-
+        # a bitmask can hold several days at once, so it can't go through BaseEnumeration's one-to-one mapping
+        self.str_mapping = {val: key for key, val in int_mapping.items()}
+        self.code = int(value)
         # TODO do not handle this on the enumeration module, build a utilities module instead
-        def __str_days():
-            _bin = bin(value)  # this is a str (e.g. 38 = '0b100110')
-            _binary_list = [int(i) for i in _bin[2:]]
-            _binary_list.reverse()  # reverse to get big endian
-            _decimals = []
-            for idx, val in enumerate(_binary_list, 0):
-                if val:
-                    _decimals.append(int(2 ** idx))
-
-            _return = []
-            for _dec in _decimals:
-                _return.append(super().str_mapping[_dec])
-            return _return
-
-        def __int_days(list_of_days):
-            _return = []
-            for day in list_of_days:
-                _return.append(int_mapping[day])
-            return _return
-
-        self.str_days = __str_days()
-        self.int_days = __int_days(self.str_days)
+        self.str_days = [self.str_mapping[_bit] for _bit in sorted(self.str_mapping) if self.code & _bit]
+        self.int_days = [int_mapping[day] for day in self.str_days]
+        self.name = '|'.join(self.str_days)
 
 
 class CalendarTypes(BaseEnumeration):
@@ -0,0 +1,171 @@
+import csv
+import logging
+import os
+import time
+
+from Objects import enumerations as enum
+from Objects.query import read_field
+
+# the fields of the README's get_dicts() example, all of them readable off a lite search result
+EXPORT_FIELDS = ('ID', 'Name', 'FullPath', 'ObjectType', 'Enabled', 'Owner', 'LastInstanceExecutionDateTime',
+                 'NextScheduledExecutionDateTime', 'CreationDateTime')
+
+# column types of the fields we know, anything else is exported as a string
+COLUMN_TYPES = {'ID': 'int', 'ParentID': 'int', 'RevisionID': 'int', 'Enabled': 'bool', 'ObjectType': 'str',
+                'CreationDateTime': 'datetime', 'LastInstanceExecutionDateTime': 'datetime',
+                'NextScheduledExecutionDateTime': 'datetime'}
+
+FORMATS = {'.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow', '.csv': 'csv'}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        raise ImportError("Exporting to Parquet or Arrow needs pyarrow (pip install pyarrow), CSV doesn't") from None
+
+
+def _arrow_type(pa, column_type: str):
+    return {'int': pa.int64(), 'bool': pa.bool_(), 'datetime': pa.timestamp('s')}.get(column_type, pa.string())
+
+
+class _CsvWriter(object):
+    def __init__(self, path, fields):
+        self.outfile = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.outfile, fieldnames=fields)
+        self.writer.writeheader()
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+        self.outfile.flush()
+
+    def close(self):
+        self.outfile.close()
+
+
+class _ArrowWriter(object):
+    """one Parquet row group or Arrow IPC record batch per batch of rows"""
+
+    def __init__(self, path, fields, file_format):
+        self.pa = _pyarrow()
+        self.schema = self.pa.schema([(_field, _arrow_type(self.pa, COLUMN_TYPES.get(_field, 'str')))
+                                      for _field in fields])
+        if file_format == 'parquet':
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(path, self.schema)
+        else:
+            import pyarrow.ipc as ipc
+            self.writer = ipc.new_file(path, self.schema)
+
+    def write(self, rows):
+        # column by column rather than Table.from_pylist, which needs pyarrow 7 and so Python 3.7
+        _columns = [self.pa.array([_row.get(_field.name) for _row in rows], type=_field.type) for _field in self.schema]
+        self.writer.write_table(self.pa.Table.from_arrays(_columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class InventoryExporter(object):
+    """
+    Writes the lite metadata of everything under `root` to a Parquet, Arrow IPC or CSV file, as the Search results
+    stream in. Rows are converted to typed columns (dates, booleans, IDs, ObjectType names) and written `batch_size`
+    at a time, one Parquet row group or Arrow record batch per batch, so memory stays at one batch whatever the size of
+    the tree, and the file fills up while the crawl is still going
+
+    with ABConnectionManager('activebatch', 12) as ab:
+        InventoryExporter(ab, '/Finance').export('finance.parquet')
+
+    The format is taken from the file extension (see FORMATS) unless one is given. `fields` must be readable off a lite
+    object; fields an object doesn't have, e.g. the execution dates of a Folder, are left empty. `query` takes an
+    Objects.query.Query to export instead of everything under `root`
+
+    Parquet and Arrow need pyarrow, CSV doesn't
+    """
+
+    def __init__(self, scheduler, root='/', fields=EXPORT_FIELDS, object_filter: int = 65535, batch_size: int = 5000,
+                 query=None):
+        self.scheduler = scheduler
+        self.root = root
+        self.fields = list(fields)
+        self.object_filter = object_filter
+        self.batch_size = batch_size
+        self.query = query
+
+    def __repr__(self):
+        return f"InventoryExporter(root={self.root}, fields={len(self.fields)}, batch_size={self.batch_size})"
+
+    def _items(self):
+        if self.query is not None:
+            return iter(self.query)
+        return self.scheduler.iter_search(self.root, ObjectFilter=self.object_filter)
+
+    def _object_type(self, item):
+        _code = read_field(item, 'ObjectType')
+        if _code is None:
+            return None
+        _id = read_field(item, 'ID')
+        # on V9, Folders come back as Plans unless the type cache knows better (see JobScheduler.prime_type_cache)
+        _code = self.scheduler.type_cache.get(int(_id) if _id is not None else None, _code)
+        try:
+            return enum.ObjectType(int(_code)).name
+        except (KeyError, ValueError):
+            return str(_code)
+
+    def row(self, item) -> dict:
+        """a lite search result (or Catalog row) as a dictionary of typed values"""
+        _row = {}
+        for _field in self.fields:
+            if _field == 'ObjectType':
+                _row[_field] = self._object_type(item)
+                continue
+            _value = read_field(item, _field)
+            _type = COLUMN_TYPES.get(_field, 'str')
+            if _value is None or _type == 'datetime':
+                pass
+            elif _type == 'int':
+                _value = int(_value)
+            elif _type == 'bool':
+                _value = bool(_value)
+            elif isinstance(_value, (list, tuple)):
+                _value = ','.join(str(_v) for _v in _value)
+            else:
+                _value = str(_value)
+            _row[_field] = _value
+        return _row
+
+    def export(self, path: str, file_format: str = None) -> dict:
+        """writes the file and returns how many rows and batches it took, and how fast"""
+        file_format = file_format or FORMATS.get(os.path.splitext(path)[1].lower())
+        if file_format not in set(FORMATS.values()):
+            raise ValueError(f"Can't tell the format of '{path}', expected one of {', '.join(sorted(FORMATS))} or "
+                             f"file_format='parquet', 'arrow' or 'csv'")
+        _version = self.scheduler.version
+        if 'ObjectType' in self.fields and _version is not None and _version <= 9:
+            self.scheduler.prime_type_cache(self.root)
+
+        _start = time.perf_counter()
+        if file_format == 'csv':
+            _writer = _CsvWriter(path, self.fields)
+        else:
+            _writer = _ArrowWriter(path, self.fields, file_format)
+        _rows, _batches, _batch = 0, 0, []
+        try:
+            for item in self._items():
+                _batch.append(self.row(item))
+                if len(_batch) >= self.batch_size:
+                    _writer.write(_batch)
+                    _rows, _batches, _batch = _rows + len(_batch), _batches + 1, []
+                    logging.debug(f"{_rows} rows written to {path}")
+            if _batch or not _batches:
+                _writer.write(_batch)  # an empty batch still leaves a readable file with the schema
+                _rows, _batches = _rows + len(_batch), _batches + 1
+        finally:
+            _writer.close()
+        _elapsed = time.perf_counter() - _start
+        _summary = {'path': path, 'format': file_format, 'rows': _rows, 'batches': _batches,
+                    'elapsed_seconds': round(_elapsed, 2),
+                    'rows_per_second': round(_rows / _elapsed, 1) if _elapsed else None}
+        logging.info(f"Exported {_rows} objects under '{self.root}' to {path} in {_summary['elapsed_seconds']}s")
+        return _summary
@@ -0,0 +1,227 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+from Handlers.session_pool import Progress, RateLimiter
+from Objects.api import AllAttributes
+from Objects.query import TYPES, read_field
+
+OPERATIONS = ('purge', 'flush', 'reset_counters')
+# the types FlushInstances and ResetCounters run on that Objects.api has a class for, see their @Decorators.runnable
+_INSTANCE_TYPES = ('Job', 'Plan')
+# how long an object has been idle: since its last run, or since it was created if it never ran
+AGE_FIELDS = ('LastInstanceExecutionDateTime', 'CreationDateTime')
+# when an object went into the RecycleBin. A deleted object without it is never purged, unless `modified_as_deleted`
+# falls back on its ModifiedDateTime, which only tells when it was deleted if the server updates it on delete
+DELETED_FIELD = 'DeletedDateTime'
+DELETED_FALLBACK_FIELD = 'ModifiedDateTime'
+
+
+def _last_activity(item):
+    _dates = [_date for _date in (read_field(item, _field) for _field in AGE_FIELDS) if _date is not None]
+    return max(_dates) if _dates else None
+
+
+def _deleted(item, fallback: bool):
+    for _field in (DELETED_FIELD, DELETED_FALLBACK_FIELD) if fallback else (DELETED_FIELD,):
+        _date = read_field(item, _field)
+        if _date is not None:
+            return AllAttributes.normalize_date(_date) if hasattr(_date, 'year') else None
+    return None
+
+
+def _under(path: str, root: str) -> bool:
+    _root = root.rstrip('/')
+    return not _root or path == _root or path.startswith(_root + '/')
+
+
+def _type_filter(types) -> int:
+    """Search ObjectFilter (and GetObjectsLite Filter) of the type names"""
+    _filter = 0
+    for _type in types:
+        _filter |= TYPES[_type][1]
+    return _filter
+
+
+class Housekeeping(object):
+    """
+    Nightly clean up of a scheduler: purges what has been sitting in the RecycleBin, and flushes the instances and/or
+    resets the counters of the Jobs and Plans under `root`, in parallel over a SessionPool
+
+    with SessionPool('activebatch', 12, size=4) as pool:
+        housekeeping = Housekeeping(pool, 'housekeeping.jsonl', '/', operations=('purge', 'flush'),
+                                    older_than_days=30, objects_per_second=20)
+        housekeeping.run()
+
+    Candidates are picked from one listing of the RecycleBin and one Search of `root`, by type (`object_types`, names
+    of Objects.query.TYPES) and by age. The RecycleBin holds what was deleted anywhere on the scheduler, so only the
+    objects whose FullPath was under `root` are purged. Objects are flushed or reset if they haven't run (or been
+    created, see AGE_FIELDS) in the last `older_than_days` days. Objects are purged once they've been in the RecycleBin
+    for `deleted_more_than_days` days, going by their DeletedDateTime and not by when they last ran, so something
+    deleted by mistake can still be restored whatever its age. Without a DeletedDateTime they're kept, unless
+    `modified_as_deleted` is set for a server known to update ModifiedDateTime on delete. None picks everything.
+    `objects_per_second`
+    caps the rate across every worker on top of the pool's own `calls_per_second`, and the pool's size bounds how many
+    run at once
+
+    The plan and every object done are journaled to `state_file` as JSON lines, the same way as MaintenanceWindow.
+    Rerunning after an interruption or failures carries on with the same plan and only runs what's left of it; a new
+    plan is only drawn up once the previous one finished
+    """
+
+    def __init__(self, pool, state_file: str, root: str = '/', operations=('purge', 'flush'),
+                 object_types=_INSTANCE_TYPES, older_than_days: float = 30, objects_per_second: float = None,
+                 deleted_more_than_days: float = 30, modified_as_deleted: bool = False):
+        _unknown = [_op for _op in operations if _op not in OPERATIONS]
+        if _unknown:
+            raise ValueError(f"Unknown operations {_unknown}, expected some of {', '.join(OPERATIONS)}")
+        _unknown = [_type for _type in object_types if _type not in TYPES]
+        if _unknown:
+            raise ValueError(f"Unknown object types {_unknown}, expected some of {', '.join(TYPES)}")
+        self.pool = pool
+        self.state_file = state_file
+        self.root = root
+        self.operations = tuple(operations)
+        self.object_types = tuple(object_types)
+        self.older_than_days = older_than_days
+        self.deleted_more_than_days = deleted_more_than_days
+        self.modified_as_deleted = modified_as_deleted
+        self.rate_limiter = RateLimiter(objects_per_second, burst=pool.size)
+        self.plan = None  # [(operation, id, path, ObjectType code)]
+        self.done = set()  # (operation, id)
+        self.finished = False
+        self._bins = {}  # {id(session): RecycleBin}, a COM object stays with the session that fetched it
+        self._lock = threading.Lock()
+        self._load()
+
+    def __repr__(self):
+        return f"Housekeeping(root={self.root}, operations={self.operations}, state_file={self.state_file})"
+
+    @property
+    def pending(self) -> list:
+        return [_task for _task in self.plan or [] if (_task[0], _task[1]) not in self.done]
+
+    def _journal(self, entry: dict):
+        with open(self.state_file, 'a') as outfile:
+            outfile.write(json.dumps(entry) + '\n')
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return
+        with open(self.state_file, 'r') as infile:
+            for line in infile:
+                _entry = json.loads(line)
+                _op = _entry['op']
+                if _op == 'plan':
+                    self.plan = [tuple(_task) for _task in _entry['tasks']]
+                    self.done, self.finished = set(), False
+                elif _op == 'done':
+                    self.done.add((_entry['operation'], _entry['id']))
+                elif _op == 'finished':
+                    self.finished = True
+        logging.info(f"Loaded {self.__repr__()}: {len(self.done)} of {len(self.plan or [])} done")
+
+    def select(self) -> list:
+        """draws up and journals a new plan, [(operation, id, path, ObjectType code)] in the order they'll run"""
+        _now = datetime.now()
+        _cutoff = _now - timedelta(days=self.older_than_days) if self.older_than_days is not None else None
+        _deleted_cutoff = (_now - timedelta(days=self.deleted_more_than_days)
+                           if self.deleted_more_than_days is not None else None)
+        _purge = 'purge' in self.operations
+        _instance_ops = [_op for _op in self.operations if _op != 'purge']
+        _instance_types = [_type for _type in self.object_types if _type in _INSTANCE_TYPES]
+        if _instance_ops and not _instance_types:
+            raise ValueError(f"{', '.join(_instance_ops)} only run on {' and '.join(_INSTANCE_TYPES)}")
+
+        def _old_enough(item) -> bool:
+            if _cutoff is None:
+                return True
+            _activity = _last_activity(item)
+            return _activity is not None and _activity < _cutoff
+
+        def _deleted_long_enough(item) -> bool:
+            if _deleted_cutoff is None:
+                return True
+            _deleted_at = _deleted(item, self.modified_as_deleted)
+            if _deleted_at is None:
+                logging.warning(f"Not purging [{item.FullPath} : {item.ID}], there's no telling when it was deleted")
+                return False
+            return _deleted_at < _deleted_cutoff
+
+        def _list(session):
+            _tasks = []
+            if _purge:
+                for item in session.GetRecycleBin().GetObjectsLite(_type_filter(self.object_types)):
+                    if _under(item.FullPath, self.root) and _deleted_long_enough(item):
+                        _tasks.append(('purge', int(item.ID), item.FullPath, int(item.ObjectType)))
+            if _instance_ops:
+                for item in session.iter_search(self.root, ObjectFilter=_type_filter(_instance_types)):
+                    if _old_enough(item):
+                        _tasks.extend((_op, int(item.ID), item.FullPath, int(item.ObjectType)) for _op in _instance_ops)
+            return _tasks
+
+        self.plan = self.pool.submit(_list).result()
+        self.done, self.finished = set(), False
+        self._journal({'op': 'plan', 'root': self.root, 'taken': datetime.now().isoformat(),
+                       'cutoff': _cutoff.isoformat() if _cutoff is not None else None,
+                       'deleted_cutoff': _deleted_cutoff.isoformat() if _deleted_cutoff is not None else None,
+                       'tasks': self.plan})
+        _counts = {_op: sum(1 for _task in self.plan if _task[0] == _op) for _op in self.operations}
+        logging.info(f"Housekeeping plan for '{self.root}': {_counts}")
+        return self.plan
+
+    def _recycle_bin(self, session):
+        _key = id(session)
+        with self._lock:
+            _bin = self._bins.get(_key)
+        if _bin is None:
+            _bin = session.GetRecycleBin()
+            with self._lock:
+                self._bins[_key] = _bin
+        return _bin
+
+    def _run_task(self, session, task):
+        """runs inside a pool worker"""
+        _operation, _id, _, _type = task
+        self.rate_limiter.acquire()
+        if _operation == 'purge':
+            self._recycle_bin(session).PurgeObject(_id)
+            return task
+        # the listing already told us the type, which spares get_object its GetObjectType call
+        session.type_cache.setdefault(_id, _type)
+        _obj = session.get_object(_id, lite=False)
+        if _operation == 'flush':
+            _obj.FlushInstances()
+        else:
+            _obj.ResetCounters()
+        return task
+
+    def run(self) -> dict:
+        """carries on with the journaled plan if it didn't finish, otherwise draws up a new one first"""
+        if self.plan is None or self.finished:
+            self.select()
+        _pending = self.pending
+        if len(_pending) < len(self.plan):
+            logging.info(f"Resuming: {len(self.plan) - len(_pending)} of {len(self.plan)} already done")
+        _progress = Progress(total=len(_pending), label='objects housekept')
+        _failures = {}
+        for _task, _, _error in self.pool.map(self._run_task, _pending, progress=_progress):
+            _operation, _id, _path, _ = _task
+            if _error is None:
+                self._journal({'op': 'done', 'operation': _operation, 'id': _id})
+                self.done.add((_operation, _id))
+            else:
+                _failures[f'{_operation} {_id}'] = str(_error)
+                logging.error(f"Failed to {_operation} [{_path} : {_id}]: {_error}")
+        if not self.pending and not self.finished:
+            self.finished = True
+            self._journal({'op': 'finished', 'finished': datetime.now().isoformat()})
+        _summary = _progress.summary()
+        _summary.update({'operations': {_op: sum(1 for _task in _pending if _task[0] == _op and
+                                                 (_op, _task[1]) in self.done) for _op in self.operations},
+                         'failures': _failures})
+        logging.info(f"Housekeeping: {_summary['succeeded']} ok, {_summary['failed']} failed in "
+                     f"{_summary['elapsed_seconds']}s ({_summary['per_second']} objects/s)")
+        return _summary
@@ -0,0 +1,153 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+# upper bounds (seconds) of the latency histogram buckets, the last bucket catches everything else
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+
+class MethodStats(object):
+    __slots__ = ('count', 'errors', 'total', 'minimum', 'maximum', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.minimum = float('inf')
+        self.maximum = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def add(self, elapsed: float, failed: bool):
+        self.count += 1
+        self.errors += failed
+        self.total += elapsed
+        if elapsed < self.minimum:
+            self.minimum = elapsed
+        if elapsed > self.maximum:
+            self.maximum = elapsed
+        for idx, _bound in enumerate(BUCKETS):
+            if elapsed <= _bound:
+                self.buckets[idx] += 1
+                break
+
+    def copy(self):
+        _copy = MethodStats()
+        _copy.count, _copy.errors, _copy.total = self.count, self.errors, self.total
+        _copy.minimum, _copy.maximum, _copy.buckets = self.minimum, self.maximum, list(self.buckets)
+        return _copy
+
+    def to_dict(self) -> dict:
+        return {'count': self.count,
+                'errors': self.errors,
+                'total_seconds': self.total,
+                'mean_seconds': self.total / self.count if self.count else 0.0,
+                'min_seconds': self.minimum if self.count else 0.0,
+                'max_seconds': self.maximum,
+                'buckets': {str(_bound): _n for _bound, _n in zip(BUCKETS, self.buckets)}
+                }
+
+
+class Instrumentation(object):
+    """
+    Call counters, error counters and latency histograms for every method and attribute that goes through
+    @Decorators.runnable, keyed by (class, method)
+
+    Disabled by default, in which case the decorator only pays for one attribute lookup per call. Turn it on with
+    instrumentation.enable() or by setting the ABAT_INSTRUMENTATION environment variable to 1 before the run, and
+    dump the results with dump('stats.json') or dump('stats.prom') at the end of the run
+
+    Times are inclusive, so a Search that maps its results to api classes also contains the time spent in the
+    GetObjectType and GetAbatObjectLite calls made for every result
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started = time.time()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'Instrumentation(enabled={self.enabled}, methods={len(self._stats)})'
+
+    def enable(self):
+        if not self.enabled:
+            self.started = time.time()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+            self.started = time.time()
+
+    def record(self, clsname: str, funcname: str, elapsed: float, failed: bool = False):
+        _key = (clsname, funcname)
+        with self._lock:
+            _stats = self._stats.get(_key)
+            if _stats is None:
+                _stats = self._stats[_key] = MethodStats()
+            _stats.add(elapsed, failed)
+
+    def stats(self) -> dict:
+        """{(class, method): MethodStats}, copies that are safe to read while calls are still being recorded"""
+        with self._lock:
+            return {_key: _stats.copy() for _key, _stats in self._stats.items()}
+
+    def top(self, n: int = 10) -> list:
+        """the `n` most expensive (class, method) pairs by total time, with their share of the wall time"""
+        _wall = max(time.time() - self.started, 1e-9)
+        _stats = sorted(self.stats().items(), key=lambda kv: kv[1].total, reverse=True)[:n]
+        return [(f'{_cls}.{_method}', _s.count, round(_s.total, 6), round(_s.total / _wall, 4))
+                for (_cls, _method), _s in _stats]
+
+    def to_json(self) -> str:
+        import json  # Objects.api imports this module, keep it cheap to import
+        _data = {'started': self.started,
+                 'wall_seconds': time.time() - self.started,
+                 'methods': [dict({'class': _cls, 'method': _method}, **_s.to_dict())
+                             for (_cls, _method), _s in sorted(self.stats().items())]
+                 }
+        return json.dumps(_data, indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        Prometheus text exposition format, ready for the node_exporter textfile collector. Every metric family has
+        all of its samples right under its HELP and TYPE lines, as the format requires
+        """
+        _stats = [(f'class="{_cls}",method="{_method}"', _s) for (_cls, _method), _s in sorted(self.stats().items())]
+        _lines = ['# HELP abat_calls_total Calls made through the ActiveBatch COM wrappers',
+                  '# TYPE abat_calls_total counter']
+        _lines += [f'abat_calls_total{{{_labels}}} {_s.count}' for _labels, _s in _stats]
+        _lines += ['# HELP abat_call_errors_total Calls that raised an exception',
+                   '# TYPE abat_call_errors_total counter']
+        _lines += [f'abat_call_errors_total{{{_labels}}} {_s.errors}' for _labels, _s in _stats]
+        _lines += ['# HELP abat_call_seconds Latency of the calls made through the ActiveBatch COM wrappers',
+                   '# TYPE abat_call_seconds histogram']
+        for _labels, _s in _stats:
+            _cumulative = 0
+            for _bound, _n in zip(BUCKETS, _s.buckets):
+                _cumulative += _n
+                _le = '+Inf' if _bound == float('inf') else repr(_bound)
+                _lines.append(f'abat_call_seconds_bucket{{{_labels},le="{_le}"}} {_cumulative}')
+            _lines.append(f'abat_call_seconds_sum{{{_labels}}} {_s.total}')
+            _lines.append(f'abat_call_seconds_count{{{_labels}}} {_s.count}')
+        return '\n'.join(_lines) + '\n'
+
+    def dump(self, path: str, fmt: str = None):
+        """writes the stats to `path`; `fmt` is 'json' or 'prometheus' and defaults to whatever the extension says"""
+        if fmt is None:
+            fmt = 'json' if path.lower().endswith('.json') else 'prometheus'
+        _text = self.to_json() if fmt == 'json' else self.to_prometheus()
+        with open(path, 'w') as outfile:
+            outfile.write(_text)
+        logging.info(f'Instrumentation written to {path}')
+
+    def dump_on_exit(self, path: str, fmt: str = None):
+        atexit.register(self.dump, path, fmt)
+
+
+instrumentation = Instrumentation(enabled=os.environ.get('ABAT_INSTRUMENTATION') == '1')
@@ -0,0 +1,284 @@
+import logging
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+from Objects.query import read_field
+
+_OLF_SCHEDULABLE = 1 | 2  # Jobs and Plans, refer to the docstring of AllMethods.Search
+
+LATE = 'late'  # the scheduled time passed by more than the grace period and it hasn't started yet
+MISSED = 'missed'  # the scheduler moved on to its next run without this one ever starting
+RAN_LATE = 'ran_late'  # it did start, but more than the grace period after it was scheduled
+
+
+def _epoch(value) -> float:
+    """a date read off a lite object as epoch seconds, NaN if there is none"""
+    # an unset date comes back as the COM zero date (1899-12-30), which Windows can't turn into a timestamp anyway
+    if value is None or value.year < 1971:
+        return math.nan
+    return value.timestamp()  # naive datetimes are local time, the same as time.time()
+
+
+def _datetime(epoch: float):
+    return datetime.fromtimestamp(epoch) if not math.isnan(epoch) and not math.isinf(epoch) else None
+
+
+def _times(item) -> tuple:
+    """(last run, next run) of a lite object as epoch seconds, with no next run for a disabled object"""
+    _next = _epoch(read_field(item, 'NextScheduledExecutionDateTime'))
+    if read_field(item, 'Enabled') is False or math.isnan(_next):
+        _next = math.inf
+    return _epoch(read_field(item, 'LastInstanceExecutionDateTime')), _next
+
+
+def _refresh(session, object_id) -> tuple:
+    """runs inside a pool worker"""
+    return _times(session.GetAbatObjectLite(object_id))
+
+
+class LateRunDetector(object):
+    """
+    Finds the Jobs and Plans under `root` that should have started by now and didn't, without reading every one of
+    them on every check
+
+    with SessionPool('activebatch', 12, size=4) as pool:
+        detector = LateRunDetector(pool, '/Finance', grace_seconds=300, on_event=alert)
+        detector.load()
+        detector.start(interval=30, reload_every=3600)   # or detector.check() from your own loop
+
+    load() reads the last and next run times of everything with one lite Search, which also spares Plans the extra
+    LiteObject fetch Plan.__getattr__ does for NextScheduledExecutionDateTime. The times are kept in NumPy arrays
+    sorted by when each object is next due for a look (its next run plus `grace_seconds`), so a check() finds the due
+    objects with a binary search and only reads those again, over the pool. The due objects are the head of the arrays
+    and are dropped by slicing, without copying the rest. Their new times go into a small sorted run of their own, and
+    runs of about the same size are merged (see _add_run), so a check costs about the number of objects that are due,
+    times log n, in COM calls and in copying alike, however big the tree
+
+    A due object gives one of these events (see LATE, MISSED and RAN_LATE):
+    - it started since it was scheduled: nothing, or RAN_LATE if that was more than `grace_seconds` late
+    - it didn't and the scheduler moved on to a later run: MISSED
+    - it didn't and it's still waiting: LATE, once, and it's looked at again every `recheck_seconds`
+
+    Events are dictionaries, handed to `on_event` as soon as they're found and kept in `events` (the last `history`)
+
+    check() only reads objects that come due, so it never hears about Jobs and Plans added under the root, about
+    objects that were disabled or unscheduled at load() and got a schedule since, or that an object was deleted. A
+    later load() merges a new listing in for those (see load), which start() does every `reload_every` seconds
+    """
+
+    def __init__(self, pool, root: str = '/', grace_seconds: float = 300.0, recheck_seconds: float = 60.0,
+                 on_event=None, history: int = 1000):
+        self.pool = pool
+        self.root = root
+        self.grace_seconds = grace_seconds
+        self.recheck_seconds = recheck_seconds
+        self.on_event = on_event
+        self.events = deque(maxlen=history)
+        self.paths = {}  # {id: FullPath}
+        # sorted runs of (ids, scheduled, last, due) arrays, each sorted by due, the biggest first
+        self._runs = []
+        self.last_check = None
+        self._late = set()  # (id, scheduled) already reported LATE
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()  # a load() can't merge while a check() has due objects out for reading
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __repr__(self):
+        return f"LateRunDetector(root={self.root}, objects={len(self)}, grace_seconds={self.grace_seconds})"
+
+    def __len__(self):
+        return sum(len(_run[0]) for _run in self._runs)
+
+    def _column(self, idx: int):
+        """one of the arrays across every run, sorted by due, for looking at rather than for checking"""
+        if not self._runs:
+            return np.array([], dtype=np.int64 if idx == 0 else np.float64)
+        _order = np.argsort(np.concatenate([_run[3] for _run in self._runs]), kind='stable')
+        return np.concatenate([_run[idx] for _run in self._runs])[_order]
+
+    @property
+    def ids(self):
+        return self._column(0)
+
+    @property
+    def scheduled(self):
+        return self._column(1)
+
+    @property
+    def last(self):
+        return self._column(2)
+
+    @property
+    def due(self):
+        return self._column(3)
+
+    def _sort(self, ids, scheduled, last, due):
+        _order = np.argsort(due, kind='stable')
+        return ids[_order], scheduled[_order], last[_order], due[_order]
+
+    def _add_run(self, run):
+        """
+        adds a sorted run, merging it with the last ones as long as they're no more than twice its size, which keeps
+        about log n runs and copies every object about log n times over all the checks it goes through
+        """
+        self._runs.append(run)
+        while len(self._runs) > 1 and len(self._runs[-2][0]) <= 2 * len(self._runs[-1][0]):
+            _smaller = self._runs.pop()
+            _bigger = self._runs.pop()
+            # two sorted runs back to back, which the stable sort (timsort/radix) merges in linear time
+            self._runs.append(self._sort(*(np.concatenate((_a, _b)) for _a, _b in zip(_bigger, _smaller))))
+
+    def load(self, now: float = None) -> int:
+        """
+        reads every Job and Plan under the root with one lite Search, returns how many are watched
+
+        Once loaded, the listing is merged into what's watched: the objects whose scheduled time has passed keep the
+        times they have, so check() still reports on that run, the others (new, not scheduled or not due yet) take the
+        times just read, and the objects that aren't listed anymore are dropped
+        """
+        def _list(session):
+            return [(int(item.ID), item.FullPath) + _times(item)
+                    for item in session.iter_search(self.root, ObjectFilter=_OLF_SCHEDULABLE)]
+
+        _rows = self.pool.submit(_list).result()
+        now = time.time() if now is None else now
+        with self._busy, self._lock:
+            _columns = [np.concatenate([_run[idx] for _run in self._runs]) for idx in range(4)] if self._runs else \
+                [np.array([], dtype=np.int64)] + [np.array([], dtype=np.float64)] * 3
+            _listed = np.array([_row[0] for _row in _rows], dtype=np.int64)
+            _kept = np.isin(_columns[0], _listed) & (_columns[1] <= now)
+            _kept_ids = set(_columns[0][_kept].tolist())
+            _new = [_row for _row in _rows if _row[0] not in _kept_ids]
+            _scheduled = np.array([_row[3] for _row in _new], dtype=np.float64)
+            _run = (np.concatenate((_columns[0][_kept], np.array([_row[0] for _row in _new], dtype=np.int64))),
+                    np.concatenate((_columns[1][_kept], _scheduled)),
+                    np.concatenate((_columns[2][_kept], np.array([_row[2] for _row in _new], dtype=np.float64))),
+                    np.concatenate((_columns[3][_kept], _scheduled + self.grace_seconds)))
+            _added, _dropped = set(_listed.tolist()) - set(self.paths), set(self.paths) - set(_listed.tolist())
+            self.paths = {_row[0]: _row[1] for _row in _rows}
+            self._runs = [self._sort(*_run)] if _rows else []
+            self._late = {_late for _late in self._late if _late[0] in _kept_ids}
+        logging.info(f"Loaded {self.__repr__()}, {int(np.isfinite(_run[1]).sum())} of them scheduled, "
+                     f"{len(_added)} added and {len(_dropped)} dropped")
+        return len(_rows)
+
+    def due_count(self, now: float = None) -> int:
+        """how many objects the next check() would read"""
+        now = time.time() if now is None else now
+        return sum(int(np.searchsorted(_run[3], now, side='right')) for _run in self._runs)
+
+    def _event(self, event: str, object_id: int, scheduled: float, last: float, next_run: float, now: float) -> dict:
+        return {'event': event, 'id': object_id, 'path': self.paths.get(object_id), 'scheduled': _datetime(scheduled),
+                'last_run': _datetime(last), 'next_run': _datetime(next_run),
+                'delay_seconds': round((last if event == RAN_LATE else now) - scheduled, 1),
+                'detected': _datetime(now)}
+
+    def check(self, now=None) -> list:
+        """reads again the objects that are due, puts them back in order and returns the events they gave"""
+        _start = time.perf_counter()
+        if isinstance(now, datetime):
+            now = now.timestamp()
+        now = time.time() if now is None else now
+        with self._busy:
+            return self._check(now, _start)
+
+    def _check(self, now: float, started: float) -> list:
+        with self._lock:
+            _heads, _runs = [], []
+            for _run in self._runs:
+                _count = int(np.searchsorted(_run[3], now, side='right'))
+                # the due objects are the head of every run, what's left is a view of the rest, still in order
+                _heads.append([_column[:_count] for _column in _run])
+                if _count < len(_run[0]):
+                    _runs.append(tuple(_column[_count:] for _column in _run))
+            _count = sum(len(_head[0]) for _head in _heads)
+            if not _count:
+                self.last_check = {'due': 0, 'events': 0, 'elapsed_seconds': round(time.perf_counter() - started, 3)}
+                return []
+            self._runs = sorted(_runs, key=lambda _run: len(_run[0]), reverse=True)
+        _previous = {int(_id): (float(_scheduled), float(_last))
+                     for _head in _heads for _id, _scheduled, _last in zip(_head[0], _head[1], _head[2])}
+
+        _events, _rows = [], []
+        for _id, _result, _error in self.pool.map(_refresh, list(_previous)):
+            _scheduled, _last = _previous[_id]
+            if _error is not None:
+                # deleted objects keep failing until the next load() drops them, see reload_every
+                logging.error(f"Could not read [{self.paths.get(_id)} : {_id}]: {_error}")
+                _rows.append((_id, _scheduled, _last, now + self.recheck_seconds))
+                continue
+            _last, _next = _result
+            if _last >= _scheduled:
+                if _last - _scheduled > self.grace_seconds:
+                    _events.append(self._event(RAN_LATE, _id, _scheduled, _last, _next, now))
+                self._late.discard((_id, _scheduled))
+                _rows.append((_id, _next, _last, _next + self.grace_seconds))
+            elif _next > _scheduled:
+                _events.append(self._event(MISSED, _id, _scheduled, _last, _next, now))
+                self._late.discard((_id, _scheduled))
+                _rows.append((_id, _next, _last, _next + self.grace_seconds))
+            else:
+                if (_id, _scheduled) not in self._late:
+                    self._late.add((_id, _scheduled))
+                    _events.append(self._event(LATE, _id, _scheduled, _last, _next, now))
+                _rows.append((_id, _scheduled, _last, now + self.recheck_seconds))
+
+        if _rows:
+            _run = self._sort(np.array([_r[0] for _r in _rows], dtype=np.int64),
+                              np.array([_r[1] for _r in _rows], dtype=np.float64),
+                              np.array([_r[2] for _r in _rows], dtype=np.float64),
+                              np.array([_r[3] for _r in _rows], dtype=np.float64))
+            with self._lock:
+                self._add_run(_run)
+
+        for _event in _events:
+            self.events.append(_event)
+            logging.warning(f"{_event['event']}: [{_event['path']} : {_event['id']}] scheduled {_event['scheduled']}")
+            if self.on_event is not None:
+                try:
+                    self.on_event(_event)
+                except Exception as e:
+                    logging.exception(e, exc_info=True)
+        self.last_check = {'due': _count, 'events': len(_events),
+                           'elapsed_seconds': round(time.perf_counter() - started, 3)}
+        logging.debug(f"Checked {_count} due objects: {self.last_check}")
+        return _events
+
+    def _run(self, interval: float, reload_every: float = None):
+        _loaded = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                if reload_every is not None and time.monotonic() - _loaded >= reload_every:
+                    _loaded = time.monotonic()
+                    self.load()
+                self.check()
+            except Exception as e:
+                logging.exception(e, exc_info=True)
+            self._stop.wait(interval)
+
+    def start(self, interval: float = 30.0, reload_every: float = None):
+        """
+        checks every `interval` seconds in a background thread until stop(), load() first if it wasn't, and load()
+        again every `reload_every` seconds if given, to pick up added, rescheduled and deleted objects
+        """
+        if self._thread is not None:
+            return
+        if not self.paths:
+            self.load()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval, reload_every), name='late-run-detector',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
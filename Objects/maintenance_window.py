@@ -0,0 +1,129 @@
+import json
+import logging
+import os
+from datetime import datetime
+
+from Handlers.session_pool import Progress
+
+_OLF_PLAN = 2  # refer to the docstring of AllMethods.Search for the other ObjectFilter values
+
+
+def _set_enabled(session, object_id, enabled):
+    """runs inside a pool worker"""
+    _obj = session.get_object(object_id, lite=False)
+    if enabled:
+        _obj.Enable()
+    else:
+        _obj.Disable()
+    return object_id
+
+
+class MaintenanceWindow(object):
+    """
+    Bulk freeze/thaw of a subtree for maintenance windows
+
+    freeze() snapshots the `Enabled` state of every object under `root` that matches `object_filter` (Plans by default)
+    and disables the ones that are enabled. thaw() re-enables only the objects that freeze() itself disabled, so
+    anything that was already disabled before the window stays that way
+
+    Everything is journaled to `state_file` as JSON lines, one line per object as soon as its call succeeds. Rerunning
+    freeze() or thaw() after a partial failure picks up where the previous run stopped instead of snapshotting the
+    half-frozen tree again, which is what makes both operations safe to rerun
+
+    with SessionPool('activebatch', 12, size=4, calls_per_second=10) as pool:
+        window = MaintenanceWindow(pool, '/Finance', 'finance_patch_night.jsonl')
+        window.freeze()
+        ...
+        window.thaw()
+    """
+
+    def __init__(self, pool, root: str, state_file: str, object_filter: int = _OLF_PLAN, search_string: str = '*'):
+        self.pool = pool
+        self.root = root
+        self.state_file = state_file
+        self.object_filter = object_filter
+        self.search_string = search_string
+        self.snapshot = None  # {id: {'path': FullPath, 'enabled': bool}}
+        self.disabled = set()  # ids disabled by this window
+        self.restored = set()  # ids re-enabled by this window
+        self.thawed = False
+        self._load()
+
+    def __repr__(self):
+        return f"MaintenanceWindow(root={self.root}, state_file={self.state_file})"
+
+    @property
+    def pending_restore(self) -> set:
+        return self.disabled - self.restored
+
+    def _journal(self, entry: dict):
+        with open(self.state_file, 'a') as outfile:
+            outfile.write(json.dumps(entry) + '\n')
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return
+        with open(self.state_file, 'r') as infile:
+            for line in infile:
+                _entry = json.loads(line)
+                _op = _entry['op']
+                if _op == 'snapshot':
+                    self.snapshot = {int(_id): _state for _id, _state in _entry['objects'].items()}
+                    self.disabled, self.restored, self.thawed = set(), set(), False
+                elif _op == 'disabled':
+                    self.disabled.add(_entry['id'])
+                elif _op == 'enabled':
+                    self.restored.add(_entry['id'])
+                elif _op == 'thawed':
+                    self.thawed = True
+        logging.info(f"Loaded {self.__repr__()}: {len(self.disabled)} disabled, {len(self.restored)} restored")
+
+    def take_snapshot(self) -> dict:
+        def _read(session):
+            _results = session.search_lite(self.root, SearchString=self.search_string,
+                                           ObjectFilter=self.object_filter)
+            return {int(item.ID): {'path': item.FullPath, 'enabled': bool(item.Enabled)} for item in _results}
+
+        self.snapshot = self.pool.submit(_read).result()
+        self.disabled, self.restored, self.thawed = set(), set(), False
+        self._journal({'op': 'snapshot', 'root': self.root, 'taken': datetime.now().isoformat(),
+                       'objects': self.snapshot})
+        logging.info(f"Snapshot of '{self.root}' taken: {len(self.snapshot)} objects, "
+                     f"{sum(_state['enabled'] for _state in self.snapshot.values())} enabled")
+        return self.snapshot
+
+    def _apply(self, ids, enabled: bool) -> dict:
+        _label = 'enable' if enabled else 'disable'
+        _progress = Progress(total=len(ids), label=f'objects to {_label}')
+        _failures = {}
+        for _id, _, _error in self.pool.map(lambda session, _id: _set_enabled(session, _id, enabled), ids,
+                                            progress=_progress):
+            if _error is None:
+                self._journal({'op': 'enabled' if enabled else 'disabled', 'id': _id})
+                (self.restored if enabled else self.disabled).add(_id)
+            else:
+                _failures[_id] = str(_error)
+                logging.error(f"Failed to {_label} [{self.snapshot[_id]['path']} : {_id}]: {_error}")
+        _summary = _progress.summary()
+        _summary['failures'] = _failures
+        logging.info(f"{_label}: {_summary['succeeded']} ok, {_summary['failed']} failed in "
+                     f"{_summary['elapsed_seconds']}s ({_summary['per_second']}/s)")
+        return _summary
+
+    def freeze(self) -> dict:
+        """disables everything that was enabled at snapshot time, skipping what a previous run already disabled"""
+        if self.snapshot is None or self.thawed:
+            self.take_snapshot()
+        _targets = sorted(_id for _id, _state in self.snapshot.items()
+                          if _state['enabled'] and _id not in self.disabled)
+        return self._apply(_targets, enabled=False)
+
+    def thaw(self) -> dict:
+        """re-enables only the objects that freeze() disabled, skipping what a previous run already re-enabled"""
+        if self.snapshot is None:
+            raise ValueError(f"There is no snapshot in '{self.state_file}' to restore from")
+        _summary = self._apply(sorted(self.pending_restore), enabled=True)
+        if not self.pending_restore and not self.thawed:
+            self.thawed = True
+            self._journal({'op': 'thawed', 'finished': datetime.now().isoformat()})
+        return _summary
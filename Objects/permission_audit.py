@@ -0,0 +1,225 @@
+import json
+import logging
+from array import array
+from bisect import bisect_left
+
+from Objects import enumerations as enum
+
+_OLF_ALL = 65535  # refer to the docstring of AllMethods.Search for the other ObjectFilter values
+
+# refer to enumerations.JobSecurityAccess
+PERMISSIONS = ('abatJSA_Read', 'abatJSA_Write', 'abatJSA_Delete', 'abatJSA_Use', 'abatJSA_Manage', 'abatJSA_Trigger',
+               'abatJSA_ChangePerms', 'abatJSA_TakeOwnership', 'abatJSA_FullControl')
+
+# flags kept next to the permission bits of every object
+INFERRED = 1  # copied from the container above, which replaces the permissions of everything under it, not checked
+REPLACES_CHILDREN = 2  # a container with ReplacePermissionsOnChildObjects set, or under one
+
+
+def _covers(granted: int, mask: int) -> bool:
+    """True if holding `granted` implies holding `mask`, -1 (FullControl) implies everything"""
+    return granted == -1 or (mask != -1 and granted & mask == mask)
+
+
+def _check_object(session, object_id, masks):
+    """
+    runs inside a pool worker, (permission bits, flags) of one object for the connected user
+
+    Masks are checked from the broadest down, and whatever a granted mask already covers (or a denied mask is
+    covered by) is settled without calling HasPermission; with FullControl granted that's a single call
+    """
+    _obj = session.get_object(object_id, lite=False).obj
+    _order = sorted(range(len(masks)), key=lambda idx: (masks[idx] != -1, -bin(masks[idx] & 0xFFFFFFFF).count('1')))
+    _granted, _denied, _bits = [], [], 0
+    for idx in _order:
+        _mask = masks[idx]
+        if any(_covers(_g, _mask) for _g in _granted):
+            _has = True
+        elif any(_covers(_mask, _d) for _d in _denied):
+            _has = False
+        else:
+            _has = bool(_obj.HasPermission(_mask))
+        (_granted if _has else _denied).append(_mask)
+        if _has:
+            _bits |= 1 << idx
+    _flags = REPLACES_CHILDREN if getattr(_obj, 'ReplacePermissionsOnChildObjects', False) else 0
+    return _bits, _flags
+
+
+class PermissionAudit(object):
+    """
+    What the connected user may do on every object under `root`, as a matrix of objects by permissions (see
+    PERMISSIONS and enumerations.JobSecurityAccess)
+
+    with SessionPool('activebatch', 12, size=4) as pool:
+        audit = PermissionAudit(pool, '/Finance')
+        audit.run()
+        audit.has(job_id, 'abatJSA_Trigger')
+        audit.save('finance_permissions.json')
+        changes = audit.diff(PermissionAudit.load(pool, 'last_week.json'))
+
+    Objects are read over the pool one level of the tree at a time, so a container is always settled before what's
+    under it. HasPermission is only called for the masks that can't be inferred from the ones already answered
+
+    A container with ReplacePermissionsOnChildObjects set pushed its permissions down to everything under it when it
+    was saved, so with `infer_from_containers` those objects get a copy of its row instead of being checked. That
+    saves most of the calls on such trees, but a child whose permissions were changed since isn't seen, so it's off by
+    default and the copied rows are flagged INFERRED, in matrix() and in save() alike
+
+    An object that couldn't be checked has no row and is kept in `errors`; diff() reports it as 'unknown' rather than
+    as removed or added
+
+    Every object's row is a single integer, one bit per permission, kept in arrays sorted by ID
+    """
+
+    def __init__(self, pool, root='/', permissions=PERMISSIONS, infer_from_containers: bool = False):
+        if len(permissions) > 63:
+            raise ValueError("At most 63 permissions can be audited at once")
+        self.pool = pool
+        self.root = root
+        self.permissions = list(permissions)
+        self.masks = [enum.JobSecurityAccess(_name).code for _name in self.permissions]
+        self.infer_from_containers = infer_from_containers
+        self.ids = array('q')
+        self.bits = array('q')
+        self.flags = array('b')
+        self.paths = []
+        self.errors = {}  # {id: error} of the objects that couldn't be checked
+        self.calls_saved = 0
+
+    def __repr__(self):
+        return f"PermissionAudit(root={self.root}, objects={len(self.ids)}, permissions={len(self.permissions)})"
+
+    def _listing(self) -> dict:
+        """{id: (ParentID, FullPath)} of everything under the root, and of the root itself unless it's '/'"""
+        def _list(session):
+            _listing = {int(item.ID): (int(item.ParentID), item.FullPath)
+                        for item in session.iter_search(self.root, ObjectFilter=_OLF_ALL)}
+            if self.root not in ('', '/'):
+                _obj = session.GetAbatObjectLite(self.root)
+                _listing[int(_obj.ID)] = (int(_obj.ParentID), _obj.FullPath)
+            return _listing
+        return self.pool.submit(_list).result()
+
+    def run(self) -> dict:
+        from Handlers.session_pool import Progress
+        _listing = self._listing()
+        _levels = {}
+        for _id, (_parent, _path) in _listing.items():
+            _levels.setdefault(_path.count('/'), []).append(_id)
+
+        _rows = {}  # {id: (bits, flags)}
+        self.errors, self.calls_saved = {}, 0
+        _progress = Progress(total=len(_listing), label='objects audited')
+        for _level in sorted(_levels):
+            _pending = []
+            for _id in _levels[_level]:
+                _parent = _rows.get(_listing[_id][0])
+                if self.infer_from_containers and _parent is not None and _parent[1] & REPLACES_CHILDREN:
+                    _rows[_id] = (_parent[0], INFERRED | REPLACES_CHILDREN)
+                    self.calls_saved += len(self.masks)
+                    _progress.update(True)
+                else:
+                    _pending.append(_id)
+            for _id, _row, _error in self.pool.map(lambda session, _id: _check_object(session, _id, self.masks),
+                                                   _pending, progress=_progress):
+                if _error is not None:
+                    self.errors[_id] = str(_error)
+                    logging.error(f"Could not audit [{_listing[_id][1]} : {_id}]: {_error}")
+                else:
+                    _rows[_id] = _row
+
+        self.ids, self.bits, self.flags, self.paths = array('q'), array('q'), array('b'), []
+        for _id in sorted(_rows):
+            self.ids.append(_id)
+            self.bits.append(_rows[_id][0])
+            self.flags.append(_rows[_id][1])
+            self.paths.append(_listing[_id][1])
+        _summary = _progress.summary()
+        _summary.update({'inferred': sum(1 for _f in self.flags if _f & INFERRED), 'errors': len(self.errors),
+                         'checks_skipped': self.calls_saved})
+        logging.info(f"Audited {self.__repr__()}: {_summary}")
+        return _summary
+
+    def _position(self, object_id):
+        idx = bisect_left(self.ids, int(object_id))
+        if idx == len(self.ids) or self.ids[idx] != int(object_id):
+            raise KeyError(object_id)
+        return idx
+
+    def row(self, object_id) -> dict:
+        """{permission: bool} of one object"""
+        _bits = self.bits[self._position(object_id)]
+        return {_name: bool(_bits >> idx & 1) for idx, _name in enumerate(self.permissions)}
+
+    def has(self, object_id, permission: str) -> bool:
+        return bool(self.bits[self._position(object_id)] >> self.permissions.index(permission) & 1)
+
+    def inferred(self, object_id) -> bool:
+        """True if the row of the object was copied from a container rather than checked"""
+        return bool(self.flags[self._position(object_id)] & INFERRED)
+
+    def objects_with(self, permission: str, granted: bool = True) -> list:
+        """the paths of the objects where `permission` is (or isn't) granted"""
+        _bit = self.permissions.index(permission)
+        return [_path for _path, _bits in zip(self.paths, self.bits) if bool(_bits >> _bit & 1) == granted]
+
+    def matrix(self) -> list:
+        """one dictionary per object, e.g. for a DataFrame"""
+        return [dict({'ID': _id, 'FullPath': _path, 'Inferred': bool(_flags & INFERRED)},
+                     **{_name: bool(_bits >> idx & 1) for idx, _name in enumerate(self.permissions)})
+                for _id, _path, _bits, _flags in zip(self.ids, self.paths, self.bits, self.flags)]
+
+    def diff(self, previous) -> list:
+        """
+        What changed since a `previous` audit of the same permissions: objects that appeared or disappeared, and the
+        permissions granted or revoked on the others. An object that either audit couldn't check is 'unknown', with
+        the `error`
+        """
+        if previous.permissions != self.permissions:
+            raise ValueError("Only audits of the same permissions can be compared")
+        _before = {_id: (_bits, _path) for _id, _bits, _path in zip(previous.ids, previous.bits, previous.paths)}
+        _after = {_id: (_bits, _path) for _id, _bits, _path in zip(self.ids, self.bits, self.paths)}
+        _errors = dict(previous.errors)
+        _errors.update(self.errors)
+        _changes = []
+        for _id in sorted(set(_before) | set(_after) | set(_errors)):
+            if _id in _errors and (_id not in _before or _id not in _after):
+                _path = (_after.get(_id) or _before.get(_id) or (None, None))[1]
+                _changes.append({'id': _id, 'path': _path, 'change': 'unknown', 'error': _errors[_id]})
+            elif _id not in _before:
+                _changes.append({'id': _id, 'path': _after[_id][1], 'change': 'added'})
+            elif _id not in _after:
+                _changes.append({'id': _id, 'path': _before[_id][1], 'change': 'removed'})
+            elif _before[_id][0] != _after[_id][0]:
+                _old, _new = _before[_id][0], _after[_id][0]
+                _changes.append({'id': _id, 'path': _after[_id][1], 'change': 'modified',
+                                 'granted': [_n for idx, _n in enumerate(self.permissions)
+                                             if _new >> idx & 1 and not _old >> idx & 1],
+                                 'revoked': [_n for idx, _n in enumerate(self.permissions)
+                                             if _old >> idx & 1 and not _new >> idx & 1]})
+        return _changes
+
+    def save(self, path: str):
+        with open(path, 'w') as outfile:
+            json.dump({'root': self.root, 'permissions': self.permissions,
+                       'infer_from_containers': self.infer_from_containers,
+                       'flags': {'inferred': INFERRED, 'replaces_children': REPLACES_CHILDREN},
+                       'rows': [[_id, _bits, _flags, _path] for _id, _bits, _flags, _path
+                                in zip(self.ids, self.bits, self.flags, self.paths)],
+                       'inferred': [_id for _id, _flags in zip(self.ids, self.flags) if _flags & INFERRED],
+                       'errors': self.errors}, outfile)
+        logging.info(f"{len(self.ids)} audited objects written to {path}")
+
+    @classmethod
+    def load(cls, pool, path: str):
+        with open(path, 'r') as infile:
+            _data = json.load(infile)
+        _audit = cls(pool, _data['root'], _data['permissions'], _data.get('infer_from_containers', False))
+        for _id, _bits, _flags, _path in _data['rows']:
+            _audit.ids.append(_id)
+            _audit.bits.append(_bits)
+            _audit.flags.append(_flags)
+            _audit.paths.append(_path)
+        _audit.errors = {int(_id): _error for _id, _error in _data.get('errors', {}).items()}
+        return _audit
@@ -0,0 +1,314 @@
+import fnmatch
+import logging
+import time
+
+from Objects.api import AllAttributes, HybridObject
+
+# type name: (ObjectType code, Search ObjectFilter bit), refer to enumerations.ObjectType and AllMethods.Search
+TYPES = {'Job': (2, 1),
+         'Plan': (3, 2),
+         'Queue': (4, 4),
+         'GenericQueue': (15, 8),
+         'Schedule': (5, 16),
+         'Calendar': (6, 32),
+         'UserAccount': (7, 64),
+         'AlertObject': (9, 128),
+         'ResourceObject': (8, 256),
+         'Reference': (10, 512),
+         'ServiceLibrary': (13, 1024),
+         'Folder': (14, 2048),
+         'ObjectList': (16, 4096)}
+_OLF_ALL = 65535
+_SEARCHABLE = ('Name', 'Label')  # the fields the SearchString of a Search can match on
+_DATES = ('CreationDateTime', 'LastInstanceExecutionDateTime', 'NextScheduledExecutionDateTime')
+
+# what a Catalog keeps of every object, all of it readable off a lite object
+CATALOG_FIELDS = ('ID', 'Name', 'Label', 'FullPath', 'ParentID', 'ObjectType', 'Enabled', 'Owner', 'Tags',
+                  'RevisionID') + _DATES
+
+
+def read_field(item, field: str):
+    """
+    A field of a lite search result or of a Catalog row, None if the object doesn't have it (e.g. the execution dates
+    of a Folder). Dates are converted the same way as AllAttributes.normalize_date
+    """
+    if isinstance(item, dict):
+        return item.get(field)
+    try:
+        _value = getattr(item, field)
+    except Exception:
+        return None
+    if field in _DATES and _value is not None:
+        try:
+            return AllAttributes.normalize_date(_value)
+        except ValueError:
+            return None
+    return _value
+
+
+def _is_pattern(value) -> bool:
+    return isinstance(value, str) and any(_c in value for _c in '*?[')
+
+
+def _matches(actual, expected) -> bool:
+    """
+    `expected` is either a callable that's handed the value, a glob pattern, a list/tuple/set of acceptable values or
+    a plain value. Strings are compared regardless of case, the way the scheduler compares names
+    """
+    if callable(expected):
+        return bool(expected(actual))
+    if isinstance(expected, (list, tuple, set, frozenset)):
+        return any(_matches(actual, _e) for _e in expected)
+    if actual is None:
+        return expected is None
+    if isinstance(expected, str):
+        if _is_pattern(expected):
+            return fnmatch.fnmatchcase(str(actual).casefold(), expected.casefold())
+        return str(actual).casefold() == expected.casefold()
+    return actual == expected
+
+
+def _tags(value) -> set:
+    if value is None:
+        return set()
+    if isinstance(value, str):
+        return {_t.strip().casefold() for _t in value.split(',') if _t.strip()}
+    return {str(_t).strip().casefold() for _t in value}
+
+
+def _parent_path(path: str) -> str:
+    return path.rsplit('/', 1)[0] or '/'
+
+
+class Catalog(object):
+    """
+    A local copy of the lite metadata (CATALOG_FIELDS) of everything under `root`, read with a single Search. While it
+    is younger than `max_age` seconds, queries under its root are answered from it without going to the COM
+
+    with ABConnectionManager('activebatch', 12) as ab:
+        ab.catalog = Catalog(ab, '/', max_age=600)
+        ab.catalog.refresh()
+        disabled = ab.query().type('Job').where(Enabled=False).ids()  # no COM call
+
+    On V9 and older the ObjectType of Folders comes back as 3 like that of Plans (see AllMethods.GetObjectType), so
+    refresh() resolves them with JobScheduler.prime_type_cache first
+    """
+
+    def __init__(self, scheduler, root: str = '/', max_age: float = 300.0):
+        self.scheduler = scheduler
+        self.root = root
+        self.max_age = max_age
+        self.rows = {}  # {id: {field: value}}
+        self.built_at = None  # time.monotonic() of the last refresh
+
+    def __repr__(self):
+        return f"Catalog(root={self.root}, objects={len(self.rows)}, fresh={self.fresh})"
+
+    @property
+    def fresh(self) -> bool:
+        return self.built_at is not None and time.monotonic() - self.built_at <= self.max_age
+
+    @property
+    def age(self):
+        """seconds since the last refresh, None if it was never built"""
+        return None if self.built_at is None else time.monotonic() - self.built_at
+
+    def refresh(self) -> int:
+        _start = time.monotonic()
+        _version = self.scheduler.version
+        if _version is not None and _version <= 9:
+            self.scheduler.prime_type_cache(self.root)
+        _rows = {}
+        for item in self.scheduler.iter_search(self.root):
+            _row = {_field: read_field(item, _field) for _field in CATALOG_FIELDS}
+            _row['ID'] = int(_row['ID'])
+            _row['ObjectType'] = self.scheduler.type_cache.get(_row['ID'], _row['ObjectType'])
+            _rows[_row['ID']] = _row
+        self.rows = _rows
+        self.built_at = time.monotonic()
+        logging.info(f"Catalog of '{self.root}' refreshed with {len(self.rows)} objects in "
+                     f"{self.built_at - _start:.2f}s")
+        return len(self.rows)
+
+    def _root_path(self, key):
+        """the FullPath of `key` if this catalog can tell it, None otherwise"""
+        if isinstance(key, int) or (isinstance(key, str) and key.isdigit()):
+            _row = self.rows.get(int(key))
+            return _row['FullPath'] if _row is not None else None
+        return key.rstrip('/') or '/'
+
+    def covers(self, key) -> bool:
+        """True if everything under `key` is in this catalog"""
+        _path, _root = self._root_path(key), self.root.rstrip('/') or '/'
+        if _path is None:
+            return False
+        return _root == '/' or _path == _root or _path.startswith(_root + '/')
+
+    def under(self, key, recursive: bool = True):
+        """the rows under `key`, not including `key` itself, the same as what a Search on it would return"""
+        _path = self._root_path(key)
+        _prefix = '/' if _path == '/' else _path + '/'
+        for _row in self.rows.values():
+            _full_path = _row['FullPath'] or ''
+            if not _full_path.startswith(_prefix) or _full_path == _path:
+                continue
+            if recursive or _parent_path(_full_path) == _path:
+                yield _row
+
+
+class Query(object):
+    """
+    Declarative selection over a JobScheduler, built with JobScheduler.query()
+
+    ab.query().type('Job').under('/Finance').where(Enabled=False, Owner='svc_*').ids()
+    ab.query().type('Job', 'Plan').named('*_Daily').where(LastInstanceExecutionDateTime=lambda d: d < cutoff).rows()
+
+    Whatever the COM Search can do is pushed into its arguments: the types become the ObjectFilter, the root key and
+    depth become SearchRootKey and Recursive, and one Name or Label pattern becomes the SearchString and FieldNames.
+    Everything else (Enabled, Owner, Tags, dates, any other lite field and arbitrary predicates) is evaluated locally
+    on the lite results as they stream in, so nothing is mapped to its api class and the results are never all held
+    at once. Pushed patterns are checked again locally, since the COM doesn't document how it matches them
+
+    If the query has a fresh Catalog that covers its root key, it is answered from the catalog without any COM call.
+    explain() tells which one it would be and what is evaluated where
+    """
+
+    def __init__(self, scheduler, catalog=None):
+        self.scheduler = scheduler
+        self.catalog = catalog
+        self._root = '/'
+        self._recursive = True
+        self._types = []
+        self._conditions = []  # [(field, expected)]
+        self._predicates = []  # callables taking the lite item or catalog row
+        self._limit = None
+
+    def __repr__(self):
+        return f"Query({self.explain()})"
+
+    def type(self, *names):
+        """keeps only objects of these types, see TYPES"""
+        for _name in names:
+            if _name not in TYPES:
+                raise ValueError(f"Unknown type '{_name}', expected one of {', '.join(TYPES)}")
+            self._types.append(_name)
+        return self
+
+    def under(self, key, recursive: bool = True):
+        self._root, self._recursive = key, recursive
+        return self
+
+    def where(self, **conditions):
+        """field=expected pairs that must all hold, see _matches for what `expected` can be"""
+        self._conditions.extend(conditions.items())
+        return self
+
+    def named(self, pattern: str):
+        return self.where(Name=pattern)
+
+    def tagged(self, *tags):
+        """keeps only objects carrying all of these tags"""
+        _wanted = _tags(tags)
+        return self.filter(lambda item: _wanted <= _tags(read_field(item, 'Tags')))
+
+    def between(self, field: str, start=None, end=None):
+        """keeps only objects whose date `field` falls in [start, end), objects without it are dropped"""
+        def _between(item):
+            _value = read_field(item, field)
+            return _value is not None and (start is None or _value >= start) and (end is None or _value < end)
+        return self.filter(_between)
+
+    def filter(self, predicate):
+        """any callable taking a lite search result or catalog row, see read_field to read fields off either"""
+        self._predicates.append(predicate)
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def _pushed_pattern(self):
+        """the (field, pattern) that goes into the SearchString, the first plain Name or Label condition"""
+        for _field, _expected in self._conditions:
+            if _field in _SEARCHABLE and isinstance(_expected, str):
+                return _field, _expected
+        return None
+
+    def search_arguments(self) -> dict:
+        _filter = 0
+        for _name in self._types:
+            _filter |= TYPES[_name][1]
+        _arguments = {'SearchRootKey': self._root, 'SearchString': '*', 'ObjectFilter': _filter or _OLF_ALL,
+                      'FieldNames': 'AllFields', 'Recursive': self._recursive}
+        _pushed = self._pushed_pattern()
+        if _pushed is not None:
+            _arguments['FieldNames'], _arguments['SearchString'] = _pushed
+        return _arguments
+
+    def uses_catalog(self) -> bool:
+        return self.catalog is not None and self.catalog.fresh and self.catalog.covers(self._root)
+
+    def explain(self) -> dict:
+        _local = [f'{_field}={_expected!r}' for _field, _expected in self._conditions]
+        _local += [getattr(_p, '__name__', repr(_p)) for _p in self._predicates]
+        if self.uses_catalog():
+            return {'source': 'catalog', 'root': self._root, 'recursive': self._recursive, 'types': self._types,
+                    'local': _local, 'limit': self._limit}
+        return {'source': 'search', 'search': self.search_arguments(), 'local': _local, 'limit': self._limit}
+
+    def _candidates(self):
+        if self.uses_catalog():
+            _codes = {TYPES[_name][0] for _name in self._types}
+            for _row in self.catalog.under(self._root, self._recursive):
+                if not _codes or _row['ObjectType'] in _codes:
+                    yield _row
+        else:
+            yield from self.scheduler.iter_search(**self.search_arguments())
+
+    def _accepts(self, item) -> bool:
+        for _field, _expected in self._conditions:
+            if not _matches(read_field(item, _field), _expected):
+                return False
+        return all(_predicate(item) for _predicate in self._predicates)
+
+    def __iter__(self):
+        """the lite search results, or catalog rows, that match. Stops reading from the COM once the limit is hit"""
+        _count = 0
+        if self._limit is not None and self._limit <= 0:
+            return
+        for item in self._candidates():
+            if self._accepts(item):
+                yield item
+                _count += 1
+                if self._limit is not None and _count >= self._limit:
+                    return
+
+    def ids(self) -> list:
+        return [int(read_field(item, 'ID')) for item in self]
+
+    def rows(self, fields=CATALOG_FIELDS) -> list:
+        """the matches as plain dictionaries of `fields`, which must be readable off a lite object"""
+        return [{_field: read_field(item, _field) for _field in fields} for item in self]
+
+    def first(self):
+        for item in self:
+            return item
+        return None
+
+    def count(self) -> int:
+        return sum(1 for _ in self)
+
+    def objects(self, lite: bool = True, hybrid: bool = False) -> list:
+        """
+        the matches mapped to their api classes, as HybridObjects if `hybrid`. Only lite search results are reused as
+        they are, catalog rows and full objects cost a GetAbatObject(Lite) each
+        """
+        _objects = []
+        for item in self:
+            _id = int(read_field(item, 'ID'))
+            _obj = None if isinstance(item, dict) or not (lite or hybrid) else item
+            _object = self.scheduler._get_object(_id, lite=lite or hybrid, obj=_obj)
+            if hybrid:
+                _object = HybridObject(_object)
+            _objects.append(_object)
+        return _objects
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import logging
+
+from Handlers.session_pool import Progress
+
+_OLF_SCHEDULE = 16  # refer to the docstring of AllMethods.Search for the other ObjectFilter values
+
+# the fields that make up each kind of DaySpec/TimeSpec, by their enumeration codes (see enumerations.Schedule*Type)
+_DAY_FIELDS = {1: ('DaySpec_DailyInterval',),
+               2: ('DaySpec_WeeklyDaysOfWeek', 'DaySpec_WeeklyInterval'),
+               3: ('DaySpec_MonthlyType', 'DaySpec_MonthlyInterval')}
+_MONTHLY_FIELDS = {1: ('DaySpec_MonthlyDayOfMonth',),
+                   2: ('DaySpec_MonthlyInstance', 'DaySpec_MonthlyDayOfWeek'),
+                   3: ('DaySpec_MonthlyDaySeries',)}
+_TIME_FIELDS = {1: ('TimeSpec_Hours', 'TimeSpec_Minutes'),
+                3: ('TimeSpec_Interval',)}
+_SERIES = ('DaySpec_MonthlyDaySeries', 'TimeSpec_Hours', 'TimeSpec_Minutes')  # may hold several values
+
+
+def _series(value) -> list:
+    """'15, 1,1' and 1 both become a sorted list of unique values; anything that isn't a number (e.g. 'L') is kept"""
+    _values = set()
+    for _token in str(value).replace(',', ' ').split():
+        _values.add(int(_token) if _token.lstrip('-').isdigit() else _token.upper())
+    return sorted(_values, key=lambda v: (isinstance(v, str), str(v).zfill(8)))
+
+
+def read_spec(schedule) -> dict:
+    """
+    The normalized specification of a Schedule (api.Schedule): everything that decides when it fires, and nothing
+    that doesn't, like its name or ID. Day types _typemapper doesn't know (yearly, quarterly, custom) can't be
+    compared safely, so their spec carries the schedule's ID and never matches another one
+    """
+    _obj = schedule.obj
+    _day_type, _time_type = int(_obj.DaySpec_Type), int(_obj.TimeSpec_Type)
+    _spec = {'CalendarType': int(_obj.CalendarType), 'DaySpec_Type': _day_type, 'TimeSpec_Type': _time_type}
+    if _day_type not in _DAY_FIELDS:
+        _spec['unsupported'] = int(_obj.ID)
+    _fields = list(_DAY_FIELDS.get(_day_type, ()))
+    if _day_type == 3:
+        _fields += _MONTHLY_FIELDS.get(int(_obj.DaySpec_MonthlyType), ())
+    _fields += _TIME_FIELDS.get(_time_type, ())
+    for _field in _fields:
+        _value = getattr(_obj, _field)
+        _spec[_field] = _series(_value) if _field in _SERIES else int(_value)
+    if _time_type == 2:
+        _spec['ExactTimes'] = sorted({f'{_t.DateTime.hour:0>2}:{_t.DateTime.minute:0>2}'
+                                      for _t in schedule.TimeSpec_GetExactTimes()})
+    _spec['Calendars'] = sorted(set(schedule.GetAssociatedCalendarsObjectId().ids()))
+    return _spec
+
+
+def fingerprint(spec: dict) -> str:
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def _read_schedule(session, schedule_id):
+    """runs inside a pool worker"""
+    _schedule = session.get_object(schedule_id, lite=False)
+    _spec = read_spec(_schedule)
+    return {'id': schedule_id,
+            'name': _schedule.Name,
+            'path': _schedule.FullPath,
+            'parent_id': int(_schedule.ParentID),
+            'spec': _spec,
+            'fingerprint': fingerprint(_spec),
+            'jobs': sorted({int(_item.Value) for _item in _schedule.GetAssociatedJobs()})}
+
+
+class ScheduleFingerprints(object):
+    """
+    Finds the Schedules under `root` that fire at exactly the same times and works out how to consolidate them
+
+    Every schedule is reduced to a normalized spec (see read_spec: DaySpec/TimeSpec fields, exact times, monthly day
+    series and associated calendars) and hashed. Schedules with the same hash are equivalent, and consolidation_plan()
+    picks one of each group to keep, lists the jobs and plans to repoint at it, and the duplicates that are left
+    without any association afterwards
+
+    with SessionPool('activebatch', 12, size=4) as pool:
+        fingerprints = ScheduleFingerprints(pool, '/')
+        fingerprints.collect()
+        plan = fingerprints.consolidation_plan()
+        fingerprints.save('schedule_consolidation.json')
+
+    With `per_folder`, schedules are only grouped with the schedules of their own folder, for estates where jobs must
+    keep using the schedules of their own folder
+
+    This only produces the plan. The COM has no documented way of changing the schedules associated with a job, so
+    the repointing itself is left to whoever applies the plan
+    """
+
+    def __init__(self, pool, root: str = '/', per_folder: bool = False):
+        self.pool = pool
+        self.root = root
+        self.per_folder = per_folder
+        self.schedules = {}  # {id: {'id', 'name', 'path', 'parent_id', 'spec', 'fingerprint', 'jobs'}}
+        self.errors = {}
+
+    def __repr__(self):
+        return f"ScheduleFingerprints(root={self.root}, schedules={len(self.schedules)})"
+
+    def collect(self) -> dict:
+        _ids = self.pool.submit(
+            lambda session: session.search_lite(self.root, ObjectFilter=_OLF_SCHEDULE).ids()).result()
+        self.schedules, self.errors = {}, {}
+        _progress = Progress(total=len(_ids), label='schedules fingerprinted')
+        for _id, _result, _error in self.pool.map(_read_schedule, _ids, progress=_progress):
+            if _error is None:
+                self.schedules[_id] = _result
+            else:
+                self.errors[_id] = str(_error)
+                logging.error(f"Could not fingerprint schedule {_id}: {_error}")
+        logging.info(f"Collected {self.__repr__()}: {len(self.groups())} groups of equivalent schedules")
+        return self.schedules
+
+    def _group_key(self, schedule: dict):
+        return (schedule['parent_id'], schedule['fingerprint']) if self.per_folder else schedule['fingerprint']
+
+    def groups(self) -> list:
+        """lists of the IDs of equivalent schedules, only for specs shared by more than one schedule"""
+        _groups = {}
+        for _id in sorted(self.schedules):
+            _groups.setdefault(self._group_key(self.schedules[_id]), []).append(_id)
+        return [_ids for _ids in _groups.values() if len(_ids) > 1]
+
+    def consolidation_plan(self) -> list:
+        """
+        One entry per group of equivalent schedules. The schedule with the most associated jobs is kept (the lowest ID
+        on a tie), every job or plan associated with one of the others is either repointed to it or, if it is already
+        associated with it, just unlinked, and the others become removable
+        """
+        _plan = []
+        for _ids in self.groups():
+            _keep = min(_ids, key=lambda _id: (-len(self.schedules[_id]['jobs']), _id))
+            _kept_jobs = set(self.schedules[_keep]['jobs'])
+            _actions = []
+            for _id in _ids:
+                if _id == _keep:
+                    continue
+                for _job in self.schedules[_id]['jobs']:
+                    _actions.append({'job': _job, 'from': _id, 'to': _keep,
+                                     'action': 'unlink' if _job in _kept_jobs else 'repoint'})
+            _plan.append({'fingerprint': self.schedules[_keep]['fingerprint'],
+                          'spec': self.schedules[_keep]['spec'],
+                          'keep': _keep,
+                          'keep_path': self.schedules[_keep]['path'],
+                          'remove': [{'id': _id, 'path': self.schedules[_id]['path']} for _id in _ids if _id != _keep],
+                          'actions': _actions})
+        return _plan
+
+    def summary(self) -> dict:
+        _plan = self.consolidation_plan()
+        return {'schedules': len(self.schedules),
+                'distinct': len({self._group_key(_s) for _s in self.schedules.values()}),
+                'groups': len(_plan),
+                'removable': sum(len(_group['remove']) for _group in _plan),
+                'repoints': sum(_a['action'] == 'repoint' for _group in _plan for _a in _group['actions']),
+                'unlinks': sum(_a['action'] == 'unlink' for _group in _plan for _a in _group['actions']),
+                'errors': len(self.errors)}
+
+    def save(self, path: str):
+        with open(path, 'w') as outfile:
+            json.dump({'root': self.root, 'per_folder': self.per_folder, 'summary': self.summary(),
+                       'plan': self.consolidation_plan(), 'errors': self.errors}, outfile, indent=2)
+        logging.info(f"Consolidation plan written to {path}")
@@ -0,0 +1,230 @@
+import json
+import logging
+
+from Handlers.session_pool import Progress
+
+MAX_NAME_BYTES = 128  # ActiveBatch object names are limited to 128 bytes
+
+_OLF_SCHEDULE = 16  # refer to the docstring of AllMethods.Search for the other ObjectFilter values
+_OLF_ALL = 65535
+
+# plan statuses
+UNCHANGED = 'unchanged'
+RENAME = 'rename'
+COLLISION = 'collision'
+TOO_LONG = 'too_long'
+ERROR = 'error'
+# apply statuses
+RENAMED = 'renamed'
+STALE = 'stale'
+FAILED = 'failed'
+
+
+def _read_names(session, root):
+    """runs inside a pool worker, the name of everything under `root` keyed by ID"""
+    return {int(item.ID): {'name': item.Name, 'parent_id': int(item.ParentID), 'path': item.FullPath}
+            for item in session.search_lite(root, ObjectFilter=_OLF_ALL)}
+
+
+def _production_name(session, schedule_id):
+    """runs inside a pool worker"""
+    _schedule = session.get_object(schedule_id, lite=False)
+    return _schedule.Label, _schedule.production_name
+
+
+def _rename_batch(session, batch):
+    """runs inside a pool worker, renames every schedule of `batch` and returns {id: (status, detail)}"""
+    _results = {}
+    for _entry in batch:
+        try:
+            _schedule = session.get_object(_entry['id'], lite=False)
+            if _schedule.Name != _entry['name']:
+                # renamed by someone else since the plan was made, the collision checks no longer hold
+                _results[_entry['id']] = (STALE, f"name is now '{_schedule.Name}'")
+                continue
+            _schedule.obj.Name = _entry['proposed']
+            _schedule.obj.Label = _entry['proposed']
+            _schedule.Update()
+            _results[_entry['id']] = (RENAMED, None)
+        except Exception as e:
+            _results[_entry['id']] = (FAILED, str(e))
+    return _results
+
+
+def _key(name: str) -> str:
+    return name.casefold()  # names are compared the way the scheduler compares them, regardless of case
+
+
+class ScheduleNamePlanner(object):
+    """
+    Renames every Schedule under `root` to its Schedule.production_name, the whole estate at a time instead of one
+    productionalize_schedulename() and one Update() after another
+
+    plan() reads the names of everything under `root` into a local index with a single Search, computes every
+    production name in parallel over the pool, and classifies each schedule as
+
+        unchanged   its name and label already are the production name
+        rename      needs renaming, and the new name is free in its folder
+        collision   the production name is already taken in its folder, by another object or by another schedule with
+                    the same specification (the lowest ID gets the name)
+        too_long    the production name is over the 128 byte limit
+        error       the production name could not be computed
+
+    apply() then renames only the schedules marked `rename`, in batches of `batch_size` handed out to the pool. A
+    rename that takes the current name of another schedule in the same folder waits until that schedule has been
+    renamed, and circular renames (two schedules swapping names) are reported as collisions. A schedule that was
+    renamed by somebody else after the plan was made is skipped as stale
+
+    with SessionPool('activebatch', 12, size=4, calls_per_second=10) as pool:
+        planner = ScheduleNamePlanner(pool, '/Finance')
+        planner.plan()
+        print(planner.diff())
+        planner.apply()
+
+    The pool's rate limit applies to batches, not to the individual renames inside a batch
+    """
+
+    def __init__(self, pool, root: str = '/', batch_size: int = 50):
+        self.pool = pool
+        self.root = root
+        self.batch_size = batch_size
+        self.entries = {}  # {schedule id: {'id', 'parent_id', 'path', 'name', 'label', 'proposed', 'status', ...}}
+        self._names = {}
+
+    def __repr__(self):
+        return f"ScheduleNamePlanner(root={self.root}, schedules={len(self.entries)})"
+
+    def plan(self) -> dict:
+        self._names = self.pool.submit(_read_names, self.root).result()
+        _schedule_ids = self.pool.submit(
+            lambda session: session.search_lite(self.root, ObjectFilter=_OLF_SCHEDULE).ids()).result()
+        self.entries = {}
+        _progress = Progress(total=len(_schedule_ids), label='production names')
+        for _id, _result, _error in self.pool.map(_production_name, _schedule_ids, progress=_progress):
+            _known = self._names.get(_id, {})
+            _entry = {'id': _id, 'parent_id': _known.get('parent_id'), 'path': _known.get('path'),
+                      'name': _known.get('name'), 'label': None, 'proposed': None, 'status': None, 'detail': None,
+                      'wave': None}
+            if _error is not None:
+                _entry['status'], _entry['detail'] = ERROR, str(_error)
+            elif not _known:
+                _entry['status'], _entry['detail'] = ERROR, f"was created under '{self.root}' while planning"
+            else:
+                _entry['label'], _entry['proposed'] = _result
+                if _entry['proposed'] == _entry['name'] and _entry['proposed'] == _entry['label']:
+                    _entry['status'] = UNCHANGED
+                elif len(_entry['proposed'].encode('utf-8')) > MAX_NAME_BYTES:
+                    _entry['status'] = TOO_LONG
+                    _entry['detail'] = f"{len(_entry['proposed'].encode('utf-8'))} bytes"
+                else:
+                    _entry['status'] = RENAME
+            self.entries[_id] = _entry
+        self._check_collisions()
+        self._schedule_waves()
+        logging.info(f"Planned {self.__repr__()}: {self.summary()}")
+        return self.entries
+
+    def _check_collisions(self):
+        """
+        Works out the names every folder ends up with. Everything that isn't renamed keeps its name, and a schedule
+        whose production name is already taken keeps its own, which can in turn take the production name away from
+        another schedule; this goes on until no more collisions turn up
+        """
+        _candidates = sorted(_id for _id, _entry in self.entries.items() if _entry['status'] == RENAME)
+        _kept = [_id for _id in self._names if _id not in self.entries or self.entries[_id]['status'] != RENAME]
+        while True:
+            _taken = {}
+            for _id in _kept:
+                _taken[(self._names[_id]['parent_id'], _key(self._names[_id]['name']))] = _id
+            _collided = False
+            for _id in _candidates:
+                _entry = self.entries[_id]
+                if _entry['status'] != RENAME:
+                    continue
+                _slot = (_entry['parent_id'], _key(_entry['proposed']))
+                _holder = _taken.get(_slot)
+                if _holder is not None and _holder != _id:
+                    _entry['status'] = COLLISION
+                    _entry['detail'] = f"'{_entry['proposed']}' is taken by " \
+                                       f"[{self._names[_holder]['path']} : {_holder}]"
+                    _kept.append(_id)
+                    _collided = True
+                else:
+                    _taken[_slot] = _id
+            if not _collided:
+                break
+
+    def _schedule_waves(self):
+        """a rename goes in the wave after the one that frees the name it takes"""
+        _current = {(_entry['parent_id'], _key(_entry['name'])): _id for _id, _entry in self.entries.items()
+                    if _entry['status'] == RENAME}
+
+        def _wave(_id, _visiting):
+            _entry = self.entries[_id]
+            if _entry['wave'] is not None:
+                return _entry['wave']
+            _holder = _current.get((_entry['parent_id'], _key(_entry['proposed'])))
+            if _holder is None or _holder == _id:
+                _entry['wave'] = 0
+            elif _holder in _visiting:
+                raise ValueError(_holder)
+            else:
+                _entry['wave'] = _wave(_holder, _visiting | {_id}) + 1
+            return _entry['wave']
+
+        for _id in sorted(_current.values()):
+            try:
+                _wave(_id, frozenset())
+            except ValueError:
+                _entry = self.entries[_id]
+                _entry['status'], _entry['wave'] = COLLISION, None
+                _entry['detail'] = f"'{_entry['proposed']}' is part of, or waits on, a circular rename"
+
+    def apply(self) -> dict:
+        """renames the schedules marked `rename` by plan(), wave after wave, and returns a summary"""
+        _pending = [_entry for _entry in self.entries.values() if _entry['status'] == RENAME]
+        _progress = Progress(total=len(_pending), label='schedules to rename')
+        for _wave in sorted({_entry['wave'] for _entry in _pending}):
+            _entries = sorted((_e for _e in _pending if _e['wave'] == _wave), key=lambda _e: _e['id'])
+            _batches = [_entries[idx:idx + self.batch_size] for idx in range(0, len(_entries), self.batch_size)]
+            for _batch, _results, _error in self.pool.map(_rename_batch, _batches):
+                if _error is not None:
+                    _results = {_entry['id']: (FAILED, str(_error)) for _entry in _batch}
+                for _id, (_status, _detail) in _results.items():
+                    self.entries[_id]['status'], self.entries[_id]['detail'] = _status, _detail
+                    _progress.update(_status == RENAMED)
+                    if _status != RENAMED:
+                        logging.error(f"Could not rename [{self.entries[_id]['path']} : {_id}]: {_status} {_detail}")
+        _summary = _progress.summary()
+        _summary['statuses'] = self.summary()
+        logging.info(f"Renamed {_summary['succeeded']} schedules, {_summary['failed']} failed in "
+                     f"{_summary['elapsed_seconds']}s ({_summary['per_second']}/s)")
+        return _summary
+
+    def summary(self) -> dict:
+        """{status: number of schedules}"""
+        _counts = {}
+        for _entry in self.entries.values():
+            _counts[_entry['status']] = _counts.get(_entry['status'], 0) + 1
+        return _counts
+
+    def diff(self, include_unchanged: bool = False) -> str:
+        """one line per schedule, '~' for renames, '!' for what can't be renamed and '=' for what's already fine"""
+        _marks = {RENAME: '~', RENAMED: '~', UNCHANGED: '='}
+        _lines = []
+        for _entry in sorted(self.entries.values(), key=lambda _e: _e['path'] or ''):
+            if _entry['status'] == UNCHANGED and not include_unchanged:
+                continue
+            _line = f"{_marks.get(_entry['status'], '!')} [{_entry['path']} : {_entry['id']}] '{_entry['name']}'"
+            if _entry['proposed'] is not None and _entry['status'] != UNCHANGED:
+                _line += f" -> '{_entry['proposed']}'"
+            _line += f" ({_entry['status']}{': ' + _entry['detail'] if _entry['detail'] else ''})"
+            _lines.append(_line)
+        return '\n'.join(_lines)
+
+    def save(self, path: str):
+        """the plan (or the outcome of apply) as JSON lines, one schedule per line"""
+        with open(path, 'w') as outfile:
+            for _entry in sorted(self.entries.values(), key=lambda _e: _e['id']):
+                outfile.write(json.dumps(_entry) + '\n')
+        logging.info(f"{len(self.entries)} schedules written to {path}")
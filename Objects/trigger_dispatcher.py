@@ -0,0 +1,90 @@
+import logging
+import time
+from typing import NamedTuple, Union
+
+from Handlers.session_pool import Progress, RateLimiter
+from Objects.variables import VariableCollections
+
+
+class TriggerRequest(NamedTuple):
+    """one trigger to submit, mirrors the parameters of AllMethods.Trigger3"""
+    key: Union[int, str]
+    variables: dict = None
+    queue_name: str = ''
+    job_parameters: str = ''
+    flags: int = 0
+    username: str = ''
+    password: str = ''
+
+
+class TriggerResult(NamedTuple):
+    request: TriggerRequest
+    instance_id: int = None
+    latency: float = None  # seconds spent inside the Trigger3 call
+    elapsed: float = None  # seconds between the request being queued and the trigger returning
+    error: str = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class TriggerDispatcher(object):
+    """
+    Submits a batch of triggers through a SessionPool. Concurrency is the size of the pool and `triggers_per_second`
+    caps how fast triggers are sent to the scheduler regardless of how many workers there are
+
+    Variables are given as plain dictionaries and are turned into ActiveBatch Variables collections once per distinct
+    set of values per connection, see VariableCollections
+
+    with SessionPool('activebatch', 12, size=8) as pool:
+        dispatcher = TriggerDispatcher(pool, triggers_per_second=5)
+        results = dispatcher.dispatch([TriggerRequest('/Finance/MonthEnd/Load', {'Period': '2020-06'}),
+                                       TriggerRequest('/Finance/MonthEnd/Load', {'Period': '2020-07'})])
+    """
+
+    def __init__(self, pool, triggers_per_second: float = None, collections: VariableCollections = None):
+        self.pool = pool
+        self.rate_limiter = RateLimiter(triggers_per_second)
+        self.collections = collections if collections is not None else VariableCollections()
+
+    def __repr__(self):
+        return f"TriggerDispatcher(pool={self.pool}, rate_limiter={self.rate_limiter})"
+
+    def _trigger(self, session, request: TriggerRequest, queued: float) -> TriggerResult:
+        """runs inside a pool worker"""
+        _obj = session.get_object(request.key, lite=False)
+        _variables = self.collections.get(session, request.variables or {})
+        self.rate_limiter.acquire()
+        _start = time.perf_counter()
+        _instance_id = _obj.Trigger3(QueueName=request.queue_name,
+                                     JobParameters=request.job_parameters,
+                                     Flags=request.flags,
+                                     Username=request.username,
+                                     Password=request.password,
+                                     Variables=_variables
+                                     )
+        _end = time.perf_counter()
+        return TriggerResult(request, _instance_id, _end - _start, _end - queued)
+
+    def submit(self, request: TriggerRequest):
+        """queues a single trigger and returns its Future"""
+        return self.pool.submit(self._trigger, request, time.perf_counter())
+
+    def dispatch(self, requests) -> list:
+        """
+        Queues every request and waits for all of them. Returns a TriggerResult per request in completion order; a
+        failed trigger doesn't stop the others and is reported through TriggerResult.error
+        """
+        _requests = [_r if isinstance(_r, TriggerRequest) else TriggerRequest(*_r) for _r in requests]
+        _progress = Progress(total=len(_requests), label='triggers')
+        _queued = time.perf_counter()
+        _results = []
+        for _request, _result, _error in self.pool.map(lambda session, _r: self._trigger(session, _r, _queued),
+                                                       _requests, progress=_progress):
+            if _error is not None:
+                logging.error(f"Failed to trigger '{_request.key}': {_error}")
+                _result = TriggerResult(_request, elapsed=time.perf_counter() - _queued, error=str(_error))
+            _results.append(_result)
+        logging.info(f"Dispatched {_progress.summary()}, {self.collections}")
+        return _results
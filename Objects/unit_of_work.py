@@ -0,0 +1,191 @@
+import logging
+import time
+
+# flush statuses
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'  # every property already had its new value, IsDirty said there was nothing to Update
+FAILED = 'failed'  # its pending changes were undone with UndoPendingChanges
+ROLLED_BACK = 'rolled_back'  # it was updated, then put back the way it was because another object failed
+NOT_RUN = 'not_run'  # never got to, the flush stopped at the first failure
+
+
+def _object_id(key) -> int:
+    """an ID, or the ID of an api object or of a lite search result"""
+    if isinstance(key, int):
+        return key
+    if isinstance(key, str) and key.isdigit():
+        return int(key)
+    _id = getattr(key, 'ID', None)
+    if _id is None:
+        raise ValueError(f"{key!r} is neither an object nor an ID, paths have to be resolved first")
+    return int(_id)
+
+
+def _apply_batch(session, batch) -> dict:
+    """
+    runs inside a pool worker (or on the unit of work's own session), applies {id: {property: value}} and returns
+    {id: (status, {property: value before}, error)}
+    """
+    _results = {}
+    for _id, _changes in batch:
+        _originals = {}
+        try:
+            _obj = session.GetAbatObject(_id)
+            for _name, _value in _changes.items():
+                _current = getattr(_obj, _name)
+                if _current == _value:
+                    continue  # setting it anyway would make the object dirty for nothing
+                _originals[_name] = _current
+                setattr(_obj, _name, _value)
+            if _originals and _obj.IsDirty():
+                _obj.Update()
+                _results[_id] = (UPDATED, _originals, None)
+            else:
+                _results[_id] = (UNCHANGED, _originals, None)
+        except Exception as e:
+            try:
+                session.UndoPendingChanges(_id)
+            except Exception as undo_error:
+                logging.error(f"UndoPendingChanges failed for {_id}: {undo_error}")
+            _results[_id] = (FAILED, _originals, e)
+    return _results
+
+
+class _Tracked(object):
+    """stands in for an object inside a unit of work, property assignments are recorded instead of sent to the COM"""
+
+    def __init__(self, unit, obj):
+        object.__setattr__(self, '_unit', unit)
+        object.__setattr__(self, '_obj', obj)
+
+    def __repr__(self):
+        return f"Tracked({self._obj!r})"
+
+    def __getattr__(self, name):
+        _pending = self._unit.changes.get(_object_id(self._obj), {})
+        if name in _pending:
+            return _pending[name]
+        return getattr(self._obj, name)
+
+    def __setattr__(self, name, value):
+        self._unit.set(self._obj, **{name: value})
+
+
+class UnitOfWork(object):
+    """
+    Collects property changes to any number of objects and sends them in one go, with a single Update per object
+    however many times it was changed, see JobScheduler.unit_of_work
+
+    with ab.unit_of_work(pool) as work:
+        for job in ab.Search('/Finance', ObjectFilter=1):
+            work.set(job, Enabled=False, Description='frozen for the audit')
+        plan = work.track(ab.get_object('/Finance/EOD', lite=False))
+        plan.Description = 'month end'  # recorded, the COM isn't touched until the block ends
+
+    Nothing reaches the scheduler until flush(), which runs when the block exits (and not at all if it raises). The
+    changes are handed out `batch_size` objects at a time to the pool's sessions, or run on `scheduler` itself without
+    a pool. Every object is read once, only the properties whose value differs are set, and Update is only called if
+    IsDirty says the object really changed
+
+    When an object fails, its pending changes are undone with UndoPendingChanges, batches that haven't started are
+    cancelled and, with `rollback`, the objects already updated get their previous values back with another Update.
+    That's as close to a transaction as the COM allows: someone could still see the first objects updated before the
+    rollback
+    """
+
+    def __init__(self, scheduler, pool=None, batch_size: int = 50, rollback: bool = True):
+        self.scheduler = scheduler
+        self.pool = pool
+        self.batch_size = batch_size
+        self.rollback = rollback
+        self.changes = {}  # {id: {property: value}}, the last value set wins
+        self.results = {}  # {id: status} of the last flush
+        self.assignments = 0
+
+    def __repr__(self):
+        return f"UnitOfWork(objects={len(self.changes)}, assignments={self.assignments})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            logging.warning(f"{self.__repr__()} discarded: {exc}")
+            self.changes = {}
+
+    def set(self, obj, **properties):
+        """records new values for the properties of `obj` (an api object, a lite result or an ID)"""
+        self.changes.setdefault(_object_id(obj), {}).update(properties)
+        self.assignments += len(properties)
+
+    def track(self, obj) -> _Tracked:
+        """`obj` with its property assignments recorded by this unit of work, reads see the recorded values"""
+        return _Tracked(self, obj)
+
+    def discard(self, obj=None):
+        """forgets the changes recorded for `obj`, or for everything"""
+        if obj is None:
+            self.changes = {}
+        else:
+            self.changes.pop(_object_id(obj), None)
+
+    def _batches(self, changes: dict) -> list:
+        _items = sorted(changes.items())
+        return [_items[idx:idx + self.batch_size] for idx in range(0, len(_items), self.batch_size)]
+
+    def _run(self, changes: dict, stop_on_failure: bool) -> dict:
+        """{id: (status, originals, error)} of every object of `changes`"""
+        _batches = self._batches(changes)
+        _results = {}
+        if self.pool is None:
+            for _batch in _batches:
+                _results.update(_apply_batch(self.scheduler, _batch))
+                if stop_on_failure and any(_r[0] == FAILED for _r in _results.values()):
+                    break
+        else:
+            _futures = [(self.pool.submit(_apply_batch, _batch), _batch) for _batch in _batches]
+            for _future, _batch in _futures:
+                if _future.cancelled():
+                    continue
+                try:
+                    _results.update(_future.result())
+                except Exception as e:
+                    _results.update({_id: (FAILED, {}, e) for _id, _ in _batch})
+                    continue
+                if stop_on_failure and any(_r[0] == FAILED for _r in _results.values()):
+                    for _other, _ in _futures:
+                        _other.cancel()  # only the ones no worker has picked up yet
+        for _id in changes:
+            _results.setdefault(_id, (NOT_RUN, {}, None))
+        return _results
+
+    def flush(self) -> dict:
+        """sends every recorded change, see the class docstring for what happens on a failure"""
+        _start = time.perf_counter()
+        _changes, self.changes = self.changes, {}
+        _results = self._run(_changes, stop_on_failure=self.rollback)
+        _failures = {_id: str(_error) for _id, (_status, _, _error) in _results.items() if _status == FAILED}
+        for _id, _error in _failures.items():
+            logging.error(f"Could not update {_id}: {_error}")
+
+        _rolled_back = {}
+        if _failures and self.rollback:
+            _updated = {_id: _originals for _id, (_status, _originals, _) in _results.items()
+                        if _status == UPDATED and _originals}
+            for _id, (_status, _, _error) in self._run(_updated, stop_on_failure=False).items():
+                if _status in (UPDATED, UNCHANGED):
+                    _rolled_back[_id] = ROLLED_BACK
+                else:
+                    logging.error(f"Could not roll back {_id}, it keeps the new values: {_error}")
+        self.results = {_id: _rolled_back.get(_id, _status) for _id, (_status, _, _) in _results.items()}
+
+        _elapsed = time.perf_counter() - _start
+        _summary = {_status: sum(1 for _s in self.results.values() if _s == _status)
+                    for _status in (UPDATED, UNCHANGED, FAILED, ROLLED_BACK, NOT_RUN)}
+        _summary.update({'objects': len(_changes), 'elapsed_seconds': round(_elapsed, 3), 'failures': _failures})
+        logging.info(f"Flushed {len(_changes)} objects: {_summary[UPDATED]} updated, {_summary[UNCHANGED]} "
+                     f"unchanged, {_summary[FAILED]} failed, {_summary[ROLLED_BACK]} rolled back in "
+                     f"{_summary['elapsed_seconds']}s")
+        return _summary
@@ -0,0 +1,298 @@
+import json
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+
+PUBLIC = 1  # abatAT_Public, refer to enumerations.AccessType
+PRIVATE = 2  # abatAT_Private
+
+# the objects GetVariables is runnable on (see AllMethods.GetVariables), as a Search ObjectFilter
+_OLF_VARIABLE_OWNERS = 1 | 2 | 12 | 64 | 512 | 2048  # Jobs, Plans, Queues, User Accounts, References and Folders
+
+
+def _variables_key(variables: dict) -> tuple:
+    """ActiveBatch stores every variable value as a string, so {'Count': 1} and {'Count': '1'} are the same collection"""
+    return tuple(sorted((str(name), str(value)) for name, value in variables.items()))
+
+
+def build_collection(scheduler, variables: dict):
+    """
+    Builds an ActiveBatch Variables collection out of a {name: value} dictionary so it can be passed to Trigger3
+
+    `scheduler` is the JobScheduler (connection) that will use the collection, COM objects can't be shared between
+    connections
+    """
+    _collection = scheduler.CreateObject(ObjectName='Variables')
+    if _collection is None:
+        raise ValueError(f"Unable to create a Variables collection on {scheduler}")
+    for _name, _value in _variables_key(variables):
+        _variable = scheduler.CreateObject(ObjectName='Variable')
+        _variable.Name = _name
+        _variable.Value = _value
+        _collection.Add(_variable)
+    return _collection
+
+
+class VariableCollections(object):
+    """
+    Reuses Variables collections whenever the same set of variables is triggered again on the same connection, which
+    saves two COM calls per variable on every trigger. Month-end reruns tend to launch hundreds of jobs with only a
+    handful of distinct parameter sets
+
+    Collections are cached per connection since a COM object can't cross over to another connection's thread, and
+    they go away with it. The least recently used collections of a connection are dropped once it has `maxsize`
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = weakref.WeakKeyDictionary()  # {JobScheduler: OrderedDict({variables key: collection})}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"VariableCollections(size={len(self)}, hits={self.hits}, misses={self.misses})"
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(_collections) for _collections in self._cache.values())
+
+    def get(self, scheduler, variables: dict):
+        if not variables:
+            return ''  # Trigger3 won't take None, see its docstring
+        _key = _variables_key(variables)
+        with self._lock:
+            _collections = self._cache.setdefault(scheduler, OrderedDict())
+            _collection = _collections.get(_key)
+            if _collection is not None:
+                _collections.move_to_end(_key)
+                self.hits += 1
+                return _collection
+            self.misses += 1
+        _collection = build_collection(scheduler, variables)
+        with self._lock:
+            _collections[_key] = _collection
+            while len(_collections) > self.maxsize:
+                _collections.popitem(last=False)
+        logging.debug(f"Built a Variables collection for {list(variables)}")
+        return _collection
+
+
+class Variable(object):
+    """
+    One variable of a GetVariables collection as plain Python, with the same attribute names as the COM Variable so it
+    can stand in for one. `owner_id` and `owner_path` are the object that defines it, when known
+
+    Public variables are inherited by everything under the object that defines them, private ones are only visible to
+    that object
+    """
+    __slots__ = ('Name', 'Value', 'AccessType', 'Description', 'owner_id', 'owner_path')
+
+    def __init__(self, name: str, value, access_type: int = PUBLIC, description: str = '', owner_id: int = None,
+                 owner_path: str = None):
+        self.Name = name
+        self.Value = value
+        self.AccessType = access_type
+        self.Description = description
+        self.owner_id = owner_id
+        self.owner_path = owner_path
+
+    def __repr__(self):
+        return f"Variable({self.Name}={self.Value!r}{', private' if self.private else ''}, owner={self.owner_path})"
+
+    def __eq__(self, other):
+        return isinstance(other, Variable) and self.to_dict() == other.to_dict()
+
+    @property
+    def private(self) -> bool:
+        return self.AccessType == PRIVATE
+
+    @classmethod
+    def from_com(cls, item, owner_id: int = None, owner_path: str = None):
+        """reads a COM Variable, anything it lacks is left to its default"""
+        _access = getattr(item, 'AccessType', PUBLIC)
+        return cls(name=str(item.Name), value=getattr(item, 'Value', None),
+                   access_type=int(_access) if _access is not None else PUBLIC,
+                   description=getattr(item, 'Description', '') or '', owner_id=owner_id, owner_path=owner_path)
+
+    def to_dict(self) -> dict:
+        return {_slot: getattr(self, _slot) for _slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data['Name'], data['Value'], data['AccessType'], data['Description'], data['owner_id'],
+                   data['owner_path'])
+
+
+def _key(name: str) -> str:
+    return name.casefold()  # variable names are resolved regardless of case, the same as object names
+
+
+def _read_variables(session, object_id):
+    """runs inside a pool worker, the variables defined on one object (0 being the scheduler itself)"""
+    from Objects.abat_collections import AbatVariables  # it imports this module
+    if object_id == 0:
+        _variables = session.GetVariables().to_list()
+        _path = '/'
+    else:
+        # straight off the COM object, Queues and References don't have an api class that can run it (Placeholder)
+        _obj = session.GetAbatObject(object_id)
+        _variables = AbatVariables(_obj.GetVariables()).to_list()
+        _path = _obj.FullPath
+    for _variable in _variables:
+        _variable.owner_id, _variable.owner_path = object_id, _path
+    return _variables
+
+
+class VariableIndex(object):
+    """
+    Where every variable is defined under `root`, along with the parent of every object, so that the variables an
+    object ends up with are resolved locally instead of calling GetVariables on each of its parents
+
+    with SessionPool('activebatch', 12, size=4) as pool:
+        index = VariableIndex(pool, '/Finance')
+        index.build()
+        index.effective(job_id)             # {name: Variable} the job sees, after inheritance and overrides
+        index.chain(job_id, 'Environment')  # every definition from the job up to the scheduler, the first one wins
+        index.sites('Environment')          # every object that defines it
+
+    The crawl lists the root with a single Search, then reads the variables of every Job, Plan, Folder, Queue,
+    Reference and User Account in parallel over the pool, along with the folders above the root and the scheduler
+    itself, which the objects under the root inherit from too. refresh() only reads again the objects whose RevisionID
+    changed
+
+    Resolution follows the ActiveBatch rules: a variable defined on an object overrides the one with the same name
+    further up, and private variables are only visible to the object defining them, they aren't inherited
+    """
+
+    def __init__(self, pool, root: str = '/'):
+        self.pool = pool
+        self.root = root
+        self.definitions = {}  # {object id: {name key: Variable}}
+        self.parents = {}  # {object id: parent id}, 0 is the scheduler
+        self.paths = {0: '/'}
+        self.revisions = {}  # {object id: RevisionID}
+        self.errors = {}
+
+    def __repr__(self):
+        return f"VariableIndex(root={self.root}, objects={len(self.paths) - 1}, " \
+               f"definitions={sum(len(_v) for _v in self.definitions.values())})"
+
+    def _listing(self) -> dict:
+        """{id: (RevisionID, ParentID, FullPath)} of the variable owners under the root and of the folders above it"""
+        def _list(session):
+            _listing = {int(item.ID): (int(item.RevisionID), int(item.ParentID), item.FullPath)
+                        for item in session.iter_search(self.root, ObjectFilter=_OLF_VARIABLE_OWNERS)}
+            if self.root not in ('', '/'):
+                _obj = session.GetAbatObjectLite(self.root)
+                while True:
+                    _listing[int(_obj.ID)] = (int(_obj.RevisionID), int(_obj.ParentID), _obj.FullPath)
+                    if int(_obj.ParentID) == 0:
+                        break
+                    _obj = session.GetAbatObjectLite(int(_obj.ParentID))
+            return _listing
+        return self.pool.submit(_list).result()
+
+    def build(self) -> dict:
+        self.__init__(self.pool, self.root)
+        return self.refresh()
+
+    def refresh(self) -> dict:
+        from Handlers.session_pool import Progress  # Objects.api imports this module, keep its import light
+        _listing = self._listing()
+        _removed = [_id for _id in self.revisions if _id not in _listing and _id != 0]
+        for _id in _removed:
+            for _table in (self.definitions, self.parents, self.paths, self.revisions):
+                _table.pop(_id, None)
+        _changed = [_id for _id, (_revision, _, _) in _listing.items() if self.revisions.get(_id) != _revision]
+        _changed.append(0)  # the scheduler has no RevisionID to compare, it's one call
+        for _id, (_revision, _parent, _path) in _listing.items():
+            self.parents[_id], self.paths[_id] = _parent, _path
+
+        self.errors = {}
+        _progress = Progress(total=len(_changed), label='variable collections')
+        for _id, _variables, _error in self.pool.map(_read_variables, _changed, progress=_progress):
+            if _error is not None:
+                self.errors[_id] = str(_error)
+                logging.error(f"Could not read the variables of {self.paths.get(_id, _id)}: {_error}")
+                continue
+            self.definitions[_id] = {_key(_v.Name): _v for _v in _variables}
+            if _id != 0:
+                self.revisions[_id] = _listing[_id][0]
+        _summary = _progress.summary()
+        _summary.update({'removed': len(_removed), 'errors': len(self.errors)})
+        logging.info(f"Refreshed {self.__repr__()}")
+        return _summary
+
+    def ancestors(self, object_id) -> list:
+        """the object followed by its parents up to the scheduler (0), from what the crawl saw"""
+        _chain, _id = [], int(object_id)
+        while _id not in _chain:
+            _chain.append(_id)
+            if _id == 0:
+                break
+            _id = self.parents.get(_id, 0)
+        return _chain
+
+    def chain(self, object_id, name: str) -> list:
+        """
+        Every definition of `name` visible from `object_id`, nearest first: the first one is the value the object
+        gets and the others are the ones it overrides. Private variables of the parents are left out
+        """
+        _chain = []
+        for idx, _id in enumerate(self.ancestors(object_id)):
+            _variable = self.definitions.get(_id, {}).get(_key(name))
+            if _variable is not None and (idx == 0 or not _variable.private):
+                _chain.append(_variable)
+        return _chain
+
+    def effective(self, object_id) -> dict:
+        """{name: Variable} of every variable `object_id` sees, each from the nearest object that defines it"""
+        _effective = {}
+        for idx, _id in enumerate(self.ancestors(object_id)):
+            for _name, _variable in self.definitions.get(_id, {}).items():
+                if _name not in _effective and (idx == 0 or not _variable.private):
+                    _effective[_name] = _variable
+        return {_variable.Name: _variable for _variable in _effective.values()}
+
+    def sites(self, name: str) -> list:
+        """every definition of `name`, sorted by path"""
+        return sorted((_vars[_key(name)] for _vars in self.definitions.values() if _key(name) in _vars),
+                      key=lambda _v: _v.owner_path or '')
+
+    def names(self) -> list:
+        return sorted({_v.Name for _vars in self.definitions.values() for _v in _vars.values()}, key=_key)
+
+    def overrides(self) -> list:
+        """(Variable, the Variable further up it overrides) for every public definition that shadows another"""
+        _overrides = []
+        for _id, _variables in self.definitions.items():
+            for _name, _variable in _variables.items():
+                _above = [_v for _v in self.chain(self.parents.get(_id, 0), _name) if not _v.private] if _id else []
+                if _above:
+                    _overrides.append((_variable, _above[0]))
+        return sorted(_overrides, key=lambda _o: (_o[0].owner_path or '', _key(_o[0].Name)))
+
+    def save(self, path: str):
+        _data = {'root': self.root,
+                 'parents': self.parents,
+                 'paths': self.paths,
+                 'revisions': self.revisions,
+                 'definitions': {_id: [_v.to_dict() for _v in _vars.values()]
+                                 for _id, _vars in self.definitions.items()}}
+        with open(path, 'w') as outfile:
+            json.dump(_data, outfile)
+
+    @classmethod
+    def load(cls, pool, path: str):
+        """loads a previously saved index, call refresh() on it to catch up with the server"""
+        with open(path, 'r') as infile:
+            _data = json.load(infile)
+        _index = cls(pool, _data['root'])
+        _index.parents = {int(_id): _parent for _id, _parent in _data['parents'].items()}
+        _index.paths = {int(_id): _path for _id, _path in _data['paths'].items()}
+        _index.revisions = {int(_id): _rev for _id, _rev in _data['revisions'].items()}
+        _index.definitions = {int(_id): {_key(_v['Name']): Variable.from_dict(_v) for _v in _vars}
+                              for _id, _vars in _data['definitions'].items()}
+        return _index
@@ -0,0 +1,262 @@
+import logging
+import re
+import sqlite3
+import time
+from xml.etree import ElementTree
+
+from Handlers.session_pool import Progress
+from Objects.api import EXPORT_NAME_ATTRIBUTE, EXPORT_OBJECT_TAG
+
+_OLF_ALL = 65535  # refer to the docstring of AllMethods.Search for the other ObjectFilter values
+
+# runs of letters, digits and the characters that hold host names, shares, paths and variables together
+_TOKEN = re.compile(r'[\w$%@][\w$%@.\-]*')
+_PARTS = re.compile(r'[.\-$%@]+')
+MIN_TERM = 2
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS objects (id INTEGER PRIMARY KEY, path TEXT, revision INTEGER, type TEXT);
+CREATE TABLE IF NOT EXISTS postings (term TEXT NOT NULL, id INTEGER NOT NULL, PRIMARY KEY (term, id)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_id ON postings (id);
+'''
+
+
+def terms(text: str) -> set:
+    """
+    The terms a piece of text is indexed under, lower case. Compound tokens are kept whole and split into their parts,
+    so 'sc-sql-p01.corp.local' can be found as itself, as 'sc-sql-p01' or as 'corp', and '\\\\sc-fs01\\finance$' as
+    'sc-fs01' or 'finance'
+    """
+    _terms = set()
+    for _token in _TOKEN.findall(text.lower()):
+        _token = _token.strip('.-')
+        _dotted = _token.split('.')
+        # the whole token, everything before each dot (the host without its domain) and every part on its own
+        _candidates = {_token} | {'.'.join(_dotted[:idx]) for idx in range(1, len(_dotted))}
+        _candidates.update(_PARTS.split(_token))
+        _terms.update(_term for _term in _candidates if len(_term) >= MIN_TERM)
+    return _terms
+
+
+def _own_text(element):
+    """
+    Every attribute value and piece of text of an exported object, leaving out the objects nested in it (the export of
+    a Folder or a Plan holds everything under it, which are indexed on their own)
+    """
+    yield from element.attrib.values()
+    if element.text:
+        yield element.text
+    for _child in element:
+        if _child.tag != EXPORT_OBJECT_TAG:
+            yield from _own_text(_child)
+        if _child.tail:
+            yield _child.tail
+
+
+def object_terms(xml: str) -> set:
+    _root = ElementTree.fromstring(xml)
+    _terms = set()
+    for _text in _own_text(_root):
+        _terms |= terms(_text)
+    return _terms
+
+
+def subtree_terms(xml: str, path: str) -> dict:
+    """
+    {FullPath: terms} of every object in the export of `path`: the object itself and, for a Folder or a Plan, every
+    object nested in it as an EXPORT_OBJECT_TAG element (see Objects.api)
+    """
+    _terms = {}
+
+    def _walk(element, element_path):
+        _own = set()
+        for _text in _own_text(element):
+            _own |= terms(_text)
+        _terms[element_path] = sorted(_own)
+        for _child in element:
+            if _child.tag == EXPORT_OBJECT_TAG:
+                _walk(_child, f"{element_path.rstrip('/')}/{_child.get(EXPORT_NAME_ATTRIBUTE)}")
+
+    _walk(ElementTree.fromstring(xml), path)
+    return _terms
+
+
+def _export_terms(session, task):
+    """runs inside a pool worker, {FullPath: terms} of the subtree exported for (id, path)"""
+    _id, _path = task
+    return subtree_terms(session.export_xml(_id), _path)
+
+
+def _parent(path: str) -> str:
+    return path.rsplit('/', 1)[0] or '/'
+
+
+class XmlIndex(object):
+    """
+    Full text index over the exported XML definitions of everything under `root`, kept in a sqlite database. Answers
+    "which jobs reference this server, share, credential or queue" without exporting anything at query time
+
+    with SessionPool('activebatch', 12, size=4) as pool:
+        index = XmlIndex('definitions.sqlite', pool, '/')
+        index.refresh()                          # only exports what changed since the last refresh
+        index.search('sc-sql-p01')               # [(id, path), ...]
+        index.search('sc-fs01', 'finance$')      # objects referencing both
+        index.search('sc-sql-p*')                # prefix
+
+    Objects are exported by JobScheduler.export_xml over the pool. The export of a Folder or a Plan holds everything
+    under it, so it's split into one entry per object (see subtree_terms(), which relies on the export layout described
+    by Objects.api.EXPORT_OBJECT_TAG) and only the topmost objects that need indexing are exported, Jobs and the like
+    on their own. Whatever the split doesn't find is exported object by object. The attribute values and text of
+    every object are split into terms (see terms()), and the (term, id) pairs go into an inverted table. The RevisionID
+    of every object is kept, so refresh() lists the root with a single Search and only indexes the objects that are new
+    or whose RevisionID changed, and drops the ones that are gone
+
+    The same database can be opened without a pool to query an index built earlier
+    """
+
+    def __init__(self, path: str, pool=None, root='/'):
+        self.path = path
+        self.pool = pool
+        self.root = root
+        self.errors = {}
+        self.db = sqlite3.connect(path)
+        self.db.executescript(_SCHEMA)
+
+    def __repr__(self):
+        return f"XmlIndex(path={self.path}, root={self.root}, objects={len(self)})"
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM objects').fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+    def _listing(self):
+        """{id: (RevisionID, FullPath, ObjectType)} of everything under the root, read by one of the pool's workers"""
+        return self.pool.submit(lambda session: {int(item.ID): (int(item.RevisionID), item.FullPath,
+                                                                str(item.ObjectType))
+                                                 for item in session.iter_search(self.root, ObjectFilter=_OLF_ALL)}
+                                ).result()
+
+    def _forget(self, ids):
+        _rows = [(_id,) for _id in ids]
+        self.db.executemany('DELETE FROM postings WHERE id = ?', _rows)
+        self.db.executemany('DELETE FROM objects WHERE id = ?', _rows)
+
+    def _export_roots(self, changed, listing) -> list:
+        """the changed objects none of whose ancestors changed"""
+        _changed_paths = {listing[_id][1] for _id in changed}
+        _roots = []
+        for _id in changed:
+            _path = listing[_id][1]
+            _ancestor = _parent(_path)
+            while _ancestor not in _changed_paths and _ancestor != '/':
+                _ancestor = _parent(_ancestor)
+            if _ancestor not in _changed_paths:
+                _roots.append(_id)
+        return _roots
+
+    def _store(self, object_id, listed, indexed_terms):
+        _revision, _path, _type = listed
+        self._forget([object_id])
+        self.db.execute('INSERT INTO objects (id, path, revision, type) VALUES (?, ?, ?, ?)',
+                        (object_id, _path, _revision, _type))
+        self.db.executemany('INSERT INTO postings (term, id) VALUES (?, ?)', [(_t, object_id) for _t in indexed_terms])
+
+    def refresh(self) -> dict:
+        if self.pool is None:
+            raise ValueError(f"{self.__repr__()} was opened without a pool, it can only be queried")
+        _listing = self._listing()
+        _known = dict(self.db.execute('SELECT id, revision FROM objects'))
+        _removed = [_id for _id in _known if _id not in _listing]
+        _changed = [_id for _id, (_revision, _, _) in _listing.items() if _known.get(_id) != _revision]
+        self._forget(_removed)
+        self.db.commit()
+        logging.info(f"Indexing '{self.root}': {len(_changed)} new or modified, {len(_removed)} removed, "
+                     f"{len(_listing) - len(_changed)} unchanged")
+
+        self.errors = {}
+        _progress = Progress(total=len(_changed), label='objects indexed')
+        _ids = {_listing[_id][1]: _id for _id in _changed}
+        _pending = set(_changed)
+        # a Folder or Plan exports with everything under it, so only the changed objects with no changed ancestor are
+        # exported and the objects under them are split out of their export; whatever the split misses is exported
+        # on its own in a second pass
+        for _roots in (self._export_roots(_changed, _listing), None):
+            _tasks = [(_id, _listing[_id][1]) for _id in (_roots if _roots is not None else sorted(_pending))]
+            for _task, _subtree, _error in self.pool.map(_export_terms, _tasks):
+                if _error is not None:
+                    self.errors[_task[0]] = str(_error)
+                    _pending.discard(_task[0])
+                    _progress.update(False)
+                    logging.error(f"Could not export {_task[0]}: {_error}")
+                    continue
+                for _path, _terms in _subtree.items():
+                    _id = _ids.get(_path)
+                    if _id is None or _id not in _pending:
+                        continue  # unchanged, or indexed already
+                    _pending.discard(_id)
+                    self._store(_id, _listing[_id], _terms)
+                    _progress.update(True)
+                    if _progress.done % 500 == 0:
+                        self.db.commit()
+            if not _pending:
+                break
+            if _roots is not None:
+                logging.warning(f"{len(_pending)} objects weren't nested in the export of their Folder or Plan as "
+                                f"<{EXPORT_OBJECT_TAG}>, exporting them one by one")
+        self.db.commit()
+        _summary = _progress.summary()
+        _summary.update({'removed': len(_removed), 'unchanged': len(_listing) - len(_changed),
+                         'errors': len(self.errors)})
+        return _summary
+
+    def _ids(self, term: str) -> set:
+        term = term.lower()
+        if term.endswith('*'):
+            _prefix = term[:-1]
+            # a range over the primary key instead of LIKE, which sqlite can't always run on the index
+            _rows = self.db.execute('SELECT DISTINCT id FROM postings WHERE term >= ? AND term < ?',
+                                    (_prefix, _prefix + '\uffff'))
+            return {_row[0] for _row in _rows}
+        _ids = None
+        # '\\sc-fs01\finance$' is indexed as 'sc-fs01' and 'finance$', an object has to have both
+        for _token in {_t.strip('.-') for _t in _TOKEN.findall(term)}:
+            if len(_token) < MIN_TERM:
+                continue  # never indexed
+            _rows = self.db.execute('SELECT id FROM postings WHERE term = ?', (_token,))
+            _matches = {_row[0] for _row in _rows}
+            _ids = _matches if _ids is None else _ids & _matches
+            if not _ids:
+                break
+        return _ids or set()
+
+    def search(self, *query, match_all: bool = True) -> list:
+        """
+        (id, path) of the objects referencing every term of `query` (any of them if not `match_all`), sorted by path.
+        Terms ending in '*' match as a prefix. A term that spans several tokens, e.g. a UNC path or a command line,
+        matches the objects that have all of them, in any order
+        """
+        _start = time.perf_counter()
+        _ids = None
+        for _term in query:
+            _matches = self._ids(_term)
+            if _ids is None:
+                _ids = _matches
+            else:
+                _ids = _ids & _matches if match_all else _ids | _matches
+            if match_all and not _ids:
+                break
+        _ids = _ids or set()
+        _results = sorted(((_id, self.path_of(_id)) for _id in _ids), key=lambda _r: (_r[1] or '', _r[0]))
+        logging.debug(f"{query} matched {len(_results)} objects in {(time.perf_counter() - _start) * 1000:.1f}ms")
+        return _results
+
+    def path_of(self, object_id):
+        _row = self.db.execute('SELECT path FROM objects WHERE id = ?', (object_id,)).fetchone()
+        return _row[0] if _row is not None else None
+
+    def terms_of(self, object_id) -> list:
+        """the terms an object is indexed under, to check why it did or didn't match"""
+        return [_row[0] for _row in self.db.execute('SELECT term FROM postings WHERE id = ? ORDER BY term',
+                                                    (object_id,))]
@@ -0,0 +1,64 @@
+"""
+Export the metadata of everything under a root key to a Parquet, Arrow or CSV file, streaming the Search results to
+disk in batches so memory stays flat regardless of the size of the tree. The format follows the extension of --Output
+
+python main.py --Server SC-AB-T01 --Version 12 --Root /Finance --Output finance.parquet
+python main.py --Server SC-AB-T01 --Version 12 --Fields ID Name FullPath RevisionID --Output everything.csv
+
+Objects and Handlers are imported from the root of this repository, which has to be on the PYTHONPATH
+"""
+from argparse import ArgumentParser
+
+from Handlers.connection_handler import ABConnectionManager
+from Objects.exporter import EXPORT_FIELDS, InventoryExporter
+
+
+def parse_arguments(args):
+    parser = ArgumentParser()
+    parser.add_argument('--Server',
+                        required=True,
+                        help='The ActiveBatch Job Scheduler to connect to',
+                        type=str
+                        )
+    parser.add_argument('--Version',
+                        required=True,
+                        help='The ActiveBatch version of the server, e.g. 12',
+                        type=int
+                        )
+    parser.add_argument('--Root',
+                        required=False,
+                        default='/',
+                        help='The path or ID of the folder or plan to export, everything by default',
+                        type=str
+                        )
+    parser.add_argument('--Output',
+                        required=True,
+                        help='The file to write; .parquet, .arrow/.feather/.ipc or .csv',
+                        type=str
+                        )
+    parser.add_argument('--Fields',
+                        required=False,
+                        nargs='+',
+                        default=list(EXPORT_FIELDS),
+                        help='The columns to export, any attribute of a lite object',
+                        type=str
+                        )
+    parser.add_argument('--ObjectFilter',
+                        required=False,
+                        default=65535,
+                        help='The Search ObjectFilter, e.g. 1 for Jobs or 3 for Jobs and Plans, all objects by default',
+                        type=int
+                        )
+    parser.add_argument('--BatchSize',
+                        required=False,
+                        default=5000,
+                        help='Rows per Parquet row group or Arrow record batch',
+                        type=int
+                        )
+    return parser.parse_args(args)
+
+
+def export_inventory(server, version, root, output, fields, object_filter, batch_size) -> dict:
+    with ABConnectionManager(server, version) as ab:
+        _exporter = InventoryExporter(ab, root, fields=fields, object_filter=object_filter, batch_size=batch_size)
+        return _exporter.export(output)
@@ -0,0 +1,19 @@
+import logging
+import sys
+
+from inventory_export import parse_arguments, export_inventory
+
+if __name__ == '__main__':
+    logging.basicConfig(format='[%(asctime)s.%(msecs)03d] [%(filename)s:%(lineno)s - %(funcName)s] %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S', level=logging.INFO)
+    arguments = parse_arguments(sys.argv[1:])
+    summary = export_inventory(server=arguments.Server,
+                               version=arguments.Version,
+                               root=arguments.Root,
+                               output=arguments.Output,
+                               fields=arguments.Fields,
+                               object_filter=arguments.ObjectFilter,
+                               batch_size=arguments.BatchSize
+                               )
+    logging.info(f"{summary['rows']} objects in {summary['batches']} batches, {summary['rows_per_second']}/s")
+    sys.exit(0)
@@ -0,0 +1,68 @@
+"""
+Lazy views over simulated COM collections, see Objects.abat_collections
+
+python -m unittest tests.test_abat_collections
+"""
+import unittest
+
+from Handlers.connection_handler import ABConnectionManager
+from Handlers.simulator import SimulatedScheduler
+from Objects.abat_collections import AbatObjectIDs, ObjectsLite
+
+
+class _Counted(object):
+    """a collection that counts how far it has been walked"""
+
+    def __init__(self, items):
+        self.items = items
+        self.read = 0
+
+    def __iter__(self):
+        for _item in self.items:
+            self.read += 1
+            yield _item
+
+
+class AbatCollectionTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = SimulatedScheduler(folders=3, plans_per_folder=3, jobs_per_plan=5)
+        self.jobs = _Counted(self.scheduler.Search('/', ObjectFilter=1))
+
+    def test_reads_only_as_far_as_asked(self):
+        _view = ObjectsLite(self.jobs, chunk_size=10)
+        self.assertEqual(self.jobs.read, 0)
+        self.assertEqual([_item.ID for _item in _view[:5]], [_item.ID for _item in self.jobs.items[:5]])
+        self.assertEqual(self.jobs.read, 10)
+        self.assertEqual(_view.ids(12), [_item.ID for _item in self.jobs.items[:12]])
+        self.assertEqual(self.jobs.read, 20)
+        self.assertEqual(_view[-1].ID, self.jobs.items[-1].ID)
+        self.assertEqual(self.jobs.read, len(self.jobs.items))
+
+    def test_walked_once(self):
+        _view = ObjectsLite(self.jobs, chunk_size=7)
+        self.assertEqual(list(_view), list(_view))
+        self.assertEqual(len(_view), len(self.jobs.items))
+        self.assertEqual(self.jobs.read, len(self.jobs.items))
+
+    def test_stream_keeps_nothing(self):
+        _view = ObjectsLite(self.jobs, chunk_size=7)
+        self.assertEqual(sum(1 for _ in _view.stream()), len(self.jobs.items))
+        self.assertEqual(_view._raw, [])
+
+    def test_ids(self):
+        _view = AbatObjectIDs(_Counted(['3', 4, 5.0]))
+        self.assertEqual(list(_view), [3, 4, 5])
+        self.assertEqual(_view.ids(), [3, 4, 5])
+
+    def test_api_collections(self):
+        with ABConnectionManager('simulated', 12, dispatch=self.scheduler.dispatch) as ab:
+            _plan = ab.get_object('/Folder0/Plan0', lite=False)
+            self.assertEqual(_plan.GetVariables().to_dict(), {'Environment': 'UAT', 'PlanToken': 'Folder0.0'})
+            self.assertEqual(set(_plan.GetCounters().to_dict()),
+                             {'InstancesCompleted', 'InstancesFailed', 'InstancesExecuting', 'InstancesWaiting'})
+            self.assertEqual(ab.search_lite('/Folder1', ObjectFilter=1).ids(3)[:1],
+                             [self.scheduler.resolve('/Folder1/Plan0/Job0').ID])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+JobScheduler methods against the simulator, see Objects.api
+
+python -m unittest tests.test_api
+"""
+import logging
+import unittest
+
+from Handlers.connection_handler import ABConnectionManager
+from Handlers.simulator import SimulatedScheduler
+from Objects.enumerations import ObjectType
+
+FOLDER = ObjectType('abatOT_Folder').code
+PLAN = ObjectType('abatOT_Plan').code
+
+
+class IntermediateFoldersTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = SimulatedScheduler(folders=2, plans_per_folder=1, jobs_per_plan=1)
+
+    def test_creates_every_missing_level(self):
+        with ABConnectionManager('simulated', 12, dispatch=self.scheduler.dispatch) as ab:
+            ab._create_intermediate_folders('/New/Sub/Leaf')
+            for _path in ('/New', '/New/Sub', '/New/Sub/Leaf'):
+                self.assertTrue(ab.ObjectExists(_path), _path)
+        self.assertEqual(self.scheduler.resolve('/New/Sub/Leaf').ParentID, self.scheduler.resolve('/New/Sub').ID)
+
+    def test_keeps_existing_top_level_folder(self):
+        _top = '/Folder0'
+        with ABConnectionManager('simulated', 12, dispatch=self.scheduler.dispatch) as ab:
+            ab._create_intermediate_folders(f'{_top}/Sub')
+            self.assertTrue(ab.ObjectExists(f'{_top}/Sub'))
+        self.assertEqual(list(self.scheduler.root.children).count('Folder0'), 1)
+        self.assertEqual(self.scheduler.resolve(f'{_top}/Sub').ParentID, self.scheduler.resolve(_top).ID)
+
+
+class TypeCacheTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.WARNING)
+        self.scheduler = SimulatedScheduler(folders=2, plans_per_folder=2, jobs_per_plan=1, v9_errata=True)
+        self.connection = ABConnectionManager('simulated', 9, dispatch=self.scheduler.dispatch)
+        self.ab = self.connection.__enter__()
+        self.folder = self.scheduler.resolve('/Folder0')
+        self.plan = self.scheduler.resolve('/Folder0/Plan0')
+
+    def tearDown(self):
+        self.connection.__exit__(None, None, None)
+        logging.disable(logging.NOTSET)
+
+    def test_errata_probe_runs_once_per_id(self):
+        self.assertEqual(self.ab.GetObjectType(self.folder.ID), FOLDER)
+        self.assertEqual(self.ab.GetObjectType(str(self.folder.ID)), FOLDER)
+        self.assertEqual(self.ab.GetObjectType(self.plan.ID), PLAN)
+        self.assertEqual(self.scheduler.calls['GetObjectType'], 2)
+        self.assertEqual(self.scheduler.calls['GetAbatObject'], 2)
+
+    def test_paths_are_not_cached(self):
+        self.assertEqual(self.ab.GetObjectType('/Folder0'), FOLDER)
+        self.assertNotIn('/Folder0', self.ab.type_cache)
+        self.scheduler.resolve('/Folder0').Delete()
+        _plan = self.scheduler.new_object(PLAN, 'Folder0', self.scheduler.root)
+        self.assertEqual(self.ab.GetObjectType('/Folder0'), PLAN)
+        self.assertEqual(self.ab.GetObjectType(_plan.ID), PLAN)
+
+    def test_prime_type_cache(self):
+        self.assertEqual(self.ab.prime_type_cache('/'), 7)  # /Shared, 2 folders and 4 plans
+        self.scheduler.reset_calls()
+        self.assertEqual(self.ab.GetObjectType(self.folder.ID), FOLDER)
+        self.assertEqual(self.ab.GetObjectType(self.plan.ID), PLAN)
+        self.assertEqual(sum(self.scheduler.calls.values()), 0)
+        self.ab.clear_type_cache()
+        self.assertEqual(self.ab.GetObjectType(self.plan.ID), PLAN)
+        self.assertEqual(self.scheduler.calls['GetObjectType'], 1)
+
+
+class HybridObjectTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = SimulatedScheduler(folders=1, plans_per_folder=1, jobs_per_plan=2)
+        self.connection = ABConnectionManager('simulated', 12, dispatch=self.scheduler.dispatch)
+        self.ab = self.connection.__enter__()
+
+    def tearDown(self):
+        self.connection.__exit__(None, None, None)
+
+    def test_full_object_fetched_on_demand_and_once(self):
+        _plan = self.scheduler.resolve('/Folder0/Plan0')
+        _hybrid = self.ab.get_hybrid_object(_plan.ID)
+        self.assertEqual(_hybrid.Name, 'Plan0')
+        self.assertEqual(_hybrid.route('NextScheduledExecutionDateTime'), 'lite')
+        self.assertFalse(_hybrid.is_full)
+        self.scheduler.reset_calls()
+        self.assertEqual(_hybrid.GetAssociatedSchedulesObjectId().ids(), _plan.schedules)
+        _hybrid.GetAssociatedCalendarsObjectId()
+        self.assertTrue(_hybrid.is_full)
+        self.assertEqual(self.scheduler.calls['GetAbatObject'], 1)
+
+    def test_search_hybrid_objects(self):
+        _jobs = self.ab.Search('/Folder0/Plan0', ObjectFilter=1, GetHybridObjects=True)
+        self.assertEqual([_job.Name for _job in _jobs], ['Job0', 'Job1'])
+        self.assertFalse(any(_job.is_full for _job in _jobs))
+        self.assertEqual(self.scheduler.calls['GetAbatObject'], 0)
+
+    def test_unsupported_attribute(self):
+        with self.assertRaises(AttributeError):
+            getattr(self.ab.get_hybrid_object('/Folder0/Plan0'), 'NoSuchThing')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Association index against the simulator, see Objects.association_index
+
+python -m unittest tests.test_association_index
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from Handlers.connection_handler import ABConnectionManager
+from Handlers.simulator import SimulatedScheduler
+from Objects.association_index import AssociationIndex
+
+
+class AssociationIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = SimulatedScheduler(folders=2, plans_per_folder=2, jobs_per_plan=3, user_accounts=2)
+        self.connection = ABConnectionManager('simulated', 12, dispatch=self.scheduler.dispatch)
+        self.ab = self.connection.__enter__()
+        self.index = AssociationIndex(self.ab, '/')
+        self.index.build()
+        self.job = self.scheduler.resolve('/Folder0/Plan0/Job0')
+
+    def tearDown(self):
+        self.connection.__exit__(None, None, None)
+
+    def test_both_directions(self):
+        _schedule = self.job.schedules[0]
+        self.assertEqual(self.index.dependencies(self.job.ID, 'Schedule'), {_schedule})
+        self.assertIn(self.job.UserAccountID, self.index.dependencies(self.job.ID))
+        _expected = {_obj.ID for _obj in self.scheduler.objects.values() if _schedule in _obj.schedules}
+        self.assertEqual(self.index.dependents(_schedule), _expected)
+        self.assertIn(self.job.ID, self.index.dependents(self.job.UserAccountID))
+
+    def test_calendars_reach_jobs_through_schedules(self):
+        _schedule = self.scheduler.objects[self.job.schedules[0]]
+        _calendar = self.scheduler.resolve('/Shared/Calendar0').ID
+        _schedule.calendars = [_calendar]
+        _schedule.Update()
+        self.index.refresh()
+        self.assertIn(self.job.ID, self.index.dependents(_calendar))
+        self.assertNotIn(self.job.ID, self.index.dependents(_calendar, transitive=False))
+
+    def test_refresh_reads_only_what_changed(self):
+        _other = next(_id for _id in self.index.kinds if self.index.kinds[_id] == 'Schedule'
+                      and _id not in self.job.schedules)
+        self.job.schedules = [_other]
+        self.job.Update()
+        self.scheduler.reset_calls()
+        self.assertEqual(self.index.refresh()['jobs'], 1)
+        self.assertEqual(self.scheduler.calls['GetAssociatedSchedulesObjectId'], 1)
+        self.assertIn(self.job.ID, self.index.dependents(_other))
+
+    def test_refresh_drops_deleted_objects(self):
+        self.job.Delete()
+        self.assertEqual(self.index.refresh()['removed'], 1)
+        self.assertEqual(self.index.dependencies(self.job.ID), set())
+        self.assertNotIn(self.job.ID, self.index.dependents(self.job.UserAccountID))
+
+    def test_save_and_load(self):
+        _directory = tempfile.mkdtemp()
+        try:
+            _path = os.path.join(_directory, 'associations.json')
+            self.index.save(_path)
+            _loaded = AssociationIndex.load(self.ab, _path)
+        finally:
+            shutil.rmtree(_directory)
+        self.assertEqual(_loaded.dependencies(self.job.ID), self.index.dependencies(self.job.ID))
+        self.scheduler.reset_calls()
+        self.assertEqual(_loaded.refresh()['jobs'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
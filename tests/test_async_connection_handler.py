@@ -0,0 +1,68 @@
+"""
+asyncio facade over a simulated server, see Handlers.async_connection_handler
+
+python -m unittest tests.test_async_connection_handler
+"""
+import asyncio
+import threading
+import unittest
+
+from Handlers.async_connection_handler import AsyncJobScheduler
+from Handlers.simulator import SimulatedScheduler
+
+
+class AsyncJobSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = SimulatedScheduler(folders=2, plans_per_folder=2, jobs_per_plan=2)
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def _run(self, coroutine_function, **kwargs):
+        async def _main():
+            async with AsyncJobScheduler('simulated', 12, dispatch=self.scheduler.dispatch, **kwargs) as ab:
+                return await coroutine_function(ab)
+
+        return self.loop.run_until_complete(_main())
+
+    def test_search_returns_plain_snapshots(self):
+        async def _search(ab):
+            return await ab.Search('/Folder0', ObjectFilter=2)
+
+        _plans = self._run(_search)
+        self.assertEqual(sorted(_plan['FullPath'] for _plan in _plans), ['/Folder0/Plan0', '/Folder0/Plan1'])
+        self.assertTrue(all(isinstance(_plan, dict) for _plan in _plans))
+
+    def test_snapshot_fans_out_over_the_workers(self):
+        _threads = set()
+
+        async def _snapshot(ab):
+            _ids = [_obj.ID for _obj in self.scheduler.objects.values() if _obj.Name.startswith('Job')]
+
+            def _read(session, key):
+                _threads.add(threading.get_ident())
+                return session.get_object(key).snapshot(('ID',))
+
+            _snapshots = await asyncio.gather(*(ab.run(_read, _id) for _id in _ids))
+            return _ids, _snapshots
+
+        _ids, _snapshots = self._run(_snapshot, workers=2, max_in_flight=2)
+        self.assertEqual([_snapshot['ID'] for _snapshot in _snapshots], _ids)
+        self.assertNotIn(threading.get_ident(), _threads)
+
+    def test_instances_and_trigger(self):
+        _job = self.scheduler.resolve('/Folder1/Plan0/Job1')
+
+        async def _trigger(ab):
+            _instance = await ab.Trigger3(_job.ID)
+            return _instance, await ab.GetInstances(_job.ID, Count=5)
+
+        _instance, _instances = self._run(_trigger)
+        self.assertEqual(self.scheduler.triggers[-1][:2], (_job.ID, _instance))
+        self.assertTrue(_instances)
+        self.assertTrue(all(isinstance(_item, dict) and 'State' in _item for _item in _instances))
+
+
+if __name__ == '__main__':
+    unittest.main()
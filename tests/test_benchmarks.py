@@ -0,0 +1,43 @@
+"""
+COM calls per object of every benchmark scenario against the committed baselines, see Benchmarks.run
+
+python -m unittest tests.test_benchmarks
+"""
+import logging
+import unittest
+
+from Benchmarks.run import BASELINES, compare, load_baselines, run_scenario
+from Benchmarks.scenarios import SCENARIOS
+
+SCALE = 1000
+
+
+class BaselineTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        logging.disable(logging.WARNING)
+        cls.baselines = load_baselines(BASELINES)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def test_every_scenario_has_a_baseline(self):
+        for _name in SCENARIOS:
+            self.assertIn(f'{_name}@{SCALE}', self.baselines)
+
+    def test_calls_per_object_within_baseline(self):
+        for _name, _scenario in SCENARIOS.items():
+            with self.subTest(scenario=_name):
+                _result = run_scenario(_scenario, SCALE)
+                self.assertEqual(compare(_result, self.baselines[f'{_name}@{SCALE}']), [])
+
+    def test_compare_flags_more_calls(self):
+        self.assertEqual(compare({'calls_per_object': 2.0}, {'calls_per_object': 2.0}), [])
+        self.assertEqual(len(compare({'calls_per_object': 2.5}, {'calls_per_object': 2.0})), 1)
+        self.assertEqual(len(compare({'calls_per_object': 0.1}, {'calls_per_object': 0.0})), 1)
+        self.assertEqual(compare({'calls_per_object': 2.5}, {}), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
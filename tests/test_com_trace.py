@@ -0,0 +1,114 @@
+"""
+Record/replay of COM sessions, see Handlers.com_trace
+
+python -m unittest tests.test_com_trace
+"""
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from Handlers.com_trace import RecordingDispatch, ReplayDispatch, TraceMiss
+from Handlers.connection_handler import ABConnectionManager
+from Handlers.simulator import SimulatedScheduler
+from Objects.abat_collections import ObjectsLite
+
+
+class RecordReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'search.jsonl.gz')
+        self.scheduler = SimulatedScheduler(folders=2, plans_per_folder=2, jobs_per_plan=3)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _record(self, workload):
+        with RecordingDispatch(self.path, dispatch=self.scheduler.dispatch) as recording:
+            with ABConnectionManager('simulated', 12, dispatch=recording) as ab:
+                return workload(ab)
+
+    def _replay(self, workload):
+        _dispatch = ReplayDispatch(self.path)
+        with ABConnectionManager('simulated', 12, dispatch=_dispatch) as ab:
+            return workload(ab), _dispatch
+
+    def test_search_and_snapshot(self):
+        def _workload(ab):
+            return [_item.snapshot() for _item in ab.Search('/', GetFullObjects=True)]
+
+        _recorded = self._record(_workload)
+        _replayed, _dispatch = self._replay(_workload)
+        self.assertEqual(len(_recorded), len(self.scheduler))
+        self.assertEqual(_replayed, _recorded)
+        self.assertEqual(_dispatch.trace.misses, 0)
+
+    def test_unrecorded_call_misses(self):
+        self._record(lambda ab: ab.Search('/Folder0'))
+        with self.assertRaises(TraceMiss):
+            self._replay(lambda ab: ab.Search('/Folder1'))
+
+    def test_password_is_redacted(self):
+        self._record(lambda ab: ab.Connect('simulated', Username='svc_batch', Password='secret'))
+        with gzip.open(self.path, 'rt') as infile:
+            self.assertNotIn('secret', infile.read())
+
+
+
+class _Enumerator(object):
+    def __init__(self, items):
+        self.items = list(items)
+
+    def Next(self, count):
+        _chunk, self.items = self.items[:count], self.items[count:]
+        return tuple(_chunk)
+
+
+class _Dispatch(object):
+    """shaped like a win32com CDispatch: an _oleobj_, and a _NewEnum whose Next hands out whole chunks"""
+    _oleobj_ = None
+
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+
+class _Collection(_Dispatch):
+    def __init__(self, items):
+        super().__init__(items=items)
+
+    def _NewEnum(self):
+        return _Enumerator(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+class _Scheduler(_Dispatch):
+    def GetObjectsLite(self, Filter=65535):
+        return _Collection([_Dispatch(ID=_id, Name=f'Job{_id}') for _id in range(1, 8)])
+
+
+class CollectionReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'collection.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _walk(self, dispatch) -> list:
+        _collection = ObjectsLite(dispatch('ActiveBatch.AbatJobScheduler').GetObjectsLite(), chunk_size=3)
+        return [(_id, _item.Name) for _id, _item in zip(_collection.ids(), _collection)]
+
+    def test_collection_is_recorded_and_replayed(self):
+        _expected = [(_id, f'Job{_id}') for _id in range(1, 8)]
+        with RecordingDispatch(self.path, dispatch=lambda progid: _Scheduler()) as recording:
+            self.assertEqual(self._walk(recording), _expected)
+        _dispatch = ReplayDispatch(self.path)
+        self.assertEqual(self._walk(_dispatch), _expected)
+        self.assertEqual(_dispatch.trace.misses, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
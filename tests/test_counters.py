@@ -0,0 +1,89 @@
+"""
+Counter sampling of a simulated server, see Objects.counters
+
+python -m unittest tests.test_counters
+"""
+import json
+import logging
+import math
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from Handlers.session_pool import SessionPool
+from Handlers.simulator import SimulatedScheduler
+from Objects.counters import CounterSampler, RingBuffer
+
+
+class RingBufferTest(unittest.TestCase):
+    def test_keeps_the_last_samples_in_order(self):
+        _buffer = RingBuffer(['value'], 3)
+        for idx in range(5):
+            _buffer.append(idx, [idx * 10])
+        _times, _values = _buffer.window()
+        self.assertEqual(list(_times), [2, 3, 4])
+        self.assertEqual(list(_values[:, 0]), [20, 30, 40])
+        self.assertEqual(list(_buffer.window(1.5)[0]), [3, 4])
+        self.assertEqual(_buffer.latest()[0], 4)
+
+
+class CounterSamplerTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.directory = tempfile.mkdtemp()
+        self.scheduler = SimulatedScheduler(folders=1, plans_per_folder=1, jobs_per_plan=1)
+        self.pool = SessionPool('simulated', 12, size=1, dispatch=self.scheduler.dispatch)
+        self.pool.start()
+        self.sampler = CounterSampler(self.pool, ['/Folder0/Plan0', 0, '/NoSuchObject'], capacity=10,
+                                      dump_path=os.path.join(self.directory, 'counters.json'))
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.directory)
+        logging.disable(logging.NOTSET)
+
+    def _samples(self, count: int):
+        for _ in range(count):
+            self.sampler.sample()
+            time.sleep(0.01)  # rates need samples at different times
+
+    def test_objects_are_fetched_once(self):
+        self._samples(3)
+        self.assertEqual(self.scheduler.calls['GetCounters'], 6)
+        self.assertEqual(self.scheduler.calls['GetAbatObject'], 1 + 3)  # the missing object is asked for every time
+        self.assertEqual(list(self.sampler.errors), ['/NoSuchObject'])
+        self.assertEqual(len(self.sampler.window('/Folder0/Plan0')['time']), 3)
+
+    def test_rates(self):
+        self._samples(4)
+        _latest = self.sampler.latest()['/Folder0/Plan0']
+        self.assertGreaterEqual(_latest['instances_per_minute'], 0)
+        self.assertGreaterEqual(self.sampler.rate('/Folder0/Plan0', 'InstancesCompleted'), 0)
+        self.scheduler.resolve('/Folder0/Plan0').ResetCounters()
+        self._samples(1)
+        # a counter going down was reset, it counts from zero rather than giving a negative rate
+        self.assertGreaterEqual(self.sampler.latest()['/Folder0/Plan0']['instances_per_minute'], 0)
+        self.assertTrue(math.isnan(self.sampler.rate('/NoSuchObject', 'InstancesCompleted')))
+
+    def test_dump(self):
+        self._samples(2)
+        self.sampler.dump()
+        with open(self.sampler.dump_path) as infile:
+            _dump = json.load(infile)
+        self.assertEqual(sorted(_dump['objects']), ['/Folder0/Plan0', '0'])
+        self.assertEqual(len(_dump['objects']['0']['InstancesCompleted']), 2)
+
+    def test_background_thread(self):
+        self.sampler.interval = 0.01
+        with self.sampler:
+            _deadline = time.monotonic() + 5
+            while self.sampler.samples < 3 and time.monotonic() < _deadline:
+                time.sleep(0.01)
+        self.assertGreaterEqual(self.sampler.samples, 3)
+        self.assertTrue(os.path.exists(self.sampler.dump_path))  # written on stop
+
+
+if __name__ == '__main__':
+    unittest.main()
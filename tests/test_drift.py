@@ -0,0 +1,74 @@
+"""
+Drift detection between two simulated servers, see Objects.drift
+
+python -m unittest tests.test_drift
+"""
+import unittest
+
+from Handlers.session_pool import SessionPool
+from Handlers.simulator import SimulatedScheduler
+from Objects.drift import ADDED, MODIFIED, REMOVED, UNKNOWN, DriftDetector
+
+
+class DriftTest(unittest.TestCase):
+    def setUp(self):
+        self.source = SimulatedScheduler(folders=2, plans_per_folder=2, jobs_per_plan=3)
+        self.target = SimulatedScheduler(folders=2, plans_per_folder=2, jobs_per_plan=3)
+        self.pools = [SessionPool(_name, 12, size=2, dispatch=_sim.dispatch)
+                      for _name, _sim in (('test', self.source), ('prod', self.target))]
+        for _pool in self.pools:
+            _pool.start()
+        self.drift = DriftDetector(self.pools[0], self.pools[1], '/Folder0')
+
+    def tearDown(self):
+        for _pool in self.pools:
+            _pool.close()
+
+    def _changes(self) -> dict:
+        return {_change['path']: _change['change'] for _change in self.drift.compare()}
+
+    def _edit_target(self):
+        self.target.resolve('/Folder0/Plan0/Job1').properties['CommandLine'] = 'changed.cmd'
+        self.target.recycle(self.target.resolve('/Folder0/Plan1/Job2'), purge=True)
+        self.target.new_object(2, 'JobNew', self.target.resolve('/Folder0/Plan1'))
+
+    def test_identical_trees(self):
+        self.assertEqual(self._changes(), {})
+        self.assertEqual(self.drift.summary()['identical'], len(self.drift.hashes[0]))
+
+    def test_added_removed_modified(self):
+        self._edit_target()
+        self.assertEqual(self._changes(), {'Plan0/Job1': MODIFIED, 'Plan1/Job2': REMOVED, 'Plan1/JobNew': ADDED})
+        _diff = [_c for _c in self.drift.changes if _c['change'] == MODIFIED][0]['diff']
+        self.assertIn('changed.cmd', '\n'.join(_diff))
+
+    def test_failed_export_is_unknown(self):
+        _to_xml = self.target.to_xml
+
+        def _failing(obj):
+            if obj.FullPath == '/Folder0/Plan1':
+                raise RuntimeError('export failed')
+            return _to_xml(obj)
+
+        self.target.to_xml = _failing
+        _changes = self._changes()
+        self.assertEqual(set(_changes.values()), {UNKNOWN})
+        self.assertEqual(set(_changes), {'Plan1'} | {f'Plan1/Job{idx}' for idx in range(3)})
+        self.assertEqual(len(self.drift.errors), 1)
+
+    def test_exports_that_dont_nest_are_split_per_object(self):
+        _to_xml = self.target.to_xml
+
+        def _flat(obj):
+            _element = _to_xml(obj)
+            for _child in [_c for _c in _element if _c.tag == 'Object']:
+                _element.remove(_child)
+            return _element
+
+        self.target.to_xml = _flat
+        self._edit_target()
+        self.assertEqual(self._changes(), {'Plan0/Job1': MODIFIED, 'Plan1/Job2': REMOVED, 'Plan1/JobNew': ADDED})
+
+
+if __name__ == '__main__':
+    unittest.main()
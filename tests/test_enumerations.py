@@ -0,0 +1,29 @@
+"""
+Enumeration lookups, see Objects.enumerations
+
+python -m unittest tests.test_enumerations
+"""
+import unittest
+
+from Objects import enumerations as enum
+
+
+class ScheduleDaysTest(unittest.TestCase):
+    def test_single_day(self):
+        _days = enum.ScheduleDays(1)
+        self.assertEqual(_days.str_days, ['abatSD_Sunday'])
+        self.assertEqual(_days.name, 'abatSD_Sunday')
+        self.assertEqual(_days.code, 1)
+
+    def test_bitmask_of_several_days(self):
+        _days = enum.ScheduleDays(38)
+        self.assertEqual(_days.str_days, ['abatSD_Monday', 'abatSD_Tuesday', 'abatSD_Friday'])
+        self.assertEqual(_days.int_days, [2, 4, 32])
+        self.assertEqual(_days.name, 'abatSD_Monday|abatSD_Tuesday|abatSD_Friday')
+
+    def test_every_day(self):
+        self.assertEqual(len(enum.ScheduleDays(127).str_days), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
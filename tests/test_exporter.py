@@ -0,0 +1,62 @@
+"""
+Inventory export of a simulated server, see Objects.exporter
+
+python -m unittest tests.test_exporter
+"""
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from Handlers.connection_handler import ABConnectionManager
+from Handlers.simulator import SimulatedScheduler
+from Objects.exporter import InventoryExporter
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class InventoryExporterTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.scheduler = SimulatedScheduler(folders=3, plans_per_folder=2, jobs_per_plan=4)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _export(self, name: str, **kwargs) -> dict:
+        with ABConnectionManager('simulated', 12, dispatch=self.scheduler.dispatch) as ab:
+            return InventoryExporter(ab, '/', batch_size=10, **kwargs).export(os.path.join(self.directory, name))
+
+    def test_csv(self):
+        _summary = self._export('inventory.csv')
+        self.assertEqual(_summary['rows'], len(self.scheduler))
+        with open(_summary['path'], newline='', encoding='utf-8') as infile:
+            _rows = list(csv.DictReader(infile))
+        self.assertEqual(len(_rows), len(self.scheduler))
+        _job = self.scheduler.resolve('/Folder0/Plan0/Job0')
+        _row = [_r for _r in _rows if _r['ID'] == str(_job.ID)][0]
+        self.assertEqual((_row['FullPath'], _row['ObjectType']), (_job.FullPath, 'abatOT_Job'))
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_parquet_and_arrow(self):
+        import pyarrow.ipc
+        import pyarrow.parquet
+        _summary = self._export('inventory.parquet')
+        self.assertEqual(_summary['batches'], -(-len(self.scheduler) // 10))
+        _table = pyarrow.parquet.read_table(_summary['path'])
+        self.assertEqual(_table.num_rows, len(self.scheduler))
+        self.assertEqual(str(_table.schema.field('ID').type), 'int64')
+        self.assertIsInstance(_table.column('CreationDateTime')[0].as_py(), datetime)
+        _summary = self._export('inventory.arrow', fields=('ID', 'Enabled'))
+        _table = pyarrow.ipc.open_file(_summary['path']).read_all()
+        self.assertEqual(_table.column_names, ['ID', 'Enabled'])
+        self.assertEqual(_table.num_rows, len(self.scheduler))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Queries across several simulated servers, see Handlers.federation
+
+python -m unittest tests.test_federation
+"""
+import logging
+import unittest
+
+from Handlers.federation import Federation
+from Handlers.simulator import SimulatedScheduler
+
+_FOLDERS_AND_PLANS = 2048 | 2
+
+
+def _refuse(progid=None):
+    raise RuntimeError('refused')
+
+
+class FederationTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.current = SimulatedScheduler(folders=3, plans_per_folder=2, jobs_per_plan=1)
+        self.legacy = SimulatedScheduler(folders=2, plans_per_folder=2, jobs_per_plan=1, v9_errata=True)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_rows_from_every_server(self):
+        with Federation([('current', 12), ('legacy', 9)], size=2,
+                        dispatch={'current': self.current.dispatch, 'legacy': self.legacy.dispatch}) as federation:
+            _rows = federation.search('/', ObjectFilter=_FOLDERS_AND_PLANS)
+        self.assertEqual(sum(_row['Server'] == 'current' for _row in _rows), 10)  # /Shared, 3 folders and 6 plans
+        self.assertEqual(sum(_row['Server'] == 'legacy' for _row in _rows), 7)
+        self.assertEqual({_row['ObjectType'] for _row in _rows if _row['Server'] == 'legacy'},
+                         {_row['ObjectType'] for _row in _rows if _row['Server'] == 'current'})
+        self.assertEqual(federation.errors, {})
+        # V9 folders are told apart from plans by priming the type cache, not by a probe per object
+        self.assertEqual(self.legacy.calls['GetAbatObject'], 0)
+
+    def test_unavailable_and_slow_servers_are_left_out(self):
+        _slow = SimulatedScheduler(folders=1, plans_per_folder=1, jobs_per_plan=1, latency=0.2)
+        with Federation([('current', 12), ('slow', 12), ('down', 12)], size=1, timeout=0.05,
+                        dispatch={'current': self.current.dispatch, 'slow': _slow.dispatch,
+                                  'down': _refuse}) as federation:
+            self.assertEqual(list(federation.unavailable), [('down', 12)])
+            _rows = federation.search('/', ObjectFilter=_FOLDERS_AND_PLANS)
+            self.assertEqual({_row['Server'] for _row in _rows}, {'current'})
+            self.assertEqual(set(federation.errors), {('slow', 12), ('down', 12)})
+
+    def test_same_host_under_two_versions(self):
+        _dispatch = {('host', 12): self.current.dispatch, ('host', 9): self.legacy.dispatch}
+        with Federation([('host', 12), ('host', 9)], size=1, dispatch=_dispatch) as federation:
+            _rows = federation.search('/', ObjectFilter=_FOLDERS_AND_PLANS)
+            self.assertEqual(set(federation.report), {('host', 12), ('host', 9)})
+        self.assertEqual(sum(_row['Version'] == 12 for _row in _rows), 10)
+        self.assertEqual(sum(_row['Version'] == 9 for _row in _rows), 7)
+
+    def test_snapshot(self):
+        with Federation([('current', 12), ('legacy', 9)], size=2,
+                        dispatch={'current': self.current.dispatch, 'legacy': self.legacy.dispatch}) as federation:
+            _rows = federation.snapshot(['/Folder0/Plan1', '/Folder2'])
+        # /Folder2 only exists on the current server
+        self.assertEqual(sorted((_row['Server'], _row['FullPath']) for _row in _rows),
+                         [('current', '/Folder0/Plan1'), ('current', '/Folder2'), ('legacy', '/Folder0/Plan1')])
+
+
+if __name__ == '__main__':
+    unittest.main()
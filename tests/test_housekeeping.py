@@ -0,0 +1,72 @@
+"""
+Housekeeping against the simulator, see Objects.housekeeping
+
+python -m unittest tests.test_housekeeping
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from Handlers.session_pool import SessionPool
+from Handlers.simulator import SimulatedScheduler
+from Objects.housekeeping import Housekeeping
+
+
+class HousekeepingTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.state_file = os.path.join(self.directory, 'housekeeping.jsonl')
+        self.scheduler = SimulatedScheduler(folders=2, plans_per_folder=2, jobs_per_plan=2)
+        self.pool = SessionPool('simulated', 12, size=2, dispatch=self.scheduler.dispatch)
+        self.pool.start()
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.directory)
+
+    def _delete(self, path: str, days_ago: float, field: str = 'DeletedDateTime'):
+        _obj = self.scheduler.resolve(path)
+        _obj.Delete()
+        _obj.properties.pop('ModifiedDateTime', None)
+        _obj.properties[field] = datetime.now() - timedelta(days=days_ago)
+        return _obj.ID
+
+    def _purged(self, root: str = '/', **kwargs) -> list:
+        _housekeeping = Housekeeping(self.pool, self.state_file, root, operations=('purge',), object_types=('Job',),
+                                     **kwargs)
+        _housekeeping.run()
+        return [_task[1] for _task in _housekeeping.plan]
+
+    def test_purges_only_under_root(self):
+        _inside = self._delete('/Folder0/Plan0/Job0', days_ago=40)
+        _outside = self._delete('/Folder1/Plan0/Job0', days_ago=40)
+        self.assertEqual(self._purged('/Folder0'), [_inside])
+        self.assertEqual(list(self.scheduler.recycle_bin.objects), [_outside])
+
+    def test_purges_by_deletion_date(self):
+        _old = self._delete('/Folder0/Plan0/Job0', days_ago=40)
+        self._delete('/Folder0/Plan0/Job1', days_ago=1)
+        self.assertEqual(self._purged(deleted_more_than_days=30), [_old])
+
+    def test_modified_date_only_with_opt_in(self):
+        _old = self._delete('/Folder0/Plan0/Job0', days_ago=40, field='ModifiedDateTime')
+        self._delete('/Folder0/Plan0/Job1', days_ago=1, field='ModifiedDateTime')
+        self.assertEqual(self._purged(), [])
+        os.remove(self.state_file)
+        self.assertEqual(self._purged(modified_as_deleted=True), [_old])
+
+    def test_flushes_idle_jobs_and_resumes(self):
+        _housekeeping = Housekeeping(self.pool, self.state_file, '/Folder0', operations=('flush',),
+                                     older_than_days=None)
+        _plan = _housekeeping.select()
+        self.assertEqual(len(_plan), 6)  # 2 Plans of 2 Jobs
+        _housekeeping._journal({'op': 'done', 'operation': 'flush', 'id': _plan[0][1]})
+        _summary = Housekeeping(self.pool, self.state_file, '/Folder0', operations=('flush',)).run()
+        self.assertEqual(_summary['total'], 5)
+        self.assertEqual(self.scheduler.calls['FlushInstances'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+"""
+Cold import budget of the library, see Benchmarks.import_time
+
+python -m unittest tests.test_import_time
+"""
+import unittest
+
+from Benchmarks.import_time import MODULES, import_time
+
+BUDGET_MS = 50.0
+RUNS = 5
+
+
+class ImportTimeTest(unittest.TestCase):
+    def test_cold_import_within_budget(self):
+        for _module in MODULES:
+            with self.subTest(module=_module):
+                import_time(_module)  # writes the bytecode cache
+                _total, _self, _loaded = min((import_time(_module) for _ in range(RUNS)), key=lambda run: run[0])
+                self.assertLessEqual(_total / 1000, BUDGET_MS, f'{_module} took {_total / 1000:.1f} ms to import')
+
+    def test_lazy_modules_stay_lazy(self):
+        for _module in MODULES:
+            with self.subTest(module=_module):
+                _, _, _loaded = import_time(_module)
+                self.assertEqual(_loaded, [], f"{_module} imports {', '.join(_loaded)} on import")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Call statistics of the api wrappers on a simulated server, see Objects.instrumentation
+
+python -m unittest tests.test_instrumentation
+"""
+import json
+import unittest
+
+from Handlers.connection_handler import ABConnectionManager
+from Handlers.simulator import SimulatedScheduler
+from Objects.instrumentation import Instrumentation, instrumentation
+
+
+class InstrumentationTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = SimulatedScheduler(folders=2, plans_per_folder=2, jobs_per_plan=2)
+        instrumentation.reset()
+        instrumentation.enable()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def _calls(self):
+        with ABConnectionManager('simulated', 12, dispatch=self.scheduler.dispatch) as ab:
+            ab.Search('/', ObjectFilter=1)
+            ab.get_object('/Folder0/Plan0', lite=False).GetVariables()
+            with self.assertRaises(Exception):
+                ab.GetObjectType('/NoSuchObject')
+
+    def test_calls_are_recorded(self):
+        self._calls()
+        _stats = instrumentation.stats()
+        self.assertEqual(_stats[('JobScheduler', 'Search')].count, 1)
+        self.assertEqual(_stats[('JobScheduler', 'GetObjectType')].errors, 1)
+        self.assertEqual(sum(_stats[('JobScheduler', 'Search')].buckets), 1)
+        _methods = json.loads(instrumentation.to_json())['methods']
+        self.assertIn({'class': 'Plan', 'method': 'GetVariables'},
+                      [{'class': _m['class'], 'method': _m['method']} for _m in _methods])
+
+    def test_stats_are_a_snapshot(self):
+        _monitor = Instrumentation(enabled=True)
+        _monitor.record('JobScheduler', 'Search', 0.01)
+        _stats = _monitor.stats()
+        _monitor.record('JobScheduler', 'Search', 0.02, failed=True)
+        _search = _stats[('JobScheduler', 'Search')]
+        self.assertEqual((_search.count, _search.errors, sum(_search.buckets)), (1, 0, 1))
+        self.assertEqual(_monitor.stats()[('JobScheduler', 'Search')].count, 2)
+
+    def test_prometheus_families_are_grouped(self):
+        self._calls()
+        _families, _current = [], None
+        for _line in instrumentation.to_prometheus().splitlines():
+            if _line.startswith('# TYPE '):
+                _current = _line.split()[2]
+                _families.append(_current)
+            elif not _line.startswith('#'):
+                _name = _line.split('{')[0]
+                self.assertIn(_name, (_current, f'{_current}_bucket', f'{_current}_sum', f'{_current}_count'))
+        self.assertEqual(_families, ['abat_calls_total', 'abat_call_errors_total', 'abat_call_seconds'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Late run detection against the simulator, see Objects.late_runs
+
+python -m unittest tests.test_late_runs
+"""
+import logging
+import time
+import unittest
+from datetime import timedelta
+
+from Handlers.session_pool import SessionPool
+from Handlers.simulator import SimulatedScheduler
+from Objects.enumerations import ObjectType
+from Objects.late_runs import LATE, MISSED, LateRunDetector
+
+
+class LateRunTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.WARNING)
+        self.scheduler = SimulatedScheduler(folders=2, depth=1, plans_per_folder=2, jobs_per_plan=2)
+        self.now = self.scheduler.now
+        self.pool = SessionPool('simulated', 12, size=2, dispatch=self.scheduler.dispatch)
+        self.pool.start()
+        self.detector = LateRunDetector(self.pool, '/', grace_seconds=300, recheck_seconds=60)
+
+    def tearDown(self):
+        self.detector.stop()
+        self.pool.close()
+        logging.disable(logging.NOTSET)
+
+    def _times(self, path: str, last_minutes: float, next_minutes: float) -> int:
+        _id = self.scheduler.resolve(path).ID
+        self.scheduler.run_times[_id] = (self.now + timedelta(minutes=last_minutes),
+                                         self.now + timedelta(minutes=next_minutes))
+        return _id
+
+    def _events(self, minutes: float = 0) -> list:
+        _events = self.detector.check(self.now + timedelta(minutes=minutes))
+        return [(_event['event'], _event['path']) for _event in _events]
+
+    def test_late_then_missed(self):
+        self._times('/Folder0/Plan0/Job0', -120, -30)
+        self.detector.load()
+        self.assertEqual(self._events(), [(LATE, '/Folder0/Plan0/Job0')])
+        self.assertEqual(self._events(2), [])  # reported once
+        self._times('/Folder0/Plan0/Job0', -120, 60)
+        self.assertEqual(self._events(4), [(MISSED, '/Folder0/Plan0/Job0')])
+
+    def test_load_picks_up_objects_scheduled_since(self):
+        _job = self.scheduler.resolve('/Folder0/Plan0/Job0')
+        _job.Enabled = False
+        self.detector.load()
+        _job.Enabled = True
+        self._times('/Folder0/Plan0/Job0', -120, -30)
+        self.assertEqual(self._events(), [])  # disabled at load, so never due
+        self.detector.load(self.now.timestamp())
+        self.assertEqual(self._events(), [(LATE, '/Folder0/Plan0/Job0')])
+
+    def test_load_adds_and_drops(self):
+        self.detector.load()
+        _count = len(self.detector)
+        _new = self.scheduler.new_object(ObjectType('abatOT_Job').code, 'New', self.scheduler.resolve('/Folder1/Plan1'))
+        self._times('/Folder1/Plan1/New', -120, -30)
+        _deleted = self._times('/Folder0/Plan0/Job1', -120, -30)
+        self.scheduler.resolve('/Folder0/Plan0/Job1').Delete()
+        self.detector.load(self.now.timestamp())
+        self.assertEqual(len(self.detector), _count)
+        self.assertIn(_new.ID, self.detector.paths)
+        self.assertNotIn(_deleted, set(self.detector.ids.tolist()))
+        self.assertEqual(self._events(), [(LATE, '/Folder1/Plan1/New')])
+
+    def test_load_keeps_runs_already_due(self):
+        self._times('/Folder0/Plan0/Job0', -120, -30)
+        self.detector.load()
+        self._times('/Folder0/Plan0/Job0', -120, 60)  # the scheduler moved on before the detector looked
+        self.detector.load(self.now.timestamp())
+        self.assertEqual(self._events(), [(MISSED, '/Folder0/Plan0/Job0')])
+        self.assertEqual(len(self.detector), len(set(self.detector.ids.tolist())))
+
+    def test_start_reloads(self):
+        self.detector.start(interval=0.01, reload_every=0)
+        _new = self.scheduler.new_object(ObjectType('abatOT_Job').code, 'New', self.scheduler.resolve('/Folder1/Plan1'))
+        _deadline = time.monotonic() + 5
+        while _new.ID not in self.detector.paths and time.monotonic() < _deadline:
+            time.sleep(0.01)
+        self.assertIn(_new.ID, self.detector.paths)
+
+
+if __name__ == '__main__':
+    unittest.main()
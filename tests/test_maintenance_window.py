@@ -0,0 +1,72 @@
+"""
+Freeze and thaw of a simulated subtree, see Objects.maintenance_window
+
+python -m unittest tests.test_maintenance_window
+"""
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from Handlers.session_pool import SessionPool
+from Handlers.simulator import SimulatedObject, SimulatedScheduler
+from Objects.maintenance_window import MaintenanceWindow
+
+
+class MaintenanceWindowTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.directory = tempfile.mkdtemp()
+        self.state_file = os.path.join(self.directory, 'window.jsonl')
+        self.scheduler = SimulatedScheduler(folders=2, plans_per_folder=3, jobs_per_plan=1)
+        self.pool = SessionPool('simulated', 12, size=2, dispatch=self.scheduler.dispatch)
+        self.pool.start()
+        self.plans = [_obj for _obj in self.scheduler.objects.values() if _obj.Name.startswith('Plan')]
+        self.already_disabled = self.plans[0]
+        self.already_disabled.Enabled = False
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.directory)
+        logging.disable(logging.NOTSET)
+
+    def test_thaw_restores_only_what_freeze_disabled(self):
+        _window = MaintenanceWindow(self.pool, '/', self.state_file)
+        self.assertEqual(_window.freeze()['failed'], 0)
+        self.assertFalse(any(_plan.Enabled for _plan in self.plans))
+        _window.thaw()
+        self.assertFalse(self.already_disabled.Enabled)
+        self.assertTrue(all(_plan.Enabled for _plan in self.plans[1:]))
+        self.assertTrue(_window.thawed)
+
+    def test_rerun_picks_up_after_a_failure(self):
+        _failing = self.plans[-1]
+        _disable = SimulatedObject.Disable
+
+        def _flaky(obj):
+            if obj is _failing:
+                raise RuntimeError('server busy')
+            _disable(obj)
+
+        with mock.patch.object(SimulatedObject, 'Disable', _flaky):
+            self.assertEqual(MaintenanceWindow(self.pool, '/', self.state_file).freeze()['failed'], 1)
+        self.assertTrue(_failing.Enabled)
+
+        _window = MaintenanceWindow(self.pool, '/', self.state_file)  # as if the script was started again
+        self.scheduler.reset_calls()
+        _summary = _window.freeze()
+        self.assertEqual((_summary['succeeded'], _summary['failed']), (1, 0))
+        self.assertEqual(self.scheduler.calls['Disable'], 1)
+        self.assertEqual(self.scheduler.calls['Search'], 0)  # the journaled snapshot is reused
+        self.assertFalse(_failing.Enabled)
+        self.assertEqual(_window.pending_restore, {_plan.ID for _plan in self.plans[1:]})
+
+    def test_thaw_without_snapshot(self):
+        with self.assertRaises(ValueError):
+            MaintenanceWindow(self.pool, '/', self.state_file).thaw()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Permission audit of a simulated server, see Objects.permission_audit
+
+python -m unittest tests.test_permission_audit
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from Handlers.session_pool import SessionPool
+from Handlers.simulator import SimulatedObject, SimulatedScheduler
+from Objects.permission_audit import PermissionAudit
+
+
+class PermissionAuditTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        # Folder0 replaces the permissions of everything under it, Folder3 is read only
+        self.scheduler = SimulatedScheduler(folders=4, plans_per_folder=2, jobs_per_plan=2)
+        self.pool = SessionPool('simulated', 12, size=2, dispatch=self.scheduler.dispatch)
+        self.pool.start()
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.directory)
+
+    def _id(self, path: str) -> int:
+        return self.scheduler.resolve(path).ID
+
+    def test_permissions(self):
+        _audit = PermissionAudit(self.pool, '/')
+        _audit.run()
+        self.assertEqual(len(_audit.ids), len(self.scheduler))
+        self.assertTrue(_audit.has(self._id('/Folder1/Plan0/Job0'), 'abatJSA_Trigger'))
+        self.assertFalse(_audit.has(self._id('/Folder3/Plan0/Job0'), 'abatJSA_Write'))
+        self.assertTrue(_audit.has(self._id('/Folder3/Plan0/Job0'), 'abatJSA_Read'))
+
+    def test_children_are_checked_unless_inference_is_asked_for(self):
+        _job = self._id('/Folder0/Plan0/Job0')
+        self.scheduler.resolve(_job).properties['GrantedMask'] = 2  # changed after Folder0 pushed its permissions
+        _checked = PermissionAudit(self.pool, '/Folder0')
+        _checked.run()
+        self.assertFalse(_checked.has(_job, 'abatJSA_Trigger'))
+        self.assertFalse(any(_row['Inferred'] for _row in _checked.matrix()))
+        _inferred = PermissionAudit(self.pool, '/Folder0', infer_from_containers=True)
+        _summary = _inferred.run()
+        self.assertTrue(_inferred.has(_job, 'abatJSA_Trigger'))  # what inference misses
+        self.assertTrue(_inferred.inferred(_job))
+        self.assertEqual(_summary['inferred'], sum(_row['Inferred'] for _row in _inferred.matrix()))
+        _path = os.path.join(self.directory, 'audit.json')
+        _inferred.save(_path)
+        self.assertTrue(PermissionAudit.load(self.pool, _path).inferred(_job))
+
+    def test_failed_check_is_unknown_in_diff(self):
+        _path = os.path.join(self.directory, 'audit.json')
+        _previous = PermissionAudit(self.pool, '/Folder1')
+        _previous.run()
+        _previous.save(_path)
+        _job = self._id('/Folder1/Plan1/Job1')
+        _has_permission = SimulatedObject.HasPermission
+
+        def _flaky(obj, PermissionMask):
+            if obj.ID == _job:
+                raise RuntimeError('RPC server unavailable')
+            return _has_permission(obj, PermissionMask)
+
+        with mock.patch.object(SimulatedObject, 'HasPermission', _flaky):
+            _audit = PermissionAudit(self.pool, '/Folder1')
+            _audit.run()
+        self.assertEqual(list(_audit.errors), [_job])
+        _changes = _audit.diff(PermissionAudit.load(self.pool, _path))
+        self.assertEqual([(_c['id'], _c['change']) for _c in _changes], [(_job, 'unknown')])
+        self.assertEqual(_changes[0]['path'], '/Folder1/Plan1/Job1')
+        # and the other way round, once the object can be checked again
+        _audit.save(_path)
+        _again = PermissionAudit(self.pool, '/Folder1')
+        _again.run()
+        self.assertEqual([_c['change'] for _c in _again.diff(PermissionAudit.load(self.pool, _path))], ['unknown'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Queries over a simulated server, see Objects.query
+
+python -m unittest tests.test_query
+"""
+import logging
+import unittest
+
+from Handlers.connection_handler import ABConnectionManager
+from Handlers.simulator import SimulatedScheduler
+from Objects.query import Catalog
+
+
+class QueryTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.WARNING)
+        self.scheduler = SimulatedScheduler(folders=3, plans_per_folder=2, jobs_per_plan=3)
+        self.connection = ABConnectionManager('simulated', 12, dispatch=self.scheduler.dispatch)
+        self.ab = self.connection.__enter__()
+        self.disabled = [self.scheduler.resolve('/Folder1/Plan0/Job2'), self.scheduler.resolve('/Folder2/Plan1/Job0')]
+        for _job in self.disabled:
+            _job.Enabled = False
+
+    def tearDown(self):
+        self.connection.__exit__(None, None, None)
+        logging.disable(logging.NOTSET)
+
+    def test_pushdown(self):
+        _query = self.ab.query().type('Job', 'Plan').under('/Folder1').named('Job*').where(Enabled=False)
+        self.assertEqual(_query.search_arguments(), {'SearchRootKey': '/Folder1', 'SearchString': 'Job*',
+                                                     'ObjectFilter': 3, 'FieldNames': 'Name', 'Recursive': True})
+        self.assertEqual(_query.explain()['source'], 'search')
+        self.assertEqual(_query.ids(), [self.disabled[0].ID])
+        self.assertEqual(self.scheduler.calls['Search'], 1)
+
+    def test_limit_and_first(self):
+        self.assertEqual(self.ab.query().type('Job').limit(4).count(), 4)
+        self.assertEqual(int(self.ab.query().type('Job').where(Enabled=False).first().ID), self.disabled[0].ID)
+        self.assertIsNone(self.ab.query().type('Job').named('NoSuchJob').first())
+
+    def test_catalog_answers_without_the_com(self):
+        self.ab.catalog = Catalog(self.ab, '/', max_age=60)
+        self.ab.catalog.refresh()
+        self.scheduler.reset_calls()
+        _query = self.ab.query().type('Job').where(Enabled=False)
+        self.assertEqual(_query.explain()['source'], 'catalog')
+        self.assertEqual(sorted(_query.ids()), sorted(_job.ID for _job in self.disabled))
+        self.assertEqual(self.ab.query().under('/Folder0', recursive=False).type('Plan').count(), 2)
+        self.assertEqual(sum(self.scheduler.calls.values()), 0)
+
+    def test_stale_catalog_goes_back_to_search(self):
+        self.ab.catalog = Catalog(self.ab, '/', max_age=0)
+        self.ab.catalog.refresh()
+        self.ab.catalog.built_at -= 1
+        self.assertEqual(self.ab.query().type('Job').explain()['source'], 'search')
+        self.assertEqual(Catalog(self.ab, '/Folder0').covers('/Folder1'), False)
+
+    def test_objects(self):
+        _jobs = self.ab.query().type('Job').under('/Folder0/Plan1').objects(hybrid=True)
+        self.assertEqual([_job.Name for _job in _jobs], ['Job0', 'Job1', 'Job2'])
+        self.assertEqual(self.scheduler.calls['GetAbatObject'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Equivalent schedules of a simulated server, see Objects.schedule_fingerprint
+
+python -m unittest tests.test_schedule_fingerprint
+"""
+import logging
+import unittest
+
+from Handlers.session_pool import SessionPool
+from Handlers.simulator import SimulatedScheduler
+from Objects.schedule_fingerprint import ScheduleFingerprints, _series
+
+
+class ScheduleFingerprintTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.scheduler = SimulatedScheduler(folders=2, plans_per_folder=3, jobs_per_plan=2, schedules_per_folder=2)
+        self.pool = SessionPool('simulated', 12, size=2, dispatch=self.scheduler.dispatch)
+        self.pool.start()
+        # the same specification under another name, in another folder
+        self.original = self.scheduler.resolve('/Folder0/Schedule0')
+        self.copy = self.scheduler.resolve('/Folder1/Schedule1')
+        self.copy.properties.clear()
+        self.copy.properties.update(self.original.properties)
+
+    def tearDown(self):
+        self.pool.close()
+        logging.disable(logging.NOTSET)
+
+    def _jobs(self, schedule) -> set:
+        return {_obj.ID for _obj in self.scheduler.objects.values() if schedule.ID in _obj.schedules}
+
+    def test_series_are_normalized(self):
+        self.assertEqual(_series('15, 1,1'), [1, 15])
+        self.assertEqual(_series(1), [1])
+        self.assertEqual(_series('l,5'), [5, 'L'])
+
+    def test_equivalent_schedules_are_grouped(self):
+        _fingerprints = ScheduleFingerprints(self.pool, '/')
+        _fingerprints.collect()
+        self.assertEqual(_fingerprints.groups(), [sorted((self.original.ID, self.copy.ID))])
+        self.assertEqual(_fingerprints.schedules[self.copy.ID]['fingerprint'],
+                         _fingerprints.schedules[self.original.ID]['fingerprint'])
+        self.assertEqual(_fingerprints.summary()['removable'], 1)
+
+    def test_consolidation_keeps_the_busiest(self):
+        _fingerprints = ScheduleFingerprints(self.pool, '/')
+        _fingerprints.collect()
+        _group = _fingerprints.consolidation_plan()[0]
+        _busiest = max((self.original, self.copy), key=lambda _s: (len(self._jobs(_s)), -_s.ID))
+        _other = self.copy if _busiest is self.original else self.original
+        self.assertEqual(_group['keep'], _busiest.ID)
+        self.assertEqual({_action['job'] for _action in _group['actions']}, self._jobs(_other))
+
+    def test_per_folder(self):
+        _fingerprints = ScheduleFingerprints(self.pool, '/', per_folder=True)
+        _fingerprints.collect()
+        self.assertEqual(_fingerprints.groups(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Bulk renaming of simulated schedules to their production names, see Objects.schedule_names
+
+python -m unittest tests.test_schedule_names
+"""
+import logging
+import unittest
+
+from Handlers.session_pool import SessionPool
+from Handlers.simulator import SimulatedScheduler
+from Objects.schedule_names import COLLISION, RENAME, RENAMED, STALE, UNCHANGED, ScheduleNamePlanner
+
+
+class ScheduleNamePlannerTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.scheduler = SimulatedScheduler(folders=2, plans_per_folder=1, jobs_per_plan=1, schedules_per_folder=3)
+        self.pool = SessionPool('simulated', 12, size=2, dispatch=self.scheduler.dispatch)
+        self.pool.start()
+        self.planner = ScheduleNamePlanner(self.pool, '/', batch_size=2)
+
+    def tearDown(self):
+        self.pool.close()
+        logging.disable(logging.NOTSET)
+
+    def test_apply_then_nothing_left(self):
+        self.planner.plan()
+        self.assertEqual(self.planner.summary(), {RENAME: 6})
+        self.assertEqual(self.planner.apply()['failed'], 0)
+        for _id, _entry in self.planner.entries.items():
+            self.assertEqual(_entry['status'], RENAMED)
+            self.assertEqual(self.scheduler.objects[_id].Name, _entry['proposed'])
+        _again = ScheduleNamePlanner(self.pool, '/')
+        _again.plan()
+        self.assertEqual(_again.summary(), {UNCHANGED: 6})
+
+    def test_same_specification_collides(self):
+        _first = self.scheduler.resolve('/Folder0/Schedule0')
+        _second = self.scheduler.resolve('/Folder0/Schedule1')
+        _second.properties.update(_first.properties)
+        self.planner.plan()
+        self.assertEqual(self.planner.entries[_first.ID]['status'], RENAME)
+        self.assertEqual(self.planner.entries[_second.ID]['status'], COLLISION)
+        self.scheduler.reset_calls()
+        self.planner.apply()
+        self.assertEqual(_second.Name, 'Schedule1')
+        self.assertEqual(self.scheduler.calls['Update'], 5)
+
+    def test_renamed_since_the_plan_is_stale(self):
+        self.planner.plan()
+        _schedule = self.scheduler.resolve('/Folder1/Schedule2')
+        _schedule.Name = 'ChangedByHand'
+        self.planner.apply()
+        self.assertEqual(self.planner.entries[_schedule.ID]['status'], STALE)
+        self.assertEqual(_schedule.Name, 'ChangedByHand')
+
+
+if __name__ == '__main__':
+    unittest.main()
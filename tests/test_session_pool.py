@@ -0,0 +1,71 @@
+"""
+Worker sessions on a simulated server, see Handlers.session_pool
+
+python -m unittest tests.test_session_pool
+"""
+import logging
+import threading
+import time
+import unittest
+
+from Handlers.session_pool import Progress, RateLimiter, SessionPool
+from Handlers.simulator import SimulatedScheduler
+
+
+class SessionPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = SimulatedScheduler(folders=2, plans_per_folder=2, jobs_per_plan=2)
+
+    def test_every_worker_has_its_own_session(self):
+        with SessionPool('simulated', 12, size=3, dispatch=self.scheduler.dispatch) as pool:
+            _barrier = threading.Barrier(3, timeout=5)
+
+            def _session(session):
+                _barrier.wait()  # three tasks at once, so each one is on a different worker
+                return id(session)
+
+            _sessions = {_future.result() for _future in [pool.submit(_session) for _ in range(3)]}
+        self.assertEqual(len(_sessions), 3)
+        self.assertEqual(self.scheduler.calls['Connect'], 3)
+
+    def test_map_hands_failures_back(self):
+        _progress = Progress(total=3)
+        with SessionPool('simulated', 12, size=2, dispatch=self.scheduler.dispatch) as pool:
+            _results = {_key: (_name, _error) for _key, _name, _error in
+                        pool.map(lambda session, key: session.get_object(key).Name,
+                                 ['/Folder0', '/NoSuchFolder', '/Folder1/Plan1'], progress=_progress)}
+        self.assertEqual(_results['/Folder0'], ('Folder0', None))
+        self.assertEqual(_results['/Folder1/Plan1'], ('Plan1', None))
+        self.assertIsNotNone(_results['/NoSuchFolder'][1])
+        self.assertEqual((_progress.succeeded, _progress.failed), (2, 1))
+
+    def test_failed_connection(self):
+        def _refuse(progid=None):
+            raise RuntimeError('refused')
+
+        logging.disable(logging.ERROR)
+        try:
+            with self.assertRaises(Exception):  # ABConnectionManager logs the error and raises a bare Exception
+                SessionPool('simulated', 12, size=2, dispatch=_refuse).start()
+        finally:
+            logging.disable(logging.NOTSET)
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_limit(self):
+        _limiter = RateLimiter(calls_per_second=100, burst=1)
+        _start = time.monotonic()
+        for _ in range(11):
+            _limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - _start, 0.09)
+
+    def test_no_limit(self):
+        _limiter = RateLimiter(None)
+        _start = time.monotonic()
+        for _ in range(1000):
+            _limiter.acquire()
+        self.assertLess(time.monotonic() - _start, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
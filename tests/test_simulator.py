@@ -0,0 +1,57 @@
+"""
+The simulated scheduler the other tests and the benchmarks run on, see Handlers.simulator
+
+python -m unittest tests.test_simulator
+"""
+import unittest
+
+from Handlers.connection_handler import ABConnectionManager
+from Handlers.simulator import SimulatedScheduler
+from Objects.enumerations import ObjectType
+
+
+class SimulatorTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = SimulatedScheduler(folders=3, depth=2, subfolders=2, plans_per_folder=2, jobs_per_plan=3)
+
+    def test_same_seed_same_tree(self):
+        _other = SimulatedScheduler(folders=3, depth=2, subfolders=2, plans_per_folder=2, jobs_per_plan=3)
+        self.assertEqual(len(_other), len(self.scheduler))
+        self.assertEqual([_obj.FullPath for _obj in _other.root.walk()],
+                         [_obj.FullPath for _obj in self.scheduler.root.walk()])
+
+    def test_types_are_enumeration_codes(self):
+        _job = self.scheduler.resolve('/Folder0/Plan0/Job0')
+        self.assertEqual(ObjectType(_job.ObjectType).name, 'abatOT_Job')
+        self.assertEqual(ObjectType(self.scheduler.resolve('/Folder0').ObjectType).name, 'abatOT_Folder')
+
+    def test_search_through_the_api(self):
+        _jobs = [_obj for _obj in self.scheduler.root.walk() if ObjectType(_obj.ObjectType).name == 'abatOT_Job']
+        with ABConnectionManager('simulated', 12, dispatch=self.scheduler.dispatch) as ab:
+            _found = ab.Search('/', ObjectFilter=1, GetFullObjects=True)
+            self.assertEqual(sorted(_item.ID for _item in _found), sorted(_job.ID for _job in _jobs))
+            self.assertEqual(ab.GetObjectType('/Folder0'), ObjectType('abatOT_Folder').code)
+        self.assertEqual(self.scheduler.calls['Search'], 1)
+
+    def test_v9_errata(self):
+        _scheduler = SimulatedScheduler(folders=1, plans_per_folder=1, jobs_per_plan=1, v9_errata=True)
+        self.assertEqual(_scheduler.GetObjectType('/Folder0'), ObjectType('abatOT_Plan').code)
+
+    def test_undo_pending_changes(self):
+        _job = self.scheduler.resolve('/Folder0/Plan0/Job0')
+        _job.Name = 'Renamed'
+        self.assertIs(self.scheduler.resolve('/Folder0/Plan0/Renamed'), _job)
+        self.scheduler.UndoPendingChanges(_job.ID)
+        self.assertEqual(_job.FullPath, '/Folder0/Plan0/Job0')
+        self.assertIs(self.scheduler.resolve('/Folder0/Plan0/Job0'), _job)
+
+    def test_delete_moves_to_the_recycle_bin(self):
+        _plan = self.scheduler.resolve('/Folder0/Plan0')
+        _count = len(self.scheduler)
+        _plan.Delete()
+        self.assertEqual(len(self.scheduler), _count - 4)
+        self.assertIn(_plan.ID, self.scheduler.recycle_bin.objects)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Triggers with variables against the simulator, see Objects.trigger_dispatcher and Objects.variables
+
+python -m unittest tests.test_trigger_dispatcher
+"""
+import gc
+import unittest
+
+from Handlers.connection_handler import ABConnectionManager
+from Handlers.session_pool import SessionPool
+from Handlers.simulator import SimulatedScheduler
+from Objects.trigger_dispatcher import TriggerDispatcher, TriggerRequest
+from Objects.variables import VariableCollections
+
+
+class TriggerDispatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = SimulatedScheduler(folders=1, plans_per_folder=1, jobs_per_plan=3)
+        self.pool = SessionPool('simulated', 12, size=1, dispatch=self.scheduler.dispatch)
+        self.pool.start()
+        self.dispatcher = TriggerDispatcher(self.pool)
+        self.job = self.scheduler.resolve('/Folder0/Plan0/Job0')
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_triggers_with_variables(self):
+        _requests = [TriggerRequest(self.job.FullPath, {'Period': f'2020-0{idx % 2 + 6}', 'Count': 1})
+                     for idx in range(6)]
+        _results = self.dispatcher.dispatch(_requests)
+        self.assertTrue(all(_result.ok for _result in _results))
+        self.assertEqual(sorted(_result.instance_id for _result in _results),
+                         sorted(_instance_id for _, _instance_id, _ in self.scheduler.triggers))
+        self.assertEqual({(_id, tuple(sorted(_variables.items()))) for _id, _, _variables in self.scheduler.triggers},
+                         {(self.job.ID, (('Count', '1'), ('Period', '2020-06'))),
+                          (self.job.ID, (('Count', '1'), ('Period', '2020-07')))})
+
+    def test_collections_are_reused(self):
+        self.dispatcher.dispatch([TriggerRequest(self.job.ID, {'Count': 1}),
+                                  TriggerRequest(self.job.ID, {'Count': '1'}),
+                                  TriggerRequest(self.job.ID, {'Count': 2})])
+        self.assertEqual((self.dispatcher.collections.misses, self.dispatcher.collections.hits), (2, 1))
+        # a Variables collection and one Variable for each miss
+        self.assertEqual(self.scheduler.calls['CreateObject'], 4)
+
+    def test_without_variables(self):
+        _result, = self.dispatcher.dispatch([TriggerRequest(self.job.ID)])
+        self.assertTrue(_result.ok)
+        self.assertEqual(self.scheduler.triggers, [(self.job.ID, _result.instance_id, {})])
+
+    def test_failures_dont_stop_the_others(self):
+        _results = {_result.request.key: _result for _result in
+                    self.dispatcher.dispatch([TriggerRequest('/Folder0/Plan0/Missing'), TriggerRequest(self.job.ID)])}
+        self.assertFalse(_results['/Folder0/Plan0/Missing'].ok)
+        self.assertTrue(_results[self.job.ID].ok)
+
+    def test_variables_that_cant_be_built(self):
+        def _create_object(ObjectName):
+            raise RuntimeError('no Variables on this server')
+
+        self.scheduler.CreateObject = _create_object
+        _result, = self.dispatcher.dispatch([TriggerRequest(self.job.ID, {'Count': 1})])
+        self.assertIn('Unable to create a Variables collection', _result.error)
+        self.assertEqual(self.scheduler.triggers, [])
+
+
+class VariableCollectionsTest(unittest.TestCase):
+    def test_cached_per_connection(self):
+        _scheduler = SimulatedScheduler(folders=1)
+        _collections = VariableCollections()
+        with ABConnectionManager('simulated', 12, dispatch=_scheduler.dispatch) as first, \
+                ABConnectionManager('simulated', 12, dispatch=_scheduler.dispatch) as second:
+            _first = _collections.get(first, {'Count': 1})
+            self.assertIs(_collections.get(first, {'Count': 1}), _first)
+            self.assertIsNot(_collections.get(second, {'Count': 1}), _first)
+            self.assertEqual(len(_collections), 2)
+        del first, second
+        gc.collect()
+        self.assertEqual(len(_collections), 0)
+
+    def test_trigger3_takes_a_dict(self):
+        _scheduler = SimulatedScheduler(folders=1, plans_per_folder=1, jobs_per_plan=1)
+        with ABConnectionManager('simulated', 12, dispatch=_scheduler.dispatch) as ab:
+            _instance_id = ab.get_object('/Folder0/Plan0/Job0', lite=False).Trigger3(Variables={'Period': '2020-06'})
+        self.assertEqual(_scheduler.triggers[-1][1:], (_instance_id, {'Period': '2020-06'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
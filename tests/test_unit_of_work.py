@@ -0,0 +1,77 @@
+"""
+Batched property changes on a simulated server, see Objects.unit_of_work
+
+python -m unittest tests.test_unit_of_work
+"""
+import logging
+import unittest
+
+from Handlers.connection_handler import ABConnectionManager
+from Handlers.session_pool import SessionPool
+from Handlers.simulator import SimulatedScheduler
+from Objects.unit_of_work import FAILED, ROLLED_BACK, UNCHANGED, UPDATED
+
+
+class UnitOfWorkTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.scheduler = SimulatedScheduler(folders=2, plans_per_folder=2, jobs_per_plan=3)
+        self.connection = ABConnectionManager('simulated', 12, dispatch=self.scheduler.dispatch)
+        self.ab = self.connection.__enter__()
+        self.pool = SessionPool('simulated', 12, size=2, dispatch=self.scheduler.dispatch)
+        self.pool.start()
+        self.jobs = sorted((_obj for _obj in self.scheduler.objects.values() if _obj.Name.startswith('Job')),
+                           key=lambda _job: _job.ID)
+
+    def tearDown(self):
+        self.pool.close()
+        self.connection.__exit__(None, None, None)
+        logging.disable(logging.NOTSET)
+
+    def test_one_update_per_object(self):
+        self.scheduler.reset_calls()
+        with self.ab.unit_of_work(self.pool, batch_size=5) as work:
+            for _job in self.jobs:
+                work.set(_job.ID, Description='first')
+                work.set(_job, Description='second', Enabled=False)
+            _tracked = work.track(self.ab.get_object(self.jobs[0].ID, lite=False))
+            _tracked.Owner = 'svc_audit'
+            self.assertEqual(_tracked.Owner, 'svc_audit')
+            self.assertEqual(self.jobs[0].Owner, 'ASCI\\svc_batch')  # nothing sent yet
+        self.assertEqual(self.scheduler.calls['Update'], len(self.jobs))
+        self.assertTrue(all(_job.Description == 'second' and not _job.Enabled for _job in self.jobs))
+        self.assertEqual(self.jobs[0].Owner, 'svc_audit')
+        self.assertEqual(set(work.results.values()), {UPDATED})
+
+    def test_unchanged_values_are_not_updated(self):
+        self.scheduler.reset_calls()
+        with self.ab.unit_of_work(self.pool) as work:
+            for _job in self.jobs:
+                work.set(_job.ID, Enabled=True)
+        self.assertEqual(self.scheduler.calls['Update'], 0)
+        self.assertEqual(set(work.results.values()), {UNCHANGED})
+
+    def test_failure_rolls_back(self):
+        _name = self.jobs[-1].Name
+        _work = self.ab.unit_of_work(batch_size=4)
+        for _job in self.jobs:
+            _work.set(_job.ID, Description='changed')
+        _work.set(self.jobs[-1].ID, Name='')  # refused by Update
+        _summary = _work.flush()
+        self.assertEqual(_summary[FAILED], 1)
+        self.assertEqual(_summary[ROLLED_BACK], len(self.jobs) - 1)
+        self.assertEqual({_job.Description for _job in self.jobs}, {''})
+        self.assertEqual(self.jobs[-1].Name, _name)
+        self.assertEqual(self.scheduler.pending_changes, {})
+
+    def test_exception_discards(self):
+        with self.assertRaises(RuntimeError):
+            with self.ab.unit_of_work() as work:
+                work.set(self.jobs[0].ID, Label='discarded')
+                raise RuntimeError('stop')
+        self.assertEqual(self.jobs[0].Label, 'Job0')
+        self.assertEqual(work.changes, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Variable definitions and inheritance on a simulated server, see Objects.variables
+
+python -m unittest tests.test_variables
+"""
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from Handlers.session_pool import SessionPool
+from Handlers.simulator import SimulatedScheduler
+from Objects.variables import VariableIndex
+
+
+class VariableIndexTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.WARNING)
+        # Plan0 of every folder overrides Environment and keeps a private PlanToken, Plan1 doesn't
+        self.scheduler = SimulatedScheduler(folders=2, depth=2, subfolders=2, plans_per_folder=2, jobs_per_plan=2)
+        self.pool = SessionPool('simulated', 12, size=2, dispatch=self.scheduler.dispatch)
+        self.pool.start()
+        self.index = VariableIndex(self.pool, '/Folder0/Folder0_1')
+        self.index.build()
+
+    def tearDown(self):
+        self.pool.close()
+        logging.disable(logging.NOTSET)
+
+    def _id(self, path: str) -> int:
+        return self.scheduler.resolve(path).ID
+
+    def test_effective_values(self):
+        _overridden = self.index.effective(self._id('/Folder0/Folder0_1/Plan0/Job0'))
+        self.assertEqual({_name: _v.Value for _name, _v in _overridden.items()},
+                         {'Environment': 'UAT', 'BatchRoot': '\\\\SRV01\\batch\\Folder0_1',
+                          'SmtpServer': 'smtp.corp.local'})
+        _inherited = self.index.effective(self._id('/Folder0/Folder0_1/Plan1/Job0'))
+        self.assertEqual(_inherited['Environment'].Value, 'PROD')
+        self.assertEqual(_inherited['Environment'].owner_path, '/')
+
+    def test_private_variables_stay_on_their_object(self):
+        _plan = self._id('/Folder0/Folder0_1/Plan0')
+        self.assertEqual(self.index.effective(_plan)['PlanToken'].Value, 'Folder0_1.0')
+        self.assertNotIn('PlanToken', self.index.effective(self._id('/Folder0/Folder0_1/Plan0/Job0')))
+
+    def test_chain_and_sites(self):
+        _chain = self.index.chain(self._id('/Folder0/Folder0_1/Plan0/Job1'), 'environment')
+        self.assertEqual([(_v.owner_path, _v.Value) for _v in _chain],
+                         [('/Folder0/Folder0_1/Plan0', 'UAT'), ('/', 'PROD')])
+        # the folders above the root are read too, since everything under it inherits from them
+        self.assertEqual([_v.owner_path for _v in self.index.sites('BatchRoot')], ['/Folder0', '/Folder0/Folder0_1'])
+
+    def test_refresh_reads_only_what_changed(self):
+        self.scheduler.reset_calls()
+        self.assertEqual(self.index.refresh()['total'], 1)  # the scheduler, which has no RevisionID
+        _plan = self.scheduler.resolve('/Folder0/Folder0_1/Plan1')
+        _plan.properties['Variables'] = {'Environment': ('DR', 1)}
+        _plan.Update()
+        self.assertEqual(self.index.refresh()['total'], 2)
+        self.assertEqual(self.index.effective(self._id('/Folder0/Folder0_1/Plan1/Job0'))['Environment'].Value, 'DR')
+
+    def test_save_and_load(self):
+        _directory = tempfile.mkdtemp()
+        try:
+            _path = os.path.join(_directory, 'variables.json')
+            self.index.save(_path)
+            _loaded = VariableIndex.load(self.pool, _path)
+        finally:
+            shutil.rmtree(_directory)
+        _job = self._id('/Folder0/Folder0_1/Plan0/Job0')
+        self.assertEqual(_loaded.effective(_job), self.index.effective(_job))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Full text index over the exports of a simulated server, see Objects.xml_index
+
+python -m unittest tests.test_xml_index
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from Handlers.session_pool import SessionPool
+from Handlers.simulator import SimulatedScheduler
+from Objects.xml_index import XmlIndex, terms
+
+
+class XmlIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.scheduler = SimulatedScheduler(folders=2, plans_per_folder=2, jobs_per_plan=3)
+        self.job = self.scheduler.resolve('/Folder1/Plan1/Job2')
+        self.job.properties['CommandLine'] = r'sqlcmd -S sc-sql-p01.corp.local -i \\sc-fs01\finance$\load.sql'
+        self.pool = SessionPool('simulated', 12, size=2, dispatch=self.scheduler.dispatch)
+        self.pool.start()
+        self.index = XmlIndex(os.path.join(self.directory, 'definitions.sqlite'), self.pool, '/')
+
+    def tearDown(self):
+        self.index.close()
+        self.pool.close()
+        shutil.rmtree(self.directory)
+
+    def test_terms(self):
+        self.assertTrue({'sc-sql-p01', 'sc-sql-p01.corp.local', 'corp', 'finance$', 'sc-fs01'} <=
+                        terms(r'sqlcmd -S sc-sql-p01.corp.local -i \\sc-fs01\finance$\load.sql'))
+
+    def test_search(self):
+        _summary = self.index.refresh()
+        self.assertEqual(_summary['total'], len(self.scheduler))
+        _expected = [(self.job.ID, self.job.FullPath)]
+        self.assertEqual(self.index.search('sc-sql-p01'), _expected)
+        self.assertEqual(self.index.search('sc-fs01', 'finance$'), _expected)
+        self.assertEqual(self.index.search('sc-sql-p*'), _expected)
+        self.assertEqual(self.index.search(r'\\sc-fs01\elsewhere'), [])
+
+    def test_refresh_only_exports_what_changed(self):
+        self.index.refresh()
+        self.scheduler.reset_calls()
+        self.assertEqual(self.index.refresh()['total'], 0)
+        self.assertNotIn('Export', self.scheduler.calls)
+        self.job.CommandLine = r'run.exe \\sc-fs02\batch'
+        self.job.Update()
+        self.scheduler.recycle(self.scheduler.resolve('/Folder0/Plan0'), purge=True)
+        _summary = self.index.refresh()
+        self.assertEqual((_summary['total'], _summary['removed']), (1, 4))
+        self.assertEqual(self.index.search('sc-sql-p01'), [])
+        self.assertEqual(self.index.search('sc-fs02'), [(self.job.ID, self.job.FullPath)])
+
+    def test_exports_that_dont_nest_are_indexed_per_object(self):
+        _to_xml = self.scheduler.to_xml
+
+        def _flat(obj):
+            _element = _to_xml(obj)
+            for _child in [_c for _c in _element if _c.tag == 'Object']:
+                _element.remove(_child)
+            return _element
+
+        self.scheduler.to_xml = _flat
+        self.assertEqual(self.index.refresh()['total'], len(self.scheduler))
+        self.assertEqual(self.index.search('sc-sql-p01'), [(self.job.ID, self.job.FullPath)])
+
+
+if __name__ == '__main__':
+    unittest.main()